@@ -0,0 +1,208 @@
+"""
+Local stand-in for the X API v1.1 endpoints used by the bot blocker.
+
+Serves a deterministic, generated mentions timeline (no dataset is held in
+memory), users lookup/show, user timelines, block creation and block IDs,
+with x-rate-limit-* headers, 429s once a window is used up and configurable
+per-request latency. Limits are generous unless --x-limits is given.
+
+    python benchmarks/fake_x_api.py --mentions 10000 --port 8399
+"""
+import json
+import time
+import argparse
+import threading
+from collections import Counter
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Requests per 15-minute window, as documented for the real API
+X_LIMITS = {
+    'statuses/mentions_timeline': 75,
+    'statuses/user_timeline': 900,
+    'users/show': 900,
+    'users/lookup': 900,
+    'blocks/create': 50,
+    'blocks/ids': 15
+}
+
+NOW = datetime.now(timezone.utc)
+
+class FakeXState:
+    """Dataset generator plus per-endpoint request counters and rate limit windows"""
+
+    def __init__(self, mentions: int, authors: int = 0, bot_every: int = 10,
+                 latency: float = 0.0, limits=None, default_limit: int = 10_000_000, window: float = 900):
+        self.mentions = mentions
+        self.authors = authors or max(1, mentions // 4)
+        self.bot_every = bot_every
+        self.latency = latency
+        self.limits = limits or {}
+        self.default_limit = default_limit
+        self.window = window
+        self.requests = Counter()
+        self.blocked = set()
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def author_of(self, mention_id: int) -> int:
+        return (mention_id * 7919) % self.authors + 1
+
+    def user(self, user_id: int) -> dict:
+        bot = user_id % self.bot_every == 0
+        # Every seventh human is borderline so the detection cascade gets exercised
+        borderline = not bot and user_id % 7 == 0
+        age = 2 if bot else (30 if borderline else 900)
+        return {
+            'id': user_id,
+            'id_str': str(user_id),
+            'screen_name': f"user{user_id}",
+            'created_at': format_datetime(NOW - timedelta(days=age)),
+            'followers_count': 0 if bot else (3 if borderline else 500),
+            'friends_count': 900 if bot else 100,
+            'statuses_count': 0 if bot else 800,
+            'default_profile_image': bot or borderline,
+            'profile_image_url_https': f"https://pbs.example/{user_id}.jpg",
+            'description': '' if bot else 'hello'
+        }
+
+    def mention(self, mention_id: int) -> dict:
+        author = self.author_of(mention_id)
+        return {
+            'id': mention_id,
+            'id_str': str(mention_id),
+            'created_at': format_datetime(NOW - timedelta(seconds=self.mentions - mention_id)),
+            'text': f"@us hello {mention_id}",
+            'user': self.user(author)
+        }
+
+    def take(self, endpoint: str):
+        """Count a request against its window; returns (allowed, headers)"""
+        now = time.time()
+        limit = self.limits.get(endpoint, self.default_limit)
+        with self._lock:
+            self.requests[endpoint] += 1
+            used, reset = self._windows.get(endpoint, (0, now + self.window))
+            if now >= reset:
+                used, reset = 0, now + self.window
+            allowed = used < limit
+            if allowed:
+                used += 1
+            self._windows[endpoint] = (used, reset)
+        return allowed, {
+            'x-rate-limit-limit': str(limit),
+            'x-rate-limit-remaining': str(limit - used),
+            'x-rate-limit-reset': str(int(reset))
+        }
+
+    def handle(self, method: str, endpoint: str, params: dict):
+        """Returns (status, body) for an API call"""
+        if endpoint == 'statuses/mentions_timeline':
+            count = int(params.get('count', 20))
+            since_id = int(params.get('since_id', 0))
+            max_id = int(params.get('max_id', self.mentions))
+            top = min(max_id, self.mentions)
+            ids = range(top, max(since_id, top - count), -1)
+            return 200, [self.mention(i) for i in ids]
+        if endpoint == 'users/lookup':
+            ids = [int(i) for i in params.get('user_id', '').split(',') if i]
+            return 200, [self.user(i) for i in ids if 0 < i <= self.authors]
+        if endpoint == 'users/show':
+            return 200, self.user(int(params['user_id']))
+        if endpoint == 'statuses/user_timeline':
+            user_id = int(params.get('user_id', 1))
+            count = int(params.get('count', 20))
+            return 200, [
+                {'id': user_id * 1000 + i, 'id_str': str(user_id * 1000 + i), 'text': 'same text again',
+                 'created_at': format_datetime(NOW - timedelta(minutes=i)),
+                 'user': {'id': user_id, 'id_str': str(user_id)}}
+                for i in range(min(count, 20))
+            ]
+        if endpoint == 'blocks/create' and method == 'POST':
+            user_id = int(params['user_id'])
+            with self._lock:
+                self.blocked.add(user_id)
+            return 200, self.user(user_id)
+        if endpoint == 'blocks/ids':
+            return 200, {'ids': [], 'next_cursor': 0, 'previous_cursor': 0}
+        return 404, {'errors': [{'code': 34, 'message': 'Sorry, that page does not exist.'}]}
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {'requests': dict(self.requests), 'total_requests': sum(self.requests.values()),
+                    'blocked': len(self.blocked)}
+
+class FakeXHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self, status: int, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('content-type', 'application/json;charset=utf-8')
+        self.send_header('content-length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _dispatch(self, method: str):
+        state = self.server.state
+        parsed = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        if method == 'POST':
+            length = int(self.headers.get('content-length', 0))
+            if length:
+                params.update({k: v[-1] for k, v in parse_qs(self.rfile.read(length).decode('utf-8')).items()})
+
+        if parsed.path == '/stats':
+            return self._respond(200, state.get_stats())
+        if not (parsed.path.startswith('/1.1/') and parsed.path.endswith('.json')):
+            return self._respond(404, {'errors': [{'code': 34, 'message': 'Not found'}]})
+        endpoint = parsed.path[len('/1.1/'):-len('.json')]
+
+        if state.latency:
+            time.sleep(state.latency)
+        allowed, headers = state.take(endpoint)
+        if not allowed:
+            return self._respond(429, {'errors': [{'code': 88, 'message': 'Rate limit exceeded'}]}, headers)
+        status, body = state.handle(method, endpoint, params)
+        self._respond(status, body, headers)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(state: FakeXState, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Create (but do not start) a fake X API server; port 0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), FakeXHandler)
+    server.daemon_threads = True
+    server.state = state
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake X API v1.1 server")
+    parser.add_argument('--mentions', type=int, default=1000)
+    parser.add_argument('--authors', type=int, default=0, help="distinct mention authors (default: mentions / 4)")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument('--x-limits', action='store_true', help="enforce the real per-window request limits")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8399)
+    args = parser.parse_args()
+
+    state = FakeXState(args.mentions, args.authors, latency=args.latency, limits=X_LIMITS if args.x_limits else None)
+    server = make_server(state, args.host, args.port)
+    print(f"Fake X API listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
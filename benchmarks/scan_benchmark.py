@@ -0,0 +1,171 @@
+"""
+End-to-end throughput benchmark: mention fetch -> BotDetector -> create_block.
+
+Starts the fake X API (benchmarks/fake_x_api.py) in its own process and, for
+each dataset size, runs the real scan_and_block plus a full drain of the
+block queue in a fresh interpreter, so peak RSS is measured per run.
+
+    python benchmarks/scan_benchmark.py --mentions 1000 10000 100000 --latency 0.005
+
+Reports mentions/sec, API calls per mention, p50/p99 latency of screening a
+page of mentions (fetch + score + queue) and peak RSS.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src', 'x_bot_blocker')
+
+def serve(port_queue, mentions, authors, latency, x_limits):
+    """Server process: run the fake X API and report its port"""
+    sys.path.insert(0, BENCH_DIR)
+    from fake_x_api import X_LIMITS, FakeXState, make_server
+    state = FakeXState(mentions, authors, latency=latency, limits=X_LIMITS if x_limits else None)
+    server = make_server(state)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def run_scan(base_url, max_drain):
+    """Scan process: drive the real scan loop against the fake API and print results as JSON"""
+    import resource
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    tmp_dir = tempfile.mkdtemp(prefix='x-bot-bench-')
+    os.environ.update({
+        'TWITTER_API_KEY': 'bench', 'TWITTER_API_SECRET': 'bench',
+        'TWITTER_ACCESS_TOKEN': 'bench', 'TWITTER_ACCESS_TOKEN_SECRET': 'bench',
+        'SLACK_WEBHOOK_URL': '', 'API_TRAFFIC_MODE': 'off'
+    })
+    os.chdir(PROJECT_ROOT)
+    sys.path.insert(0, SRC_DIR)
+    import x_bot_blocker
+
+    class LocalAPIAdapter(HTTPAdapter):
+        """Sends requests meant for api.twitter.com to the fake server"""
+        def send(self, request, **kwargs):
+            request.url = request.url.replace('https://api.twitter.com', base_url, 1)
+            return super().send(request, **kwargs)
+
+    x_bot_blocker.configure_logging('WARNING', os.path.join(tmp_dir, 'bench.log'))
+    # Keep the benchmark's state (scan cursors, journal, ledger, block queue) out of the project's data directory
+    app = x_bot_blocker.create_app(data_dir=tmp_dir)
+    app.raw_api.session.mount('https://', LocalAPIAdapter())
+    app.block_executor.max_blocks_per_day = 10 ** 9
+    app.block_executor.pace = 0
+    app.save_metrics = lambda: None
+
+    # Time each page from the request for it until the next request (fetch + screen)
+    page_latencies = []
+    iter_mention_pages = x_bot_blocker.iter_mention_pages
+    def timed_pages(*args, **kwargs):
+        started = time.perf_counter()
+        for page in iter_mention_pages(*args, **kwargs):
+            yield page
+            now = time.perf_counter()
+            page_latencies.append(now - started)
+            started = now
+    x_bot_blocker.iter_mention_pages = timed_pages
+
+    started = time.perf_counter()
+    app.scan_and_block()
+    scanned = time.perf_counter()
+    deadline = scanned + max_drain
+    while len(app.block_executor) and time.perf_counter() < deadline:
+        wait = app.block_executor.process_next()
+        if wait > 0:
+            time.sleep(min(wait, 1.0, max(0.0, deadline - time.perf_counter())))
+    finished = time.perf_counter()
+
+    stats = requests.get(f"{base_url}/stats").json()
+    print(json.dumps({
+        'scan_seconds': scanned - started,
+        'total_seconds': finished - started,
+        'page_latencies': page_latencies,
+        'requests': stats['requests'],
+        'total_requests': stats['total_requests'],
+        'blocks': app.total_blocks.value(),
+        'pending_blocks': len(app.block_executor),
+        'errors': app.error_count.value(),
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }))
+
+def benchmark(mentions, args):
+    """Run one dataset size and return its summary"""
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=serve,
+        args=(port_queue, mentions, args.authors or mentions // 4, args.latency, args.x_limits),
+        daemon=True
+    )
+    server.start()
+    try:
+        base_url = f"http://127.0.0.1:{port_queue.get(timeout=10)}"
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run-scan', base_url, '--max-drain', str(args.max_drain)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Scan run failed:\n{proc.stderr}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        server.terminate()
+        server.join()
+
+    latencies = result.pop('page_latencies')
+    return {
+        'mentions': mentions,
+        'mentions_per_sec': mentions / result['total_seconds'] if result['total_seconds'] else 0.0,
+        'api_calls_per_mention': result['total_requests'] / mentions,
+        'p50_page_ms': percentile(latencies, 50) * 1000,
+        'p99_page_ms': percentile(latencies, 99) * 1000,
+        **result
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end scan throughput benchmark against a fake X API")
+    parser.add_argument('--mentions', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--authors', type=int, default=0, help="distinct mention authors (default: mentions / 4)")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds of server latency per request")
+    parser.add_argument('--x-limits', action='store_true', help="enforce the real X API request limits")
+    parser.add_argument('--max-drain', type=float, default=300, help="longest time (s) spent draining the block queue")
+    parser.add_argument('--json', help="also write the results to this file")
+    parser.add_argument('--run-scan', metavar='BASE_URL', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scan:
+        run_scan(args.run_scan, args.max_drain)
+        return
+
+    results = []
+    print(f"{'mentions':>9} {'mentions/s':>11} {'calls/mention':>14} {'p50 page ms':>12} {'p99 page ms':>12} {'peak RSS MB':>12} {'blocks':>7}")
+    for mentions in args.mentions:
+        result = benchmark(mentions, args)
+        results.append(result)
+        print(f"{mentions:>9} {result['mentions_per_sec']:>11.1f} {result['api_calls_per_mention']:>14.3f} "
+              f"{result['p50_page_ms']:>12.1f} {result['p99_page_ms']:>12.1f} {result['peak_rss_mb']:>12.1f} "
+              f"{result['blocks']:>7}", flush=True)
+        if result['pending_blocks'] or result['errors']:
+            print(f"{'':>9} {result['pending_blocks']} blocks still pending, {result['errors']} errors")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
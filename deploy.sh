@@ -48,13 +48,10 @@ python -m pytest tests/
 echo "🤖 Starting X Bot Blocker..."
 nohup python src/x_bot_blocker/x_bot_blocker.py > logs/bot_blocker.log 2>&1 &
 
-# Get the process ID
+# Get the process ID (the bot writes bot.pid itself once it can take scan requests)
 BOT_PID=$!
 
-# Save the PID
-echo $BOT_PID > bot.pid
-
 echo "✅ Deployment complete!"
 echo "📋 Bot is running with PID: $BOT_PID"
 echo "📝 Logs are being written to: logs/bot_blocker.log"
-echo "💡 To stop the bot, run: kill $(cat bot.pid)" 
\ No newline at end of file
+echo "💡 To stop the bot, run: kill $BOT_PID" 
\ No newline at end of file
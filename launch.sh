@@ -9,8 +9,8 @@ source myenv/bin/activate
 # Start the bot with nohup and redirect output to bot.log
 nohup python3 src/x_bot_blocker/x_bot_blocker.py > bot.log 2>&1 &
 
-# Save the process ID
-echo $! > bot.pid
+# The bot writes its own process ID to bot.pid once it can take scan requests
+BOT_PID=$!
 
 # Log the start
-echo "Bot started with PID $(cat bot.pid) at $(date)" >> bot.log 
\ No newline at end of file
+echo "Bot started with PID $BOT_PID at $(date)" >> bot.log 
\ No newline at end of file
@@ -0,0 +1,109 @@
+import time
+import logging
+from typing import Dict, Optional
+
+class AdaptiveInterval:
+    """
+    Picks the next mention scan interval from what the last scans saw.
+
+    - Volume: aim for about target_mentions new mentions per scan, from the
+      mention arrival rate (the latest rate when it spikes, else its average).
+    - Bot ratio: a scan whose share of bots among the distinct authors it
+      screened reaches raid_bot_ratio drops the interval straight to the floor.
+    - Idle: the interval grows by at most `backoff` per scan up to the ceiling.
+    - Budget: never faster than the endpoint's remaining calls allow before
+      the rate limit window resets.
+
+    Intervals are in seconds.
+    """
+
+    def __init__(self, base_interval: float, min_interval: float, max_interval: float,
+                 rate_limiter=None, endpoint: str = 'statuses/mentions_timeline',
+                 target_mentions: int = 200, raid_bot_ratio: float = 0.2,
+                 min_sample: int = 10, backoff: float = 1.5, smoothing: float = 0.5):
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("Need 0 < min_interval <= max_interval")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = max(min_interval, min(max_interval, base_interval))
+        self.rate_limiter = rate_limiter
+        self.endpoint = endpoint
+        self.target_mentions = max(1, target_mentions)
+        self.raid_bot_ratio = raid_bot_ratio
+        self.min_sample = min_sample
+        self.backoff = max(1.0, backoff)
+        self.smoothing = smoothing
+        self.logger = logging.getLogger(__name__)
+
+        self.arrival_rate: Optional[float] = None  # mentions per second, smoothed
+        self.latest_rate: Optional[float] = None
+        self.bot_ratio = 0.0
+        self.calls_per_scan = 1.0
+        self._last_scan: Optional[float] = None
+
+    def _smooth(self, average: Optional[float], value: float) -> float:
+        return value if average is None else self.smoothing * value + (1 - self.smoothing) * average
+
+    def record_scan(self, mentions: int, flagged: int, calls: int = 1, now: Optional[float] = None,
+                    authors: Optional[int] = None) -> float:
+        """
+        Record a finished scan: mentions screened, bots flagged among their
+        distinct authors (all mentions if authors is None) and API calls
+        (pages) it took. Returns the next interval.
+        """
+        now = time.time() if now is None else now
+        if self._last_scan is not None:
+            self.latest_rate = mentions / max(now - self._last_scan, 1.0)
+            self.arrival_rate = self._smooth(self.arrival_rate, self.latest_rate)
+        self._last_scan = now
+        authors = mentions if authors is None else authors
+        self.bot_ratio = flagged / authors if authors >= self.min_sample else 0.0
+        self.calls_per_scan = self._smooth(self.calls_per_scan, max(calls, 1))
+        return self._update(now)
+
+    def record_rate_limit(self, now: Optional[float] = None) -> float:
+        """Re-plan after a rate-limited scan; returns the next interval"""
+        return self._update(time.time() if now is None else now)
+
+    def _desired(self) -> float:
+        if self.bot_ratio >= self.raid_bot_ratio:
+            return self.min_interval
+        if self.arrival_rate is None:
+            return self.interval
+        rate = max(self.arrival_rate, self.latest_rate or 0.0)
+        if rate <= 0:
+            return self.max_interval
+        return self.target_mentions / rate
+
+    def budget_floor(self, now: Optional[float] = None) -> float:
+        """Shortest interval the endpoint's remaining budget allows"""
+        if self.rate_limiter is None:
+            return 0.0
+        status = self.rate_limiter.get_status().get(self.endpoint)
+        if status is None:
+            return 0.0
+        now = time.time() if now is None else now
+        until_reset = max(status['reset_at'] - now, 0.0)
+        if status['remaining'] < self.calls_per_scan:
+            return until_reset
+        # Spread the remaining calls evenly over the rest of the window
+        return until_reset * self.calls_per_scan / status['remaining']
+
+    def _update(self, now: float) -> float:
+        # Speed up at once, back off gradually
+        desired = min(self._desired(), self.interval * self.backoff)
+        interval = max(self.min_interval, min(self.max_interval, desired))
+        interval = max(interval, self.budget_floor(now))
+        if abs(interval - self.interval) >= 1:
+            self.logger.info(f"Scan interval {self.interval / 60:.1f} -> {interval / 60:.1f} minutes")
+        self.interval = interval
+        return interval
+
+    def get_stats(self) -> Dict:
+        """Get the current interval and the signals behind it"""
+        return {
+            'interval_minutes': round(self.interval / 60, 2),
+            'mentions_per_minute': round((self.arrival_rate or 0.0) * 60, 2),
+            'bot_ratio': round(self.bot_ratio, 3),
+            'calls_per_scan': round(self.calls_per_scan, 2)
+        }
@@ -0,0 +1,173 @@
+import os
+import gzip
+import json
+import logging
+import zlib
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+
+def request_key(method: str, url: str, body=None) -> str:
+    """
+    Identify a request by method, path and sorted query/form parameters.
+    OAuth signatures live in the Authorization header, so keys are stable
+    across runs.
+    """
+    parsed = urlparse(url)
+    params = parse_qsl(parsed.query, keep_blank_values=True)
+    if body:
+        if isinstance(body, bytes):
+            body = body.decode('utf-8', errors='replace')
+        if isinstance(body, str):
+            params += parse_qsl(body, keep_blank_values=True)
+    return f"{method.upper()} {parsed.path}?" + "&".join(f"{k}={v}" for k, v in sorted(params))
+
+def read_archive(archive_path: str) -> Iterator[dict]:
+    """
+    Read the entries of an ApiRecorder archive. An archive cut short by a
+    crash or kill ends at its last complete entry instead of failing.
+    """
+    logger = logging.getLogger(__name__)
+    with gzip.open(archive_path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line of an interrupted recording
+                    logger.warning(f"Skipping incomplete entry in {archive_path}")
+                    continue
+                yield entry
+        except (EOFError, zlib.error, gzip.BadGzipFile):
+            logger.warning(f"{archive_path} was not closed cleanly; replaying the entries before the cut")
+
+class ApiRecorder:
+    """
+    Records every X API request and response (status, headers including
+    x-rate-limit-*, body) to a gzip-compressed JSON lines archive. Each entry
+    is flushed as it is written, so the archive of a recording process that
+    crashes or is killed can still be replayed up to its last entry.
+    """
+
+    def __init__(self, archive_path: str):
+        os.makedirs(os.path.dirname(archive_path) or '.', exist_ok=True)
+        self.archive_path = archive_path
+        self.logger = logging.getLogger(__name__)
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(archive_path, 'wt', encoding='utf-8')
+
+    def attach(self, session) -> None:
+        """Record all responses of a requests session (e.g. tweepy.API.session)"""
+        session.hooks['response'].append(self._on_response)
+
+    def _on_response(self, response, *args, **kwargs):
+        request = response.request
+        entry = {
+            'key': request_key(request.method, request.url, request.body),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+            'body': response.content.decode('utf-8', errors='replace')
+        }
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(json.dumps(entry) + "\n")
+                self._file.flush()
+                self.count += 1
+        return response
+
+    def close(self) -> None:
+        """Finish the archive"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                self.logger.info(f"Recorded {self.count} API responses to {self.archive_path}")
+
+class ReplayMiss(ConnectionError):
+    """Raised when a request has no (remaining) recorded response"""
+
+class ApiReplayer(BaseAdapter):
+    """
+    requests transport adapter serving responses from an ApiRecorder archive,
+    so the real pipeline runs offline. Responses to the same request are
+    served in recorded order; the last one is repeated once they run out.
+    """
+
+    def __init__(self, archive_path: str, repeat_last: bool = True):
+        super().__init__()
+        self.archive_path = archive_path
+        self.repeat_last = repeat_last
+        self.logger = logging.getLogger(__name__)
+        self.stats = {'served': 0, 'misses': 0}
+        self._lock = threading.Lock()
+        self._responses: Dict[str, deque] = defaultdict(deque)
+        for entry in read_archive(archive_path):
+            self._responses[entry['key']].append(entry)
+
+    def attach(self, session) -> None:
+        """Route all HTTP(S) requests of a session to the archive"""
+        session.mount('https://', self)
+        session.mount('http://', self)
+
+    def _next_entry(self, key: str) -> Optional[dict]:
+        with self._lock:
+            queue = self._responses.get(key)
+            if not queue:
+                self.stats['misses'] += 1
+                return None
+            self.stats['served'] += 1
+            if len(queue) == 1 and self.repeat_last:
+                return queue[0]
+            return queue.popleft()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = request_key(request.method, request.url, request.body)
+        entry = self._next_entry(key)
+        if entry is None:
+            raise ReplayMiss(f"No recorded response for {key}", request=request)
+
+        response = Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason')
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        # The archived body is already decoded
+        response.headers.pop('content-encoding', None)
+        response._content = entry['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self) -> None:
+        pass
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get how many requests were served from the archive or missed"""
+        with self._lock:
+            return dict(self.stats)
+
+def setup_api_traffic(session, mode: str, archive_path: str) -> Tuple[Optional[ApiRecorder], Optional[ApiReplayer]]:
+    """
+    Attach recording or replay to a session.
+    mode: 'off', 'record' or 'replay'
+    """
+    if mode == 'record':
+        recorder = ApiRecorder(archive_path)
+        recorder.attach(session)
+        return recorder, None
+    if mode == 'replay':
+        replayer = ApiReplayer(archive_path)
+        replayer.attach(session)
+        return None, replayer
+    if mode not in ('off', '', None):
+        raise ValueError(f"Unknown API traffic mode: {mode}")
+    return None, None
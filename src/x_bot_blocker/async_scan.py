@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from typing import Dict, List
+
+try:
+    # Run by the bot script, with src/x_bot_blocker on sys.path
+    from bot_detection import LOOKUP_BATCH_SIZE
+except ImportError:
+    from x_bot_blocker.bot_detection import LOOKUP_BATCH_SIZE
+
+class AsyncScanEngine:
+    """
+    Runs the blocking tweepy calls of a scan concurrently on worker threads,
+    bounded by a semaphore. The BotDetector hydrates users through it, so
+    verdicts, caching and coalescing are identical to the sequential path.
+    """
+
+    def __init__(self, api, max_concurrency: int = 8):
+        self.api = api
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.logger = logging.getLogger(__name__)
+
+    async def _call(self, semaphore: asyncio.Semaphore, fn, *args, **kwargs):
+        """Run a blocking API call on a worker thread once a concurrency slot is free"""
+        async with semaphore:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
+    async def hydrate_users(self, user_ids: List[str]) -> Dict:
+        """Fetch profiles with concurrent 100-ID lookup calls"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        user_ids = list(dict.fromkeys(user_ids))
+        batches = [user_ids[i:i + LOOKUP_BATCH_SIZE] for i in range(0, len(user_ids), LOOKUP_BATCH_SIZE)]
+        responses = await asyncio.gather(*(
+            self._call(semaphore, self.api.lookup_users, user_id=batch)
+            for batch in batches
+        ))
+        return {str(user.id): user for response in responses for user in response}
+
+    def lookup_users(self, user_ids: List[str]) -> Dict:
+        """Blocking entry point for hydrate_users (BotDetector.lookup_users)"""
+        if not user_ids:
+            return {}
+        return asyncio.run(self.hydrate_users(user_ids))
+
+    async def gather_timelines(self, user_ids: List[str], count: int = 200) -> Dict[str, object]:
+        """Fetch recent tweets for several users concurrently; a failed fetch yields its exception"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        user_ids = list(dict.fromkeys(user_ids))
+        responses = await asyncio.gather(*(
+            self._call(semaphore, self.api.user_timeline, user_id=user_id, count=count)
+            for user_id in user_ids
+        ), return_exceptions=True)
+        return dict(zip(user_ids, responses))
+
+    def fetch_timelines(self, user_ids: List[str], count: int = 200) -> Dict[str, object]:
+        """Blocking entry point for gather_timelines (DetectionCascade.fetch_timelines)"""
+        if not user_ids:
+            return {}
+        return asyncio.run(self.gather_timelines(user_ids, count))
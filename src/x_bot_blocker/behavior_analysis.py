@@ -103,7 +103,7 @@ class BehaviorAnalyzer:
                 
         # Check for rapid follower growth
         if hasattr(user, 'created_at'):
-            account_age = (datetime.now() - user.created_at).days
+            account_age = (datetime.now(user.created_at.tzinfo) - user.created_at).days
             if account_age > 0:
                 followers_per_day = user.followers_count / account_age
                 if followers_per_day > self.settings.get('max_followers_per_day', 100):
@@ -0,0 +1,204 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+# Sliding window for the daily block cap (seconds)
+DAILY_WINDOW = 86400
+
+class BlockExecutor:
+    """
+    Persistent queue of pending blocks drained by a background worker at a
+    fixed pace, independent of detection. Enforces a sliding 24-hour block cap
+    and retries failed blocks with exponential backoff.
+    """
+
+    def __init__(self, api, db_path: Optional[str] = None, max_blocks_per_day: int = 1000,
+                 pace: float = 60, retry_delay: float = 5, max_retries: int = 3,
+                 on_blocked: Optional[Callable] = None, on_error: Optional[Callable] = None,
+                 is_rate_limit_error: Optional[Callable] = None):
+        if db_path is None:
+            # Get the project root directory (two levels up from this file)
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            db_path = os.path.join(project_root, 'data', 'block_queue.db')
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+        self.api = api
+        self.db_path = db_path
+        self.max_blocks_per_day = max_blocks_per_day
+        self.pace = pace
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        self.on_blocked = on_blocked
+        self.on_error = on_error
+        self.is_rate_limit_error = is_rate_limit_error or (lambda e: False)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = None
+        self._last_attempt = 0.0
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS pending_blocks (
+                user_id TEXT PRIMARY KEY,
+                score REAL,
+                reason TEXT,
+                enqueued_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS block_history (blocked_at REAL NOT NULL)")
+        self._conn.execute("DELETE FROM block_history WHERE blocked_at <= ?", (time.time() - DAILY_WINDOW,))
+        self._conn.commit()
+
+        self._pending = {row[0] for row in self._conn.execute("SELECT user_id FROM pending_blocks")}
+        self._history = deque(row[0] for row in self._conn.execute("SELECT blocked_at FROM block_history ORDER BY blocked_at"))
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._pending
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, user_id: str, score: Optional[float] = None, reason: Optional[str] = None) -> bool:
+        """Queue a block; returns False if the user is already pending"""
+        with self._lock:
+            if user_id in self._pending:
+                return False
+            now = time.time()
+            self._conn.execute(
+                "INSERT INTO pending_blocks (user_id, score, reason, enqueued_at, attempts, next_attempt_at) VALUES (?, ?, ?, ?, 0, ?)",
+                (user_id, score, reason, now, now)
+            )
+            self._conn.commit()
+            self._pending.add(user_id)
+        self._wakeup.set()
+        return True
+
+    def blocks_in_window(self, now: Optional[float] = None) -> int:
+        """Number of blocks issued in the last 24 hours"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._prune_history(now)
+            return len(self._history)
+
+    def _prune_history(self, now: float) -> None:
+        while self._history and self._history[0] <= now - DAILY_WINDOW:
+            self._history.popleft()
+
+    def _next_due(self):
+        return self._conn.execute(
+            "SELECT user_id, score, reason, attempts, next_attempt_at FROM pending_blocks ORDER BY next_attempt_at, enqueued_at LIMIT 1"
+        ).fetchone()
+
+    def process_next(self) -> float:
+        """
+        Issue the next due block, if any.
+        Returns: seconds to wait before calling again
+        """
+        now = time.time()
+        if now - self._last_attempt < self.pace:
+            return self._last_attempt + self.pace - now
+        
+        with self._lock:
+            self._prune_history(now)
+            if len(self._history) >= self.max_blocks_per_day:
+                return self._history[0] + DAILY_WINDOW - now
+            row = self._next_due()
+        if row is None:
+            return self.pace
+
+        user_id, score, reason, attempts, next_attempt_at = row
+        if next_attempt_at > now:
+            return next_attempt_at - now
+
+        self._last_attempt = now
+        try:
+            self.api.create_block(user_id=user_id)
+        except Exception as e:
+            self._handle_failure(user_id, attempts, e)
+            return self.pace
+
+        blocked_at = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM pending_blocks WHERE user_id = ?", (user_id,))
+            self._conn.execute("INSERT INTO block_history (blocked_at) VALUES (?)", (blocked_at,))
+            self._conn.commit()
+            self._pending.discard(user_id)
+            self._history.append(blocked_at)
+        if self.on_blocked:
+            self.on_blocked(user_id, score, reason)
+        return self.pace
+
+    def _handle_failure(self, user_id: str, attempts: int, e: Exception) -> None:
+        """Reschedule a failed block, or drop it once retries are exhausted"""
+        if self.is_rate_limit_error(e):
+            # Rate limits are not the block's fault: wait for the reset without using up a retry
+            retry_at = getattr(e, 'reset_time', None) or time.time() + self.retry_delay
+            with self._lock:
+                self._conn.execute("UPDATE pending_blocks SET next_attempt_at = ? WHERE user_id = ?", (retry_at, user_id))
+                self._conn.commit()
+            if self.on_error:
+                self.on_error(user_id, e)
+            return
+
+        attempts += 1
+        with self._lock:
+            if attempts >= self.max_retries:
+                self._conn.execute("DELETE FROM pending_blocks WHERE user_id = ?", (user_id,))
+                self._pending.discard(user_id)
+                self.logger.error(f"Giving up on blocking user {user_id} after {attempts} attempts: {str(e)}")
+            else:
+                retry_at = time.time() + self.retry_delay * (2 ** (attempts - 1))
+                self._conn.execute(
+                    "UPDATE pending_blocks SET attempts = ?, next_attempt_at = ? WHERE user_id = ?",
+                    (attempts, retry_at, user_id)
+                )
+            self._conn.commit()
+        if self.on_error:
+            self.on_error(user_id, e)
+
+    def _run(self) -> None:
+        """Background worker loop"""
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            try:
+                wait = self.process_next()
+            except Exception as e:
+                self.logger.error(f"Error in block executor: {str(e)}")
+                wait = self.pace
+            if wait > 0:
+                # New blocks wake an idle worker; process_next still enforces the pace
+                self._wakeup.wait(wait)
+
+    def start(self) -> None:
+        """Start draining the queue in a background thread"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stopped.clear()
+        self._worker = threading.Thread(target=self._run, name='block-executor', daemon=True)
+        self._worker.start()
+        self.logger.info(f"Block executor started with {len(self._pending)} pending blocks")
+
+    def stop(self, timeout: float = 5) -> None:
+        """Stop the background worker; pending blocks stay on disk"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def get_status(self) -> Dict[str, int]:
+        """Get queue depth and usage of the daily cap"""
+        return {
+            'pending': len(self._pending),
+            'blocks_last_24h': self.blocks_in_window(),
+            'max_blocks_per_day': self.max_blocks_per_day
+        }
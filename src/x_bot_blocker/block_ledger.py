@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Iterable, Optional, Set
+
+class BlockLedger:
+    """
+    On-disk record of every account we have blocked (SQLite in WAL mode).
+    Blocked IDs are also kept in memory so the pre-fetch check is O(1).
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        if db_path is None:
+            # Get the project root directory (two levels up from this file)
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            db_path = os.path.join(project_root, 'data', 'blocked_accounts.db')
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS blocked_accounts (
+                user_id TEXT PRIMARY KEY,
+                blocked_at TEXT NOT NULL,
+                score REAL,
+                reason TEXT
+            )"""
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS ledger_meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+        self._blocked: Set[str] = {row[0] for row in self._conn.execute("SELECT user_id FROM blocked_accounts")}
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._blocked
+
+    def __len__(self) -> int:
+        return len(self._blocked)
+
+    def is_blocked(self, user_id: str) -> bool:
+        """Check whether a user has already been blocked"""
+        return user_id in self._blocked
+
+    def record_block(self, user_id: str, score: Optional[float] = None, reason: Optional[str] = None) -> None:
+        """Record a block we just issued"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blocked_accounts (user_id, blocked_at, score, reason) VALUES (?, ?, ?, ?)",
+                (user_id, datetime.now().isoformat(), score, reason)
+            )
+            self._conn.commit()
+            self._blocked.add(user_id)
+
+    def seed(self, user_ids: Iterable, reason: str = "Existing block") -> int:
+        """Add blocks that already exist on the account; returns how many were new"""
+        now = datetime.now().isoformat()
+        rows = [(str(user_id), now, None, reason) for user_id in user_ids if str(user_id) not in self._blocked]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO blocked_accounts (user_id, blocked_at, score, reason) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._blocked.update(row[0] for row in rows)
+        return len(rows)
+
+    def is_seeded(self) -> bool:
+        """Check whether the account's existing blocks have been imported"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM ledger_meta WHERE key = 'seeded_at'").fetchone()
+        return row is not None
+
+    def mark_seeded(self) -> None:
+        """Remember that the account's existing blocks have been imported"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ledger_meta (key, value) VALUES ('seeded_at', ?)",
+                (datetime.now().isoformat(),)
+            )
+            self._conn.commit()
+
+    def get_entry(self, user_id: str) -> Optional[dict]:
+        """Get the stored block record for a user"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT user_id, blocked_at, score, reason FROM blocked_accounts WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'user_id': row[0], 'blocked_at': row[1], 'score': row[2], 'reason': row[3]}
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -4,99 +4,515 @@ from datetime import datetime
 from typing import List, Dict, Tuple, Optional
 import yaml
 import os
+import time
+import threading
+from collections import OrderedDict, deque
+
+# Maximum number of user IDs accepted by a single users lookup call
+LOOKUP_BATCH_SIZE = 100
+
+# Score added by each profile heuristic (bot_detection.heuristic_weights overrides these)
+HEURISTIC_WEIGHTS = {
+    'new_account': 0.3,
+    'low_followers': 0.2,
+    'following_ratio': 0.2,
+    'low_tweets': 0.2,
+    'default_image': 0.1
+}
+
+def profile_fingerprint(user) -> Tuple:
+    """Cheap summary of the profile fields that feed into a verdict"""
+    return (
+        getattr(user, 'followers_count', None),
+        getattr(user, 'friends_count', None),
+        getattr(user, 'statuses_count', None),
+        getattr(user, 'profile_image_url_https', None) or getattr(user, 'profile_image_url', None),
+        getattr(user, 'description', None)
+    )
+
+class DetectionPolicy:
+    """Profile heuristic thresholds and weights; scores an already-fetched user without API calls"""
+
+    def __init__(self, name: str = 'primary', min_account_age: int = 30, min_followers: int = 10,
+                 max_following_ratio: float = 10, min_tweets: int = 5, bot_threshold: float = 0.7,
+                 weights: Optional[Dict[str, float]] = None):
+        self.name = name
+        self.min_account_age = min_account_age
+        self.min_followers = min_followers
+        self.max_following_ratio = max_following_ratio
+        self.min_tweets = min_tweets
+        self.bot_threshold = bot_threshold
+        unknown = set(weights or {}) - set(HEURISTIC_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown heuristic weights in policy {name}: {', '.join(sorted(unknown))}")
+        self.weights = {**HEURISTIC_WEIGHTS, **(weights or {})}
+
+    @classmethod
+    def from_config(cls, settings: Dict, name: str = 'primary') -> 'DetectionPolicy':
+        """Build a policy from bot_detection settings (threshold keys and heuristic_weights)"""
+        return cls(
+            name,
+            min_account_age=settings.get('min_account_age_days', 30),
+            min_followers=settings.get('min_followers', 10),
+            max_following_ratio=settings.get('max_following_ratio', 10),
+            min_tweets=settings.get('min_tweets', 5),
+            bot_threshold=settings.get('bot_probability_threshold', 0.7),
+            weights=settings.get('heuristic_weights')
+        )
+
+    def score(self, user: tweepy.User) -> Tuple[bool, float, str]:
+        """
+        Score a user against the profile heuristics.
+        Returns: (is_bot, probability, reason)
+        """
+        # Basic profile checks
+        bot_score = 0.0
+        reasons = []
+        
+        # Account age check
+        created_at = user.created_at
+        # The API returns timezone-aware timestamps
+        account_age = (datetime.now(created_at.tzinfo) - created_at).days
+        if account_age < self.min_account_age:
+            bot_score += self.weights['new_account']
+            reasons.append(f"New account ({account_age} days old)")
+        
+        # Follower count check
+        if user.followers_count < self.min_followers:
+            bot_score += self.weights['low_followers']
+            reasons.append(f"Low follower count ({user.followers_count})")
+        
+        # Following ratio check
+        if user.followers_count > 0:
+            following_ratio = user.friends_count / user.followers_count
+            if following_ratio > self.max_following_ratio:
+                bot_score += self.weights['following_ratio']
+                reasons.append(f"High following ratio ({following_ratio:.1f})")
+        
+        # Tweet count check
+        if user.statuses_count < self.min_tweets:
+            bot_score += self.weights['low_tweets']
+            reasons.append(f"Low tweet count ({user.statuses_count})")
+        
+        # Default profile image check
+        if user.default_profile_image:
+            bot_score += self.weights['default_image']
+            reasons.append("Using default profile image")
+        
+        # Determine if user is a bot
+        is_bot = bot_score >= self.bot_threshold
+        reason = " | ".join(reasons) if reasons else "No suspicious indicators"
+        
+        return is_bot, bot_score, reason
+
+class ShadowEvaluator:
+    """
+    Scores every freshly fetched profile against extra detection policies
+    alongside the primary one, from the same user object (no extra API
+    calls), and counts where their verdicts disagree with the primary
+    profile verdict. Shadow verdicts never block anyone.
+    """
+
+    def __init__(self, policies: List[DetectionPolicy], max_samples: int = 20):
+        self.policies = policies
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=max_samples)
+        self.stats = {
+            policy.name: {'scored': 0, 'disagreements': 0, 'would_block': 0, 'would_spare': 0, 'score_delta': 0.0}
+            for policy in policies
+        }
+
+    @classmethod
+    def from_config(cls, settings: Dict, max_samples: int = 20) -> Optional['ShadowEvaluator']:
+        """
+        Build from bot_detection.shadow_policies; each entry overrides the
+        primary settings it names. None if no shadow policies are configured.
+        """
+        policies = []
+        for index, overrides in enumerate(settings.get('shadow_policies') or []):
+            merged = {**settings, **overrides}
+            merged['heuristic_weights'] = {**(settings.get('heuristic_weights') or {}), **(overrides.get('heuristic_weights') or {})}
+            policies.append(DetectionPolicy.from_config(merged, name=overrides.get('name', f"shadow_{index + 1}")))
+        return cls(policies, max_samples=max_samples) if policies else None
+
+    def evaluate(self, user_id: str, user: tweepy.User, primary: Tuple[bool, float, str]) -> Dict[str, Tuple[bool, float, str]]:
+        """
+        Score a user against every shadow policy and record disagreements with the primary verdict.
+        Returns: {policy name: (is_bot, probability, reason)}
+        """
+        verdicts = {}
+        for policy in self.policies:
+            try:
+                verdicts[policy.name] = policy.score(user)
+            except Exception as e:
+                self.logger.error(f"Error scoring user {user_id} with shadow policy {policy.name}: {str(e)}")
+
+        with self._lock:
+            for name, verdict in verdicts.items():
+                stats = self.stats[name]
+                stats['scored'] += 1
+                stats['score_delta'] += verdict[1] - primary[1]
+                if verdict[0] == primary[0]:
+                    continue
+                stats['disagreements'] += 1
+                stats['would_block' if verdict[0] else 'would_spare'] += 1
+                self._samples.append({
+                    'user_id': user_id,
+                    'policy': name,
+                    'primary': [primary[0], round(primary[1], 3)],
+                    'shadow': [verdict[0], round(verdict[1], 3)],
+                    'reason': verdict[2]
+                })
+                self.logger.debug(
+                    f"Shadow policy {name} {'would block' if verdict[0] else 'would spare'} user {user_id} "
+                    f"(primary {primary[1]:.2f}, shadow {verdict[1]:.2f})"
+                )
+        return verdicts
+
+    def get_stats(self) -> Dict:
+        """Get per-policy disagreement counts, mean score difference and recent disagreements"""
+        with self._lock:
+            policies = {}
+            for policy in self.policies:
+                stats = self.stats[policy.name]
+                scored = stats['scored']
+                policies[policy.name] = {
+                    'threshold': policy.bot_threshold,
+                    'scored': scored,
+                    'disagreements': stats['disagreements'],
+                    'would_block': stats['would_block'],
+                    'would_spare': stats['would_spare'],
+                    'agreement_rate': (1 - stats['disagreements'] / scored) * 100 if scored else 100.0,
+                    'mean_score_delta': stats['score_delta'] / scored if scored else 0.0
+                }
+            return {'policies': policies, 'recent_disagreements': list(self._samples)}
+
+class VerdictCache:
+    """Bounded LRU cache of verdicts keyed by user ID with separate bot/not-bot TTLs"""
+
+    def __init__(self, max_size: int = 10000, bot_ttl: float = 86400, human_ttl: float = 3600):
+        self.max_size = max_size
+        self.bot_ttl = bot_ttl
+        self.human_ttl = human_ttl
+        self._entries = OrderedDict()  # user_id -> (expires_at, fingerprint, verdict)
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0
+        }
+
+    def get(self, user_id: str, fingerprint: Optional[Tuple] = None) -> Optional[Tuple[bool, float, str]]:
+        """
+        Return the cached verdict for a user, or None on a miss.
+        A fingerprint that differs from the cached one invalidates the entry.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            
+            expires_at, cached_fingerprint, verdict = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return None
+            if fingerprint is not None and cached_fingerprint is not None and fingerprint != cached_fingerprint:
+                del self._entries[user_id]
+                self.stats['invalidations'] += 1
+                self.stats['misses'] += 1
+                return None
+            
+            self._entries.move_to_end(user_id)
+            self.stats['hits'] += 1
+            return verdict
+
+    def put(self, user_id: str, verdict: Tuple[bool, float, str], fingerprint: Optional[Tuple] = None) -> None:
+        """Cache a verdict, evicting the least recently used entries when full"""
+        ttl = self.bot_ttl if verdict[0] else self.human_ttl
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + ttl, fingerprint, verdict)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop a cached verdict"""
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.stats['invalidations'] += 1
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hit_rate': (self.stats['hits'] / lookups * 100) if lookups > 0 else 0.0
+            }
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same keys into one in-flight call per key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> (done event, result holder)
+        self.stats = {'calls': 0, 'shared': 0}
+
+    def do_many(self, keys: List[str], fn) -> Dict:
+        """
+        Run fn(keys) for the keys no other thread is working on, and wait for
+        and share the results of those already in flight. fn returns
+        {key: result}; keys it leaves out are left out of the result.
+        """
+        led = []
+        waiting = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                call = self._calls.get(key)
+                if call is None:
+                    self._calls[key] = (threading.Event(), {})
+                    led.append(key)
+                else:
+                    waiting.append((key, call))
+            self.stats['calls'] += len(led)
+            self.stats['shared'] += len(waiting)
+        
+        results = {}
+        error = None
+        try:
+            if led:
+                results.update(fn(led))
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                calls = [self._calls.pop(key) for key in led]
+            for key, (done, holder) in zip(led, calls):
+                if error is not None:
+                    holder['error'] = error
+                elif key in results:
+                    holder['result'] = results[key]
+                done.set()
+        
+        # Keys led by other threads; a thread only waits after finishing its own keys
+        for key, (done, holder) in waiting:
+            done.wait()
+            if 'error' in holder:
+                raise holder['error']
+            if 'result' in holder:
+                results[key] = holder['result']
+        return results
 
 class BotDetector:
-    def __init__(self, api: tweepy.API, config_path: str = "config.yaml"):
+    def __init__(self, api: tweepy.API, config_path: str = "config.yaml", detection_config: Optional[Dict] = None):
         self.api = api
         self.logger = logging.getLogger(__name__)
-        self.load_config(config_path)
+        # An already loaded bot_detection section (e.g. from the bot's ConfigManager) wins over config_path
+        if detection_config is not None:
+            self.apply_config(detection_config)
+        else:
+            self.load_config(config_path)
+        
+        # Verdict cache so repeat visitors are not fetched and scored again
+        self.verdict_cache = None
+        if self.cache_settings.get('enabled', True):
+            self.verdict_cache = VerdictCache(
+                max_size=self.cache_settings.get('max_size', 10000),
+                bot_ttl=self.cache_settings.get('bot_ttl', 86400),
+                human_ttl=self.cache_settings.get('human_ttl', 3600)
+            )
+        
+        # Shadow policies scored next to the primary one (bot_detection.shadow_policies)
+        self.shadow = ShadowEvaluator.from_config(self.detection_settings)
+        
+        # Concurrent scans asking for the same user share one lookup and verdict
+        self._single_flight = SingleFlight()
+        
+        # Optional AsyncScanEngine issuing the lookup calls of a batch concurrently
+        self.scan_engine = None
+        
+        # Optional DetectionCascade refining borderline profile verdicts
+        self.cascade = None
+        
+        # Optional ScoringPool scoring large batches in worker processes
+        self.scoring_pool = None
         
     def load_config(self, config_path: str):
         """Load configuration from YAML file"""
         try:
             with open(config_path, 'r') as f:
                 config = yaml.safe_load(f)
-                detection_config = config.get('bot_detection', {})
-                
-                # Load detection settings
-                self.min_account_age = detection_config.get('min_account_age_days', 30)
-                self.min_followers = detection_config.get('min_followers', 10)
-                self.max_following_ratio = detection_config.get('max_following_ratio', 10)
-                self.min_tweets = detection_config.get('min_tweets', 5)
-                self.bot_threshold = detection_config.get('bot_probability_threshold', 0.7)
-                
-                # Load whitelist/blacklist
-                self.whitelist = set(detection_config.get('whitelist', []))
-                self.blacklist = set(detection_config.get('blacklist', []))
-                
+            self.apply_config(config.get('bot_detection', {}) or {})
         except Exception as e:
             self.logger.error(f"Error loading config: {str(e)}")
             # Use default values
-            self.min_account_age = 30
-            self.min_followers = 10
-            self.max_following_ratio = 10
-            self.min_tweets = 5
-            self.bot_threshold = 0.7
+            self.detection_settings = {}
+            self.policy = DetectionPolicy()
             self.whitelist = set()
             self.blacklist = set()
+            self.cache_settings = {}
+
+    def apply_config(self, detection_config: Dict):
+        """Apply a bot_detection config section"""
+        # Load detection settings
+        self.detection_settings = detection_config
+        self.policy = DetectionPolicy.from_config(detection_config)
+        
+        # Load whitelist/blacklist
+        self.whitelist = set(detection_config.get('whitelist', []))
+        self.blacklist = set(detection_config.get('blacklist', []))
+        
+        # Load verdict cache settings
+        self.cache_settings = detection_config.get('verdict_cache', {}) or {}
 
     def analyze_user(self, user_id: str) -> Tuple[bool, float, str]:
         """
-        Analyze a user to determine if they are a bot.
+        Analyze a single user to determine if they are a bot (see analyze_user_ids).
         Returns: (is_bot, probability, reason)
         """
         try:
-            # Check whitelist/blacklist first
-            if user_id in self.whitelist:
-                return False, 0.0, "User in whitelist"
-            if user_id in self.blacklist:
-                return True, 1.0, "User in blacklist"
-
-            # Get user data
-            user = self.api.get_user(user_id=user_id)
-            
-            # Basic profile checks
-            bot_score = 0.0
-            reasons = []
-            
-            # Account age check
-            created_at = user.created_at
-            account_age = (datetime.now() - created_at).days
-            if account_age < self.min_account_age:
-                bot_score += 0.3
-                reasons.append(f"New account ({account_age} days old)")
-            
-            # Follower count check
-            if user.followers_count < self.min_followers:
-                bot_score += 0.2
-                reasons.append(f"Low follower count ({user.followers_count})")
-            
-            # Following ratio check
-            if user.followers_count > 0:
-                following_ratio = user.friends_count / user.followers_count
-                if following_ratio > self.max_following_ratio:
-                    bot_score += 0.2
-                    reasons.append(f"High following ratio ({following_ratio:.1f})")
-            
-            # Tweet count check
-            if user.statuses_count < self.min_tweets:
-                bot_score += 0.2
-                reasons.append(f"Low tweet count ({user.statuses_count})")
-            
-            # Default profile image check
-            if user.default_profile_image:
-                bot_score += 0.1
-                reasons.append("Using default profile image")
-            
-            # Determine if user is a bot
-            is_bot = bot_score >= self.bot_threshold
-            reason = " | ".join(reasons) if reasons else "No suspicious indicators"
-            
-            return is_bot, bot_score, reason
-            
+            verdict = self.analyze_user_ids([user_id]).get(user_id)
         except tweepy.TweepyException as e:
             self.logger.error(f"Error analyzing user {user_id}: {str(e)}")
             return False, 0.0, f"Error analyzing user: {str(e)}"
+        return verdict if verdict is not None else (False, 0.0, "User not found")
+
+    @property
+    def bot_threshold(self) -> float:
+        return self.policy.bot_threshold
+
+    def score_user(self, user: tweepy.User) -> Tuple[bool, float, str]:
+        """
+        Score an already-fetched user object against the primary policy's profile heuristics.
+        Returns: (is_bot, probability, reason)
+        """
+        return self.policy.score(user)
+
+    def _refine_and_cache(self, users: Dict[str, tweepy.User], verdicts: Dict[str, Tuple[bool, float, str]]) -> Dict[str, Tuple[bool, float, str]]:
+        """Run the cascade on a batch of profile verdicts and remember the results"""
+        # Shadow policies see the same profiles; only the primary verdicts below can block
+        if self.shadow is not None:
+            for user_id, verdict in verdicts.items():
+                self.shadow.evaluate(user_id, users[user_id], verdict)
+        if self.cascade is not None:
+            refined = self.cascade.refine_batch(users, verdicts, self.bot_threshold)
+        else:
+            refined = {user_id: (verdict, True) for user_id, verdict in verdicts.items()}
+        
+        results = {}
+        for user_id, (verdict, complete) in refined.items():
+            # Verdicts with a skipped (rate limited) stage are not cached
+            if self.verdict_cache is not None and complete:
+                self.verdict_cache.put(user_id, verdict, profile_fingerprint(users[user_id]))
+            results[user_id] = verdict
+        return results
+
+    def lookup_users(self, user_ids: List[str]) -> Dict[str, tweepy.User]:
+        """
+        Hydrate user profiles in batches using the users lookup endpoint
+        (concurrently through the scan engine, if set).
+        Whitelisted/blacklisted IDs are skipped since they never need a profile.
+        Returns: {user_id: user}
+        """
+        pending = [
+            user_id for user_id in dict.fromkeys(user_ids)
+            if user_id not in self.whitelist and user_id not in self.blacklist
+        ]
+        if self.scan_engine is not None:
+            return self.scan_engine.lookup_users(pending)
+        
+        users = {}
+        for start in range(0, len(pending), LOOKUP_BATCH_SIZE):
+            batch = pending[start:start + LOOKUP_BATCH_SIZE]
+            for user in self.api.lookup_users(user_id=batch):
+                users[str(user.id)] = user
+        return users
+
+    def analyze_users(self, users: Dict[str, tweepy.User], use_cache: bool = True) -> Dict[str, Tuple[bool, float, str]]:
+        """
+        Analyze a batch of already-hydrated users, caching the verdicts.
+        Cached verdicts are reused unless use_cache is False (for users the
+        caller has just missed in the cache). Profile scoring runs in the
+        scoring pool if one is set, and borderline verdicts go through the cascade.
+        Returns: {user_id: (is_bot, probability, reason)}
+        """
+        results = {}
+        pending = {}
+        for user_id, user in users.items():
+            if user_id in self.whitelist:
+                results[user_id] = (False, 0.0, "User in whitelist")
+            elif user_id in self.blacklist:
+                results[user_id] = (True, 1.0, "User in blacklist")
+            else:
+                cached = None
+                if use_cache and self.verdict_cache is not None:
+                    cached = self.verdict_cache.get(user_id, profile_fingerprint(user))
+                if cached is not None:
+                    results[user_id] = cached
+                else:
+                    pending[user_id] = user
+        
+        if self.scoring_pool is not None:
+            verdicts = self.scoring_pool.score_profiles(pending)
+        else:
+            verdicts = {user_id: self.score_user(user) for user_id, user in pending.items()}
+        results.update(self._refine_and_cache(pending, verdicts))
+        return results
+
+    def analyze_user_ids(self, user_ids: List[str], known_users: Optional[Dict] = None) -> Dict[str, Tuple[bool, float, str]]:
+        """
+        Hydrate and analyze a batch of user IDs with one lookup call per 100 users.
+        Cached verdicts are reused without a lookup; known_users (e.g. the user
+        objects embedded in mentions) supply fingerprints to detect profile changes.
+        Users the lookup endpoint does not return (suspended, deleted) are omitted.
+        A user already being looked up for another thread (another scan, a
+        webhook batch) is not looked up again; its verdict is shared.
+        Returns: {user_id: (is_bot, probability, reason)}
+        """
+        results, pending = self.resolve_without_lookup(user_ids, known_users)
+        results.update(self._single_flight.do_many(
+            pending,
+            lambda user_ids: self.analyze_users(self.lookup_users(user_ids), use_cache=False)
+        ))
+        return results
+
+    def resolve_without_lookup(self, user_ids: List[str], known_users: Optional[Dict] = None) -> Tuple[Dict[str, Tuple[bool, float, str]], List[str]]:
+        """
+        Resolve every verdict that needs no profile fetch (lists and cached verdicts).
+        Returns: ({user_id: verdict}, [user IDs that still need hydrating])
+        """
+        known_users = known_users or {}
+        results = {}
+        pending = []
+        for user_id in dict.fromkeys(user_ids):
+            if user_id in self.whitelist:
+                results[user_id] = (False, 0.0, "User in whitelist")
+            elif user_id in self.blacklist:
+                results[user_id] = (True, 1.0, "User in blacklist")
+            else:
+                cached = None
+                if self.verdict_cache is not None:
+                    known = known_users.get(user_id)
+                    cached = self.verdict_cache.get(user_id, profile_fingerprint(known) if known is not None else None)
+                if cached is not None:
+                    results[user_id] = cached
+                else:
+                    pending.append(user_id)
+        return results, pending
+
+    def get_cache_stats(self) -> Dict[str, float]:
+        """Get verdict cache counters (empty when the cache is disabled)"""
+        return self.verdict_cache.get_stats() if self.verdict_cache is not None else {}
 
     def get_recent_interactions(self, user_id: str) -> List[Dict]:
         """Get recent interactions with the user"""
@@ -0,0 +1,173 @@
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+class DetectionCascade:
+    """
+    Refines a profile verdict with progressively more expensive stages:
+    timeline behavior analysis (one timeline call) and then profile image
+    analysis (image download plus OpenCV). Each stage only runs while the
+    running score is within confidence_margin of the bot threshold.
+    """
+
+    def __init__(self, api, behavior_analyzer=None, image_analyzer=None, confidence_margin: float = 0.15,
+                 timeline_count: int = 50, weights: Optional[Dict[str, float]] = None,
+                 is_rate_limit_error=None):
+        self.api = api
+        self.behavior_analyzer = behavior_analyzer
+        self.image_analyzer = image_analyzer
+        self.confidence_margin = confidence_margin
+        self.timeline_count = timeline_count
+        self.weights = {'profile': 1.0, 'behavior': 0.5, 'image': 0.25, **(weights or {})}
+        self.is_rate_limit_error = is_rate_limit_error or (lambda e: False)
+        # Optional AsyncScanEngine fetching the timelines of a batch concurrently
+        self.scan_engine = None
+        # Optional ScoringPool analyzing the timelines of a batch in worker processes
+        self.scoring_pool = None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.stats = {
+            'profile': 0,
+            'behavior': 0,
+            'image': 0,
+            'early_exits': 0,
+            'stage_errors': 0
+        }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def is_confident(self, score: float, threshold: float) -> bool:
+        """Check whether a score is far enough from the threshold to stop"""
+        return abs(score - threshold) >= self.confidence_margin
+
+    def refine(self, user_id: str, user, verdict: Tuple[bool, float, str], threshold: float) -> Tuple[Tuple[bool, float, str], bool]:
+        """
+        Run the remaining stages for a borderline profile verdict.
+        Returns: ((is_bot, probability, reason), complete) where complete is
+        False if a stage was skipped because its endpoint is rate limited
+        """
+        return self.refine_batch({user_id: user}, {user_id: verdict}, threshold)[user_id]
+
+    def refine_batch(self, users: Dict, verdicts: Dict[str, Tuple[bool, float, str]],
+                     threshold: float) -> Dict[str, Tuple[Tuple[bool, float, str], bool]]:
+        """
+        Run the remaining stages for a batch of profile verdicts. Each stage
+        runs for all users still borderline at once, so the timelines of a
+        batch are fetched together (concurrently through the scan engine, if set).
+        Returns: {user_id: ((is_bot, probability, reason), complete)}
+        """
+        results = {}
+        running = {}  # user_id -> (score, total weight, reasons)
+        for user_id, verdict in verdicts.items():
+            self._count('profile')
+            _, score, reason = verdict
+            if self.is_confident(score, threshold):
+                self._count('early_exits')
+                results[user_id] = (verdict, True)
+            else:
+                running[user_id] = (score, self.weights['profile'], [reason])
+
+        stages = (('behavior', self.behavior_analyzer, self._behavior_scores),
+                  ('image', self.image_analyzer, self._image_scores))
+        for stage, analyzer, scorer in stages:
+            if analyzer is None or not running:
+                continue
+            for user_id, outcome in scorer({user_id: users[user_id] for user_id in running}).items():
+                score, total_weight, reasons = running[user_id]
+                if isinstance(outcome, Exception):
+                    self._count('stage_errors')
+                    if self.is_rate_limit_error(outcome):
+                        self.logger.warning(f"Skipping {stage} analysis for user {user_id}: rate limited")
+                        results[user_id] = (self._verdict(score, threshold, reasons), False)
+                        del running[user_id]
+                    else:
+                        self.logger.error(f"Error in {stage} analysis for user {user_id}: {str(outcome)}")
+                    continue
+                self._count(stage)
+
+                # Blend the stage into the running score by weight
+                stage_score, stage_reasons = outcome
+                weight = self.weights[stage]
+                score = (score * total_weight + stage_score * weight) / (total_weight + weight)
+                reasons.extend(stage_reasons)
+                if self.is_confident(score, threshold):
+                    results[user_id] = (self._verdict(score, threshold, reasons), True)
+                    del running[user_id]
+                else:
+                    running[user_id] = (score, total_weight + weight, reasons)
+
+        for user_id, (score, _, reasons) in running.items():
+            results[user_id] = (self._verdict(score, threshold, reasons), True)
+        return results
+
+    def _verdict(self, score: float, threshold: float, reasons) -> Tuple[bool, float, str]:
+        reasons = [r for r in reasons if r and r != "No suspicious indicators"]
+        return score >= threshold, score, " | ".join(reasons) if reasons else "No suspicious indicators"
+
+    def fetch_timelines(self, user_ids: List[str]) -> Dict[str, object]:
+        """
+        Get the recent tweets of several users (concurrently through the scan engine, if set).
+        Returns: {user_id: tweets, or the exception the fetch raised}
+        """
+        if self.scan_engine is not None:
+            return self.scan_engine.fetch_timelines(user_ids, count=self.timeline_count)
+        timelines = {}
+        for user_id in user_ids:
+            try:
+                timelines[user_id] = self.api.user_timeline(user_id=user_id, count=self.timeline_count)
+            except Exception as e:
+                timelines[user_id] = e
+        return timelines
+
+    def _behavior_scores(self, users: Dict) -> Dict[str, object]:
+        outcomes = {}
+        timelines = {}
+        for user_id, tweets in self.fetch_timelines(list(users)).items():
+            if isinstance(tweets, Exception):
+                outcomes[user_id] = tweets
+            else:
+                timelines[user_id] = (users[user_id], tweets)
+
+        # The whole batch is analyzed at once (in the scoring pool, if set)
+        if self.scoring_pool is not None:
+            analyzed = self.scoring_pool.analyze_behavior(timelines)
+        else:
+            analyzed = {}
+            for user_id, (user, tweets) in timelines.items():
+                try:
+                    analyzed[user_id] = self.behavior_analyzer.analyze_user(user, tweets)
+                except Exception as e:
+                    analyzed[user_id] = e
+        for user_id, outcome in analyzed.items():
+            if not isinstance(outcome, Exception):
+                probability, reasons = outcome
+                outcome = (probability, [r for r in reasons if r != "No tweets to analyze"])
+            outcomes[user_id] = outcome
+        return outcomes
+
+    def _image_scores(self, users: Dict) -> Dict[str, object]:
+        outcomes = {}
+        for user_id, user in users.items():
+            try:
+                outcomes[user_id] = self._image_score(user_id, user)
+            except Exception as e:
+                outcomes[user_id] = e
+        return outcomes
+
+    def _image_score(self, user_id: str, user) -> Tuple[float, list]:
+        image_url = getattr(user, 'profile_image_url_https', None)
+        if not image_url or getattr(user, 'default_profile_image', False):
+            return 0.0, []
+        analysis = self.image_analyzer.analyze_profile_image(image_url, getattr(user, 'screen_name', user_id))
+        metrics = analysis.get('metrics', {})
+        if not metrics:
+            return 0.0, []
+        suspicious = sum(1 for metric in metrics.values() if metric.get('is_suspicious'))
+        return suspicious / len(metrics), analysis.get('reasons', [])
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get how many users reached each stage"""
+        with self._lock:
+            return dict(self.stats)
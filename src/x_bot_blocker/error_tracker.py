@@ -0,0 +1,67 @@
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Key for errors beyond max_keys distinct (error type, endpoint) pairs
+OTHER = ('other', 'other')
+
+class ErrorTracker:
+    """
+    Bounded record of the bot's errors: a ring of the last `capacity` raw
+    messages plus a count per (error type, endpoint), so a long outage costs
+    one counter instead of a growing list. At most max_keys pairs are
+    counted; errors past that are counted under ('other', 'other').
+    """
+
+    def __init__(self, capacity: int = 100, max_keys: int = 200):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=capacity)
+        self._counts: Dict[tuple, Dict] = {}
+        self.total = 0
+
+    def record(self, message: str, error_type: str = 'Error', endpoint: Optional[str] = None) -> None:
+        """Count one error; message is kept in the ring and as the key's latest example"""
+        key = (error_type, endpoint or 'unknown')
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S EST")
+        with self._lock:
+            self._recent.append(message)
+            self.total += 1
+            if key not in self._counts and len(self._counts) >= self.max_keys:
+                key = OTHER
+            entry = self._counts.get(key)
+            if entry is None:
+                entry = self._counts[key] = {'count': 0, 'first_seen': now}
+            entry['count'] += 1
+            entry['last_seen'] = now
+            entry['last_message'] = message
+
+    def recent(self, n: Optional[int] = None) -> List[str]:
+        """Latest raw messages, oldest first (all of the ring if n is None)"""
+        with self._lock:
+            messages = list(self._recent)
+        return messages if n is None else messages[-n:]
+
+    def top(self, n: int = 3) -> List[Dict]:
+        """The n most frequent (error type, endpoint) pairs, most frequent first"""
+        with self._lock:
+            items = [
+                {'type': error_type, 'endpoint': endpoint, **entry}
+                for (error_type, endpoint), entry in self._counts.items()
+            ]
+        items.sort(key=lambda item: (item['count'], item['last_seen']), reverse=True)
+        return items[:n]
+
+    def summary(self, n: int = 3) -> List[str]:
+        """top(n) as one line each, for reports"""
+        return [
+            f"{item['count']}× {item['type']} on {item['endpoint']} (last: {item['last_message']})"
+            for item in self.top(n)
+        ]
+
+    def get_stats(self, n: int = 5) -> Dict:
+        """Get the error total, distinct error kinds and the top n of them"""
+        with self._lock:
+            total, kinds = self.total, len(self._counts)
+        return {'total': total, 'kinds': kinds, 'top': self.top(n)}
@@ -1,16 +1,27 @@
 import os
 import logging
 import requests
-import numpy as np
-import cv2
-from PIL import Image
 import io
 from typing import Dict, Optional, Tuple
 from datetime import datetime
 from config_manager import ConfigManager
 
+# OpenCV, numpy and Pillow are imported by the first ImageAnalyzer, so the bot
+# only pays for them when image analysis is enabled
+cv2 = np = Image = None
+
+def _import_dependencies():
+    """Import OpenCV, numpy and Pillow; raises ImportError if one is missing"""
+    global cv2, np, Image
+    if cv2 is None:
+        import numpy
+        import cv2 as opencv
+        from PIL import Image as pil_image
+        np, Image, cv2 = numpy, pil_image, opencv
+
 class ImageAnalyzer:
     def __init__(self, config: ConfigManager):
+        _import_dependencies()
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.temp_dir = "temp_images"
@@ -72,7 +83,7 @@ class ImageAnalyzer:
             analysis['reasons'].append(f"Analysis error: {str(e)}")
             return analysis
             
-    def _download_image(self, url: str) -> Optional[Image.Image]:
+    def _download_image(self, url: str) -> Optional['Image.Image']:
         """Download image from URL and convert to PIL Image."""
         try:
             response = requests.get(url, timeout=10)
@@ -82,11 +93,11 @@ class ImageAnalyzer:
             self.logger.error(f"Error downloading image: {str(e)}")
             return None
             
-    def _pil_to_cv2(self, pil_image: Image.Image) -> np.ndarray:
+    def _pil_to_cv2(self, pil_image: 'Image.Image') -> 'np.ndarray':
         """Convert PIL Image to OpenCV format."""
         return cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
         
-    def _analyze_image_size(self, image: np.ndarray) -> Dict[str, any]:
+    def _analyze_image_size(self, image: 'np.ndarray') -> Dict[str, any]:
         """Analyze image dimensions."""
         height, width = image.shape[:2]
         return {
@@ -96,7 +107,7 @@ class ImageAnalyzer:
             'is_suspicious': width < self.min_image_size or width > self.max_image_size
         }
         
-    def _analyze_face_detection(self, image: np.ndarray) -> Dict[str, any]:
+    def _analyze_face_detection(self, image: 'np.ndarray') -> Dict[str, any]:
         """Detect faces in the image."""
         face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
@@ -108,7 +119,7 @@ class ImageAnalyzer:
             'face_locations': faces.tolist() if len(faces) > 0 else []
         }
         
-    def _analyze_edge_detection(self, image: np.ndarray) -> Dict[str, any]:
+    def _analyze_edge_detection(self, image: 'np.ndarray') -> Dict[str, any]:
         """Analyze edge patterns in the image."""
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         edges = cv2.Canny(gray, self.edge_detection_threshold, self.edge_detection_threshold * 2)
@@ -119,7 +130,7 @@ class ImageAnalyzer:
             'is_suspicious': edge_density < 0.01 or edge_density > 0.5
         }
         
-    def _analyze_color_distribution(self, image: np.ndarray) -> Dict[str, any]:
+    def _analyze_color_distribution(self, image: 'np.ndarray') -> Dict[str, any]:
         """Analyze color distribution in the image."""
         colors = image.reshape(-1, 3)
         unique_colors = np.unique(colors, axis=0)
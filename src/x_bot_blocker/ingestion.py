@@ -0,0 +1,97 @@
+import time
+import logging
+from collections import OrderedDict
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def iter_mention_pages(api, since_id: Optional[int] = None, page_size: int = 200,
+                       max_pages: Optional[int] = None, max_id: Optional[int] = None) -> Iterator[List]:
+    """
+    Yield pages of mentions newest-first, paging back with max_id until the
+    timeline is exhausted or since_id (the last processed mention) is reached.
+    A short page is the last one, so no call is spent on an empty page.
+    A max_id starts below the newest mention (e.g. to resume a scan).
+    Only one page is held in memory at a time.
+    """
+    pages = 0
+    while True:
+        page = api.mentions_timeline(count=page_size, since_id=since_id, max_id=max_id)
+        if not page:
+            return
+        yield page
+        
+        pages += 1
+        if len(page) < page_size:
+            return
+        if max_pages and pages >= max_pages:
+            logger.warning(f"Stopped paging mentions after {pages} pages")
+            return
+        next_max_id = min(mention.id for mention in page) - 1
+        if max_id is not None and next_max_id >= max_id:
+            return
+        max_id = next_max_id
+
+def iter_mentions(api, since_id: Optional[int] = None, page_size: int = 200,
+                  max_pages: Optional[int] = None) -> Iterator:
+    """Yield individual mentions newest-first across all pages"""
+    for page in iter_mention_pages(api, since_id, page_size, max_pages):
+        yield from page
+
+def iter_follower_id_pages(api, cursor: int = -1, page_size: int = 5000,
+                           max_pages: Optional[int] = None) -> Iterator[Tuple[List, int]]:
+    """
+    Yield (follower_ids, next_cursor) pages starting at a saved cursor.
+    next_cursor is 0 once the follower list is exhausted; persisting it after
+    each page lets an interrupted scan resume where it stopped.
+    """
+    pages = 0
+    while cursor:
+        ids, (_, next_cursor) = api.get_follower_ids(cursor=cursor, count=page_size, stringify_ids=True)
+        yield ids, next_cursor
+        cursor = next_cursor
+        
+        pages += 1
+        if max_pages and pages >= max_pages:
+            return
+
+def iter_engager_id_pages(api, tweet_count: int = 20, per_tweet: int = 100) -> Iterator[List]:
+    """
+    Yield the IDs of accounts that retweeted each of our recent tweets,
+    one tweet at a time. Tweets nobody retweeted cost no call.
+    """
+    tweets = api.user_timeline(count=tweet_count, include_rts=False, trim_user=True)
+    for tweet in tweets:
+        if not getattr(tweet, 'retweet_count', 0):
+            continue
+        ids = api.get_retweeter_ids(id=tweet.id, count=per_tweet, stringify_ids=True)
+        if ids:
+            yield ids
+
+class SeenWindow:
+    """Remembers account IDs for a time window so repeated sources are only screened once"""
+
+    def __init__(self, window: float = 86400, max_size: int = 100000):
+        self.window = window
+        self.max_size = max_size
+        self._seen = OrderedDict()
+
+    def _prune(self, now: float) -> None:
+        while self._seen and (len(self._seen) > self.max_size or next(iter(self._seen.values())) <= now - self.window):
+            self._seen.popitem(last=False)
+
+    def unseen(self, user_ids: Iterable, now: Optional[float] = None) -> List:
+        """Get the IDs not seen within the window, without duplicates"""
+        self._prune(time.time() if now is None else now)
+        return [user_id for user_id in dict.fromkeys(user_ids) if user_id not in self._seen]
+
+    def add(self, user_ids: Iterable, now: Optional[float] = None) -> None:
+        """Mark IDs as seen now"""
+        now = time.time() if now is None else now
+        for user_id in user_ids:
+            self._seen.pop(user_id, None)
+            self._seen[user_id] = now
+        self._prune(now)
+
+    def __len__(self) -> int:
+        return len(self._seen)
@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+def _project_data_dir() -> str:
+    # Get the project root directory (two levels up from this file)
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(project_root, 'data')
+
+def _read_journal(journal_path: str, after_seq: int):
+    """Yield (seq, deltas) of complete journal lines newer than after_seq; a torn last line is skipped"""
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry['seq'] > after_seq:
+                    yield entry['seq'], entry['deltas']
+    except FileNotFoundError:
+        return
+
+def _set_nested(metrics: Dict, name: str, value) -> Dict:
+    """Set a dotted-name value ("api_status.rate_limits_hit") in a nested dict"""
+    *parents, leaf = name.split('.')
+    node = metrics
+    for part in parents:
+        node = node.setdefault(part, {})
+    node[leaf] = value
+    return node
+
+def load_metrics(directory: Optional[str] = None, snapshot_name: str = 'metrics.json',
+                 journal_name: str = 'metrics.journal') -> Dict:
+    """
+    Read the latest metrics for display: the last snapshot with the counter
+    deltas journaled since applied. Never sees a partially written file.
+    """
+    directory = directory or _project_data_dir()
+    try:
+        with open(os.path.join(directory, snapshot_name), 'r', encoding='utf-8') as f:
+            metrics = json.load(f)
+    except (FileNotFoundError, ValueError):
+        metrics = {}
+    after_seq = metrics.get('journal', {}).get('seq', 0)
+    counters = dict(metrics.get('journal', {}).get('counters', {}))
+    for _, deltas in _read_journal(os.path.join(directory, journal_name), after_seq):
+        for name, delta in deltas.items():
+            node = _set_nested(metrics, name, 0)
+            leaf = name.split('.')[-1]
+            node[leaf] = counters.get(name, 0) + delta
+            counters[name] = node[leaf]
+    return metrics
+
+class MetricsJournal:
+    """
+    Persists a MetricsRegistry without rewriting it on every scan.
+
+    record() appends one line with the counters that changed since the last
+    record (constant size per scan) to data/metrics.journal; the file is
+    fsynced at most every fsync_interval seconds. Every snapshot_interval
+    seconds, or once the journal passes max_journal_bytes, the whole
+    registry is written to data/metrics.json through a temporary file and
+    an atomic rename, and the journal is truncated. Each snapshot records
+    the last journal sequence number it includes, so a crash between the
+    rename and the truncation never counts a delta twice.
+    """
+
+    def __init__(self, registry, directory: Optional[str] = None, snapshot_name: str = 'metrics.json',
+                 journal_name: str = 'metrics.journal', fsync_interval: float = 5.0,
+                 snapshot_interval: float = 300.0, max_journal_bytes: int = 1024 * 1024,
+                 extra: Optional[Callable[[], Dict]] = None):
+        self.registry = registry
+        self.directory = directory or _project_data_dir()
+        os.makedirs(self.directory, exist_ok=True)
+        self.snapshot_path = os.path.join(self.directory, snapshot_name)
+        self.journal_path = os.path.join(self.directory, journal_name)
+        self.fsync_interval = fsync_interval
+        self.snapshot_interval = snapshot_interval
+        self.max_journal_bytes = max_journal_bytes
+        self.extra = extra
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._recorded: Dict[str, float] = {}
+        self._journal = None
+        self._last_fsync = time.monotonic()
+        self._last_snapshot = time.monotonic()
+
+    def restore(self) -> Dict[str, float]:
+        """
+        Add the persisted counter totals (last snapshot plus journaled deltas)
+        to the registry's counters. Call once at startup before recording.
+        Returns: {counter name: restored total}
+        """
+        with self._lock:
+            totals = {}
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    journal = json.load(f).get('journal', {})
+                totals.update(journal.get('counters', {}))
+                self._seq = journal.get('seq', 0)
+            except (FileNotFoundError, ValueError):
+                pass
+            for seq, deltas in _read_journal(self.journal_path, self._seq):
+                self._seq = seq
+                for name, delta in deltas.items():
+                    totals[name] = totals.get(name, 0) + delta
+
+            for name, total in totals.items():
+                self.registry.counter(name).inc(total)
+            self._recorded = self.registry.collect('counter')
+            # Fold the replayed journal into a snapshot and start a fresh one
+            self._write_snapshot()
+            return totals
+
+    def _open_journal(self):
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        return self._journal
+
+    def _fsync(self) -> None:
+        if self._journal is not None:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+        self._last_fsync = time.monotonic()
+
+    def _journal_deltas(self) -> None:
+        counters = self.registry.collect('counter')
+        deltas = {
+            name: value - self._recorded.get(name, 0)
+            for name, value in counters.items() if value != self._recorded.get(name, 0)
+        }
+        if not deltas:
+            return
+        self._seq += 1
+        journal = self._open_journal()
+        journal.write(json.dumps({'seq': self._seq, 'deltas': deltas}, separators=(',', ':')) + '\n')
+        journal.flush()
+        self._recorded = counters
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._fsync()
+
+    def record(self) -> None:
+        """Journal the counter changes since the last record; snapshot when one is due"""
+        with self._lock:
+            self._journal_deltas()
+            if (time.monotonic() - self._last_snapshot >= self.snapshot_interval
+                    or (self._journal is not None and self._journal.tell() >= self.max_journal_bytes)):
+                self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        # Counters are written as of the last journal line, so journal
+        # lines written after this snapshot apply exactly on top of it
+        self._journal_deltas()
+        self._fsync()
+        snapshot = {**self.registry.snapshot(), **(self.extra() if self.extra is not None else {})}
+        for name, value in self._recorded.items():
+            _set_nested(snapshot, name, value)
+        snapshot['journal'] = {
+            'seq': self._seq,
+            'counters': self._recorded,
+            'written_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S EST")
+        }
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # Only now is the journal redundant
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        open(self.journal_path, 'w').close()
+        self._last_snapshot = time.monotonic()
+
+    def snapshot(self) -> None:
+        """Write a snapshot now (pending counter changes included)"""
+        with self._lock:
+            self._write_snapshot()
+
+    def close(self) -> None:
+        """Write a final snapshot and close the journal"""
+        try:
+            self.snapshot()
+        except Exception as e:
+            self.logger.error(f"Error writing final metrics snapshot: {str(e)}")
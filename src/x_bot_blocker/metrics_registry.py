@@ -0,0 +1,201 @@
+import bisect
+import itertools
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# Counters and histograms are split into this many independently locked
+# shards; each thread is assigned one, so concurrent updates rarely contend
+SHARDS = 16
+
+# Histogram bucket upper bounds (seconds, for API response times)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_next_shard = itertools.count()
+_thread_shard = threading.local()
+
+def _shard_index() -> int:
+    """Shard of the calling thread (round-robin on first use). Async tasks share their loop's thread."""
+    index = getattr(_thread_shard, 'index', None)
+    if index is None:
+        index = _thread_shard.index = next(_next_shard) % SHARDS
+    return index
+
+class _CounterShard:
+    __slots__ = ('lock', 'value')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = 0
+
+class Counter:
+    """Monotonic count, e.g. API calls or blocks issued"""
+    kind = 'counter'
+
+    def __init__(self, name: str, description: str = ''):
+        self.name = name
+        self.description = description
+        self._shards = [_CounterShard() for _ in range(SHARDS)]
+
+    def inc(self, amount: float = 1) -> None:
+        if amount < 0:
+            raise ValueError(f"Counter {self.name} can only increase")
+        shard = self._shards[_shard_index()]
+        with shard.lock:
+            shard.value += amount
+
+    def value(self) -> float:
+        return sum(shard.value for shard in self._shards)
+
+class Gauge:
+    """
+    Current value of something, e.g. CPU usage or the last scan time. The
+    value may be any JSON-serializable object, or computed on read by a
+    function set with set_function() (e.g. a component's get_status).
+    """
+    kind = 'gauge'
+
+    def __init__(self, name: str, description: str = '', initial: Any = None):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+        self._value = initial
+        self._function: Optional[Callable[[], Any]] = None
+
+    def set(self, value: Any) -> None:
+        with self._lock:
+            self._value = value
+            self._function = None
+
+    def set_function(self, function: Callable[[], Any]) -> None:
+        with self._lock:
+            self._function = function
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value = (self._value or 0) + amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    def value(self) -> Any:
+        with self._lock:
+            function, value = self._function, self._value
+        return function() if function is not None else value
+
+class _HistogramShard:
+    __slots__ = ('lock', 'counts', 'sum')
+
+    def __init__(self, buckets: int):
+        self.lock = threading.Lock()
+        self.counts = [0] * (buckets + 1)
+        self.sum = 0.0
+
+class Histogram:
+    """Distribution of observations (e.g. response times) in fixed buckets"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, description: str = '', buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._shards = [_HistogramShard(len(self.buckets)) for _ in range(SHARDS)]
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        shard = self._shards[_shard_index()]
+        with shard.lock:
+            shard.counts[index] += 1
+            shard.sum += value
+
+    def _merged(self):
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        for shard in self._shards:
+            with shard.lock:
+                shard_counts, shard_sum = list(shard.counts), shard.sum
+            counts = [a + b for a, b in zip(counts, shard_counts)]
+            total += shard_sum
+        return counts, total
+
+    def quantile(self, q: float, counts=None) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if empty or above the last bucket)"""
+        counts = counts if counts is not None else self._merged()[0]
+        count = sum(counts)
+        if not count:
+            return None
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            seen += bucket_count
+            if seen >= q * count:
+                return bound
+        return None
+
+    def value(self) -> Dict:
+        counts, total = self._merged()
+        count = sum(counts)
+        return {
+            'count': count,
+            'sum': total,
+            'mean': total / count if count else 0.0,
+            'p50': self.quantile(0.5, counts),
+            'p99': self.quantile(0.99, counts),
+            'buckets': {
+                **{str(bound): n for bound, n in zip(self.buckets, counts)},
+                '+Inf': counts[-1]
+            }
+        }
+
+class MetricsRegistry:
+    """
+    One place for the bot's counters, gauges and histograms. Metrics are
+    created on first use by name; dotted names ("api_status.rate_limits_hit")
+    nest in snapshot(). Safe to update from any thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {}
+
+    def _get(self, cls, name: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                for existing in self._metrics:
+                    if existing.startswith(name + '.') or name.startswith(existing + '.'):
+                        raise ValueError(f"Metric {name} conflicts with {existing}")
+                metric = self._metrics[name] = cls(name, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is a {metric.kind}, not a {cls.kind}")
+            return metric
+
+    def counter(self, name: str, description: str = '') -> Counter:
+        return self._get(Counter, name, description=description)
+
+    def gauge(self, name: str, description: str = '') -> Gauge:
+        return self._get(Gauge, name, description=description)
+
+    def histogram(self, name: str, description: str = '', buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, description=description, buckets=buckets)
+
+    def value(self, name: str, default: Any = None) -> Any:
+        """Current value of a metric, or default if it does not exist"""
+        with self._lock:
+            metric = self._metrics.get(name)
+        return metric.value() if metric is not None else default
+
+    def collect(self, kind: Optional[str] = None) -> Dict[str, Any]:
+        """Current value of every metric (or every metric of one kind, e.g. 'counter') by full name"""
+        with self._lock:
+            metrics = [metric for metric in self._metrics.values() if kind is None or metric.kind == kind]
+        return {metric.name: metric.value() for metric in metrics}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current value of every metric, nested by the dotted parts of its name"""
+        snapshot = {}
+        for name, value in sorted(self.collect().items()):
+            *parents, leaf = name.split('.')
+            node = snapshot
+            for part in parents:
+                node = node.setdefault(part, {})
+            node[leaf] = value
+        return snapshot
@@ -3,39 +3,46 @@ import psutil
 import time
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from x_bot_blocker.config_manager import ConfigManager
 import requests
 import json
 import os
 import csv
 import threading
 import queue
+from collections import deque
+
+try:
+    # Run by the bot script, with src/x_bot_blocker on sys.path
+    from config_manager import ConfigManager
+    from metrics_registry import MetricsRegistry
+except ImportError:
+    from x_bot_blocker.config_manager import ConfigManager
+    from x_bot_blocker.metrics_registry import MetricsRegistry
 
 class MonitoringSystem:
-    def __init__(self, config: ConfigManager):
+    def __init__(self, config: ConfigManager, registry: Optional[MetricsRegistry] = None):
         self.config = config
         self.logger = logging.getLogger(__name__)
         
         # Load monitoring settings
         self.settings = self.config.get('monitoring', {})
         
-        # Initialize metrics
-        self.metrics = {
-            'start_time': datetime.now(),
-            'blocks_count': 0,
-            'api_calls': 0,
-            'errors': [],
-            'false_positives': 0,
-            'detection_accuracy': 1.0,
-            'system_uptime': 0,
-            'resource_usage': {
-                'cpu': 0.0,
-                'memory': 0.0,
-                'disk': 0.0
-            },
-            'response_times': [],
-            'failed_requests': 0
+        # Metrics live in the registry shared with the bot, so the exporter
+        # and alerts see the same counters as the Slack reports
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.start_time = datetime.now()
+        self.api_calls = self.registry.counter('api_calls', "X API calls")
+        self.failed_requests = self.registry.counter('api_status.failed_requests', "X API calls that failed")
+        self.response_times = self.registry.histogram('api_status.response_seconds', "X API response time")
+        self.blocks = self.registry.counter('total_blocks', "Accounts blocked")
+        self.false_positives = self.registry.counter('false_positives', "Blocks found to be humans")
+        self.error_count = self.registry.counter('error_count', "Errors recorded")
+        self.uptime = self.registry.gauge('system.uptime', "Seconds since boot")
+        self.resource_usage = {
+            resource: self.registry.gauge(f'system.{resource}', f"{resource} usage (%)")
+            for resource in ('cpu', 'memory', 'disk')
         }
+        self.errors = deque(maxlen=100)
         
         # Alert thresholds
         self.thresholds = {
@@ -94,26 +101,42 @@ class MonitoringSystem:
             except Exception as e:
                 self.logger.error(f"Error in metrics export: {str(e)}")
 
+    @property
+    def metrics(self) -> Dict:
+        """Every registry metric plus the derived figures the alerts and exports use"""
+        api_calls = self.api_calls.value()
+        failed_requests = self.failed_requests.value()
+        blocks = self.blocks.value()
+        false_positives = self.false_positives.value()
+        response_times = self.response_times.value()
+        metrics = {
+            **self.registry.snapshot(),
+            'start_time': self.start_time,
+            'blocks_count': blocks,
+            'api_calls': api_calls,
+            'errors': list(self.errors),
+            'false_positives': false_positives,
+            'detection_accuracy': (blocks - false_positives) / blocks if blocks else 1.0,
+            'system_uptime': self.uptime.value() or 0,
+            'resource_usage': {resource: gauge.value() or 0.0 for resource, gauge in self.resource_usage.items()},
+            'failed_requests': failed_requests
+        }
+        if response_times['count']:
+            metrics['avg_response_time'] = response_times['mean']
+        if api_calls > 0:
+            metrics['error_rate'] = (failed_requests / api_calls) * 100
+        return metrics
+
     def update_metrics(self):
         """Update system metrics"""
         try:
             # Update system uptime
-            self.metrics['system_uptime'] = time.time() - psutil.boot_time()
+            self.uptime.set(time.time() - psutil.boot_time())
             
             # Update resource usage
-            self.metrics['resource_usage']['cpu'] = psutil.cpu_percent()
-            self.metrics['resource_usage']['memory'] = psutil.virtual_memory().percent
-            self.metrics['resource_usage']['disk'] = psutil.disk_usage('/').percent
-            
-            # Calculate average response time
-            if self.metrics['response_times']:
-                avg_response = sum(self.metrics['response_times']) / len(self.metrics['response_times'])
-                self.metrics['avg_response_time'] = avg_response
-            
-            # Calculate error rate
-            total_requests = self.metrics['api_calls']
-            if total_requests > 0:
-                self.metrics['error_rate'] = (self.metrics['failed_requests'] / total_requests) * 100
+            self.resource_usage['cpu'].set(psutil.cpu_percent())
+            self.resource_usage['memory'].set(psutil.virtual_memory().percent)
+            self.resource_usage['disk'].set(psutil.disk_usage('/').percent)
             
             # Add to metrics queue for batch processing
             self.metrics_queue.put({
@@ -126,17 +149,18 @@ class MonitoringSystem:
 
     def _check_thresholds(self):
         """Check all monitoring thresholds and generate alerts"""
-        self._check_system_thresholds()
-        self._check_performance_thresholds()
-        self._check_detection_thresholds()
-        self._check_api_thresholds()
-        return self._check_alerts()
+        metrics = self.metrics
+        self._check_system_thresholds(metrics)
+        self._check_performance_thresholds(metrics)
+        self._check_detection_thresholds(metrics)
+        self._check_api_thresholds(metrics)
+        return self._check_alerts(metrics)
 
-    def _check_system_thresholds(self):
+    def _check_system_thresholds(self, metrics: Dict):
         """Check system resource thresholds"""
-        cpu_usage = self.metrics['resource_usage']['cpu']
-        memory_usage = self.metrics['resource_usage']['memory']
-        disk_usage = self.metrics['resource_usage']['disk']
+        cpu_usage = metrics['resource_usage']['cpu']
+        memory_usage = metrics['resource_usage']['memory']
+        disk_usage = metrics['resource_usage']['disk']
         
         # CPU checks
         if cpu_usage >= self.config.get('monitoring.thresholds.system.cpu_critical', 85):
@@ -156,27 +180,27 @@ class MonitoringSystem:
         elif disk_usage >= self.config.get('monitoring.thresholds.system.disk_warning', 80):
             self.send_alert('WARNING', f'Disk usage high: {disk_usage}%')
 
-    def _check_performance_thresholds(self):
+    def _check_performance_thresholds(self, metrics: Dict):
         """Check performance thresholds"""
-        if self.metrics.get('avg_response_time'):
-            resp_time = self.metrics['avg_response_time']
+        if metrics.get('avg_response_time'):
+            resp_time = metrics['avg_response_time']
             if resp_time >= self.config.get('monitoring.thresholds.performance.response_time_critical', 2.0):
                 self.send_alert('CRITICAL', f'Response time critical: {resp_time:.2f}s')
             elif resp_time >= self.config.get('monitoring.thresholds.performance.response_time_warning', 1.5):
                 self.send_alert('WARNING', f'Response time high: {resp_time:.2f}s')
 
-    def _check_detection_thresholds(self):
+    def _check_detection_thresholds(self, metrics: Dict):
         """Check detection accuracy thresholds"""
-        accuracy = self.metrics['detection_accuracy'] * 100
+        accuracy = metrics['detection_accuracy'] * 100
         if accuracy <= self.config.get('monitoring.thresholds.detection.accuracy_critical', 90):
             self.send_alert('CRITICAL', f'Detection accuracy critical: {accuracy:.1f}%')
         elif accuracy <= self.config.get('monitoring.thresholds.detection.accuracy_warning', 95):
             self.send_alert('WARNING', f'Detection accuracy low: {accuracy:.1f}%')
 
-    def _check_api_thresholds(self):
+    def _check_api_thresholds(self, metrics: Dict):
         """Check API-related thresholds"""
-        if self.metrics['api_calls'] > 0:
-            error_rate = (self.metrics['failed_requests'] / self.metrics['api_calls']) * 100
+        if metrics['api_calls'] > 0:
+            error_rate = (metrics['failed_requests'] / metrics['api_calls']) * 100
             if error_rate >= self.config.get('monitoring.thresholds.api.failed_requests_critical', 10):
                 self.send_alert('CRITICAL', f'API error rate critical: {error_rate:.1f}%')
             elif error_rate >= self.config.get('monitoring.thresholds.api.failed_requests_warning', 5):
@@ -324,63 +348,55 @@ class MonitoringSystem:
 
     def record_api_call(self, success: bool = True, response_time: float = None):
         """Record an API call"""
-        self.metrics['api_calls'] += 1
+        self.api_calls.inc()
         if not success:
-            self.metrics['failed_requests'] += 1
+            self.failed_requests.inc()
         if response_time is not None:
-            self.metrics['response_times'].append(response_time)
-            # Keep only recent response times
-            max_samples = 100
-            if len(self.metrics['response_times']) > max_samples:
-                self.metrics['response_times'] = self.metrics['response_times'][-max_samples:]
+            self.response_times.observe(response_time)
 
     def record_block(self, is_false_positive: bool = False):
         """Record a blocked account"""
-        self.metrics['blocks_count'] += 1
+        self.blocks.inc()
         if is_false_positive:
-            self.metrics['false_positives'] += 1
-            # Update detection accuracy
-            total_blocks = self.metrics['blocks_count']
-            self.metrics['detection_accuracy'] = (total_blocks - self.metrics['false_positives']) / total_blocks
+            self.false_positives.inc()
 
     def record_error(self, error: str):
         """Record an error"""
-        self.metrics['errors'].append({
+        self.error_count.inc()
+        self.errors.append({
             'timestamp': datetime.now().isoformat(),
             'error': error
         })
-        # Keep only recent errors
-        max_errors = 100
-        if len(self.metrics['errors']) > max_errors:
-            self.metrics['errors'] = self.metrics['errors'][-max_errors:]
 
     def get_metrics_report(self) -> Dict:
         """Generate a comprehensive metrics report"""
+        metrics = self.metrics
         return {
             'timestamp': datetime.now().isoformat(),
-            'uptime': self.metrics['system_uptime'],
+            'uptime': metrics['system_uptime'],
             'blocks': {
-                'total': self.metrics['blocks_count'],
-                'false_positives': self.metrics['false_positives'],
-                'accuracy': self.metrics['detection_accuracy'] * 100
+                'total': metrics['blocks_count'],
+                'false_positives': metrics['false_positives'],
+                'accuracy': metrics['detection_accuracy'] * 100
             },
             'api': {
-                'total_calls': self.metrics['api_calls'],
-                'failed_requests': self.metrics['failed_requests'],
-                'error_rate': (self.metrics['failed_requests'] / self.metrics['api_calls'] * 100) if self.metrics['api_calls'] > 0 else 0,
-                'avg_response_time': sum(self.metrics['response_times']) / len(self.metrics['response_times']) if self.metrics['response_times'] else 0
+                'total_calls': metrics['api_calls'],
+                'failed_requests': metrics['failed_requests'],
+                'error_rate': metrics.get('error_rate', 0),
+                'avg_response_time': metrics.get('avg_response_time', 0)
             },
-            'resources': self.metrics['resource_usage'],
-            'errors': self.metrics['errors'][-5:]  # Last 5 errors
+            'resources': metrics['resource_usage'],
+            'errors': metrics['errors'][-5:]  # Last 5 errors
         }
 
-    def _check_alerts(self) -> List[Dict]:
+    def _check_alerts(self, metrics: Optional[Dict] = None) -> List[Dict]:
         """Check all monitoring thresholds and generate alerts"""
+        metrics = metrics if metrics is not None else self.metrics
         alerts = []
         timestamp = datetime.now().isoformat()
         
         # Check CPU usage
-        cpu_usage = self.metrics['resource_usage']['cpu']
+        cpu_usage = metrics['resource_usage']['cpu']
         if cpu_usage >= 85:
             alerts.append({
                 'level': 'critical',
@@ -395,7 +411,7 @@ class MonitoringSystem:
             })
         
         # Check memory usage
-        memory_usage = self.metrics['resource_usage']['memory']
+        memory_usage = metrics['resource_usage']['memory']
         if memory_usage >= 90:
             alerts.append({
                 'level': 'critical',
@@ -410,7 +426,7 @@ class MonitoringSystem:
             })
         
         # Check error rate
-        error_rate = self.metrics.get('error_rate', 0)
+        error_rate = metrics.get('error_rate', 0)
         if error_rate >= 10:
             alerts.append({
                 'level': 'critical',
@@ -452,11 +468,12 @@ class MonitoringSystem:
         }
         
         # Update status based on metrics
-        if self.metrics.get('error_rate', 0) > 10:
+        metrics = self.metrics
+        if metrics.get('error_rate', 0) > 10:
             api_check['status'] = 'failed'
             api_check['message'] = 'High error rate detected'
         
-        if self.metrics['resource_usage']['cpu'] > 85 or self.metrics['resource_usage']['memory'] > 90:
+        if metrics['resource_usage']['cpu'] > 85 or metrics['resource_usage']['memory'] > 90:
             resource_check['status'] = 'failed'
             resource_check['message'] = 'Resource usage is high'
         
@@ -0,0 +1,116 @@
+import logging
+import os
+import signal
+import json
+from datetime import datetime
+from typing import Dict, Mapping, Optional
+from dotenv import load_dotenv
+from config_manager import ConfigManager
+from tenants import MultiTenantRunner
+from scheduler import Scheduler
+from x_bot_blocker import XBotBlocker, configure_logging, create_app, project_path
+
+# Protects several accounts from one process. Each account in tenants.accounts is
+# a full bot (create_app) built from its <ENV_PREFIX>_* environment variables with
+# the prefix removed (<ENV_PREFIX>_TWITTER_API_KEY, <ENV_PREFIX>_SLACK_WEBHOOK_URL,
+# ...), with its state and traffic archive in data/tenants/<name>/. Importing this
+# module only defines it; main() builds the tenants and runs them.
+
+TENANTS_DIR = 'data/tenants'
+
+def tenant_env(env_prefix: str, env: Mapping[str, str]) -> Dict[str, str]:
+    """The environment one tenant is built from: its <ENV_PREFIX>_* variables without the prefix"""
+    prefix = f"{env_prefix}_"
+    return {key[len(prefix):]: value for key, value in env.items() if key.startswith(prefix)}
+
+def share_detection(source: XBotBlocker, tenant: XBotBlocker) -> None:
+    """
+    Point a tenant at another tenant's verdict cache, single-flight and scoring
+    pool: an account scored for one tenant is not fetched again for the others,
+    an account two tenants look up at once is fetched once, and every tenant runs
+    the same detection config, so one set of worker processes serves them all.
+    """
+    tenant.bot_detector.verdict_cache = source.bot_detector.verdict_cache
+    tenant.bot_detector._single_flight = source.bot_detector._single_flight
+    if source.scoring_pool is not None:
+        tenant.scoring_pool = source.scoring_pool
+        tenant.bot_detector.scoring_pool = source.scoring_pool
+        cascade = tenant.bot_detector.cascade
+        if cascade is not None and cascade.behavior_analyzer is not None:
+            cascade.scoring_pool = source.scoring_pool
+
+def build_runner(config: ConfigManager, env: Optional[Mapping[str, str]] = None) -> MultiTenantRunner:
+    """
+    Build every account in tenants.accounts with its jobs on the runner's pool.
+    Raises ValueError if an account's X API credentials are missing.
+    """
+    env = os.environ if env is None else env
+    runner = MultiTenantRunner(max_workers=config.get('tenants.max_concurrent_scans', 4))
+    first = None
+    for account in config.get('tenants.accounts', []) or []:
+        name = account['name']
+        env_prefix = account.get('env_prefix', name.upper())
+        variables = tenant_env(env_prefix, env)
+
+        # Replayed traffic keeps its state (and each tenant its archive) apart from the live tenants
+        replaying = (variables.get('API_TRAFFIC_MODE') or config.get('api.traffic.mode', 'off')) == 'replay'
+        root = config.get('api.traffic.replay_data_dir', 'data/replay') if replaying else 'data'
+        data_dir = os.path.join(root, 'tenants', name)
+        variables.setdefault('API_TRAFFIC_ARCHIVE', os.path.join('data', 'tenants', name, 'api_traffic.jsonl.gz'))
+        try:
+            tenant = create_app(config, env=variables, data_dir=data_dir, job_pool=runner.pool)
+        except ValueError as e:
+            raise ValueError(f"Tenant {name} ({env_prefix}_*): {str(e)}") from e
+        if first is None:
+            first = tenant
+        else:
+            share_detection(first, tenant)
+        runner.add(name, tenant)
+    return runner
+
+def save_status(runner: MultiTenantRunner):
+    """Save every tenant's status to data/tenants/status.json"""
+    try:
+        tenants_dir = project_path(TENANTS_DIR)
+        os.makedirs(tenants_dir, exist_ok=True)
+        status = {
+            'updated_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S EST"),
+            'tenants': runner.get_status()
+        }
+        with open(os.path.join(tenants_dir, 'status.json'), 'w') as f:
+            json.dump(status, f, indent=2, default=str)
+    except Exception as e:
+        logging.error(f"Error saving tenant status: {str(e)}")
+
+def main():
+    # Load API Keys from .env file
+    load_dotenv()
+    configure_logging(os.getenv('LOG_LEVEL', 'INFO'), os.getenv('LOG_FILE', 'bot_blocker.log'))
+    config = ConfigManager()
+    runner = build_runner(config)
+    if not runner.tenants:
+        logging.error("No tenants configured under tenants.accounts in config.yaml")
+        raise SystemExit(1)
+
+    # The tenants' jobs are scheduled by their own schedulers; this one only writes status.json
+    status_scheduler = Scheduler()
+    status_scheduler.every('status', 60, lambda: save_status(runner))
+
+    def handle_shutdown(signum, frame):
+        """Handle shutdown signals"""
+        logging.info("Shutdown signal received")
+        status_scheduler.stop()
+        runner.stop()
+        save_status(runner)
+        exit(0)
+
+    signal.signal(signal.SIGINT, handle_shutdown)
+    signal.signal(signal.SIGTERM, handle_shutdown)
+
+    logging.info(f"Multi-tenant bot blocker started for {len(runner.tenants)} accounts")
+    runner.start()
+    status_scheduler.start()
+    status_scheduler.wait()
+
+if __name__ == "__main__":
+    main()
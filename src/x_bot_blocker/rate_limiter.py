@@ -0,0 +1,214 @@
+import time
+import logging
+import threading
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+from tweepy import TweepyException
+from tweepy.errors import TooManyRequests
+
+# X API v1.1 rate limit window (seconds)
+RATE_LIMIT_WINDOW = 900
+
+# tweepy.API method -> v1.1 endpoint it calls
+ENDPOINTS = {
+    'mentions_timeline': 'statuses/mentions_timeline',
+    'user_timeline': 'statuses/user_timeline',
+    'get_user': 'users/show',
+    'lookup_users': 'users/lookup',
+    'create_block': 'blocks/create',
+    'get_blocked_ids': 'blocks/ids',
+    'get_follower_ids': 'followers/ids',
+    'get_retweeter_ids': 'statuses/retweeters/ids'
+}
+
+# Requests per window assumed until the API reports the real limit
+DEFAULT_LIMITS = {
+    'statuses/mentions_timeline': 75,
+    'statuses/user_timeline': 900,
+    'users/show': 900,
+    'users/lookup': 900,
+    'blocks/create': 50,
+    'blocks/ids': 15,
+    'followers/ids': 15,
+    'statuses/retweeters/ids': 75
+}
+
+class RateLimitExceeded(TweepyException):
+    """Raised instead of sleeping when an endpoint has no budget left"""
+
+    def __init__(self, endpoint: str, reset_time: float):
+        self.endpoint = endpoint
+        self.reset_time = reset_time
+        super().__init__(f"Rate limit exhausted for {endpoint}")
+
+def is_rate_limit_error(e: Exception) -> bool:
+    """Check whether an exception means the API budget is exhausted"""
+    return isinstance(e, (RateLimitExceeded, TooManyRequests))
+
+class TokenBucket:
+    """
+    Token bucket for one endpoint. The refill rate follows the budget the API
+    reports (remaining calls spread over the time left until reset), so calls
+    are paced evenly instead of bursting into a 429.
+    """
+
+    def __init__(self, limit: int, burst: int, window: float = RATE_LIMIT_WINDOW):
+        self.limit = limit
+        self.window = window
+        self.burst = max(1, burst)
+        self.remaining = limit
+        self.reset_at = time.time() + window
+        self.rate = limit / window
+        self.tokens = float(self.burst)
+        self.updated = time.time()
+
+    def _refill(self, now: float) -> None:
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+            self.rate = self.limit / self.window
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a call may be made (0 if one may be made now)"""
+        self._refill(now)
+        if self.remaining < 1:
+            return max(0.0, self.reset_at - now)
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate if self.rate > 0 else max(0.0, self.reset_at - now)
+        return 0.0
+
+    def consume(self) -> None:
+        self.tokens -= 1
+        self.remaining -= 1
+
+    def sync(self, remaining: int, reset_at: float, limit: Optional[int] = None) -> None:
+        """Adopt the budget reported by x-rate-limit-* response headers"""
+        now = time.time()
+        if limit:
+            self.limit = limit
+        self.remaining = remaining
+        self.reset_at = reset_at
+        self.rate = max(remaining, 0) / max(reset_at - now, 1.0)
+        self.tokens = min(self.tokens, float(max(remaining, 0)))
+        self.updated = now
+
+class RateLimiter:
+    """Per-endpoint token buckets driven by the x-rate-limit-* response headers"""
+
+    def __init__(self, max_wait: float = 30, burst: int = 10, limits: Optional[Dict[str, int]] = None):
+        self.max_wait = max_wait
+        self.burst = burst
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.logger = logging.getLogger(__name__)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            limit = self.limits.get(endpoint, 15)
+            bucket = TokenBucket(limit, min(self.burst, limit))
+            self._buckets[endpoint] = bucket
+        return bucket
+
+    def acquire(self, endpoint: str, max_wait: Optional[float] = None) -> None:
+        """
+        Take a token for an endpoint, sleeping briefly to pace calls.
+        Raises RateLimitExceeded instead of waiting longer than max_wait, so
+        only work for the throttled endpoint is parked.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        while True:
+            with self._lock:
+                bucket = self._bucket(endpoint)
+                now = time.time()
+                wait = bucket.wait_time(now)
+                if wait <= 0:
+                    bucket.consume()
+                    return
+                if wait > max_wait:
+                    raise RateLimitExceeded(endpoint, now + wait)
+            time.sleep(wait)
+
+    def update_from_headers(self, endpoint: str, headers) -> None:
+        """Sync an endpoint's bucket with x-rate-limit-remaining/-reset/-limit headers"""
+        remaining = headers.get('x-rate-limit-remaining')
+        reset = headers.get('x-rate-limit-reset')
+        if remaining is None or reset is None:
+            return
+        limit = headers.get('x-rate-limit-limit')
+        try:
+            with self._lock:
+                self._bucket(endpoint).sync(int(remaining), float(reset), int(limit) if limit else None)
+        except ValueError:
+            self.logger.warning(f"Ignoring malformed rate limit headers for {endpoint}")
+
+    def mark_exhausted(self, endpoint: str, reset_time: Optional[float] = None) -> None:
+        """Record a 429 so further calls to the endpoint are parked until reset"""
+        with self._lock:
+            bucket = self._bucket(endpoint)
+            bucket.sync(0, reset_time or time.time() + bucket.window)
+
+    def get_status(self) -> Dict[str, Dict]:
+        """Get the current budget of every endpoint seen so far"""
+        with self._lock:
+            return {
+                endpoint: {
+                    'remaining': bucket.remaining,
+                    'limit': bucket.limit,
+                    'reset_at': bucket.reset_at
+                }
+                for endpoint, bucket in self._buckets.items()
+            }
+
+    def _on_response(self, response, *args, **kwargs):
+        """requests response hook: feed every API response's headers to the limiter"""
+        path = urlparse(response.url).path
+        if path.startswith('/1.1/') and path.endswith('.json'):
+            self.update_from_headers(path[len('/1.1/'):-len('.json')], response.headers)
+        return response
+
+class RateLimitedAPI:
+    """
+    Wraps a tweepy.API so each call first takes a token from its endpoint's bucket.
+    on_call, if given, is called after every API call with (endpoint, seconds, success).
+    """
+
+    def __init__(self, api, limiter: RateLimiter, on_call: Optional[Callable[[str, float, bool], None]] = None):
+        self._api = api
+        self._limiter = limiter
+        self.on_call = on_call
+        api.session.hooks['response'].append(limiter._on_response)
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        endpoint = ENDPOINTS.get(name)
+        if endpoint is None or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self._limiter.acquire(endpoint)
+            started = time.perf_counter()
+            success = False
+            try:
+                result = attr(*args, **kwargs)
+                success = True
+                return result
+            except TooManyRequests as e:
+                reset_time = getattr(e, 'reset_time', None)
+                if reset_time is None:
+                    reset = e.response.headers.get('x-rate-limit-reset') if e.response is not None else None
+                    reset_time = float(reset) if reset else None
+                self._limiter.mark_exhausted(endpoint, reset_time)
+                raise RateLimitExceeded(endpoint, reset_time or time.time() + RATE_LIMIT_WINDOW) from e
+            except TweepyException as e:
+                # Lets error reports group failures by endpoint
+                if getattr(e, 'endpoint', None) is None:
+                    e.endpoint = endpoint
+                raise
+            finally:
+                if self.on_call is not None:
+                    self.on_call(endpoint, time.perf_counter() - started, success)
+        return call
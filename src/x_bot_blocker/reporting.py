@@ -1,12 +1,14 @@
-import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 import os
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import json
 import logging
 from pathlib import Path
 
+# pandas is imported when metrics are first loaded, not with this module
+if TYPE_CHECKING:
+    import pandas as pd
+
 class ReportingSystem:
     def __init__(self, config):
         self.config = config
@@ -126,8 +128,9 @@ class ReportingSystem:
             self.logger.error(f"Error generating monthly report: {str(e)}")
             return {"error": str(e)}
 
-    def _load_metrics_data(self, days: int) -> pd.DataFrame:
+    def _load_metrics_data(self, days: int) -> 'pd.DataFrame':
         """Load metrics data from CSV files"""
+        import pandas as pd
         try:
             # Get all CSV files in the metrics directory
             files = [f for f in os.listdir(self.metrics_dir) if f.endswith('.csv')]
@@ -211,7 +214,7 @@ class ReportingSystem:
             self.logger.error(f"Error loading metrics data: {str(e)}")
             return pd.DataFrame()
 
-    def _calculate_accuracy(self, df: pd.DataFrame) -> float:
+    def _calculate_accuracy(self, df: 'pd.DataFrame') -> float:
         """Calculate detection accuracy"""
         total_blocks = df['blocks'].sum()
         if total_blocks == 0:
@@ -219,7 +222,7 @@ class ReportingSystem:
         false_positives = df['false_positives'].sum()
         return float((total_blocks - false_positives) / total_blocks)
 
-    def _calculate_error_rate(self, df: pd.DataFrame) -> float:
+    def _calculate_error_rate(self, df: 'pd.DataFrame') -> float:
         """Calculate API error rate"""
         total_calls = df['api_calls'].sum()
         if total_calls == 0:
@@ -227,7 +230,7 @@ class ReportingSystem:
         failed_requests = df['failed_requests'].sum()
         return float((failed_requests / total_calls) * 100)
 
-    def _calculate_trend(self, df: pd.DataFrame, column: str) -> Dict:
+    def _calculate_trend(self, df: 'pd.DataFrame', column: str) -> Dict:
         """Calculate trend for a specific metric"""
         if df.empty or len(df) < 2:
             return {'direction': 'stable', 'change': 0, 'significance': 'low'}
@@ -239,7 +242,7 @@ class ReportingSystem:
             'significance': 'low'
         }
 
-    def _analyze_errors(self, df: pd.DataFrame) -> List[Dict]:
+    def _analyze_errors(self, df: 'pd.DataFrame') -> List[Dict]:
         """Analyze error patterns"""
         try:
             # Collect all errors
@@ -276,7 +279,7 @@ class ReportingSystem:
             self.logger.error(f"Error analyzing errors: {str(e)}")
             return []
 
-    def _compare_with_previous_month(self, df: pd.DataFrame) -> Dict:
+    def _compare_with_previous_month(self, df: 'pd.DataFrame') -> Dict:
         """Compare current month with previous month"""
         try:
             if df.empty:
@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+class ScanJournal:
+    """
+    Crash-safe record of the scan in progress (SQLite in WAL mode): how far
+    back it has paged, the verdicts it has computed and how many blocks it
+    has queued. An interrupted scan is resumed from its last finished page
+    with its verdicts restored, so no profile is fetched twice. Queued and
+    issued blocks are already durable in the block queue and ledger.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        if db_path is None:
+            # Get the project root directory (two levels up from this file)
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            db_path = os.path.join(project_root, 'data', 'scan_journal.db')
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS scans (
+                scan_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                since_id INTEGER,
+                resume_max_id INTEGER,
+                newest_id INTEGER,
+                pages INTEGER NOT NULL DEFAULT 0,
+                blocks_queued INTEGER NOT NULL DEFAULT 0,
+                started_at TEXT NOT NULL,
+                finished_at TEXT
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS scan_verdicts (
+                scan_id INTEGER NOT NULL,
+                user_id TEXT NOT NULL,
+                is_bot INTEGER NOT NULL,
+                score REAL NOT NULL,
+                reason TEXT,
+                PRIMARY KEY (scan_id, user_id)
+            )"""
+        )
+        self._conn.commit()
+
+    def begin(self, source: str, since_id: Optional[int]) -> Dict:
+        """
+        Start a scan, or return the unfinished one for the same source.
+        Returns: {'scan_id', 'since_id', 'resume_max_id', 'newest_id', 'pages', 'blocks_queued', 'resumed'}
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT scan_id, since_id, resume_max_id, newest_id, pages, blocks_queued FROM scans "
+                "WHERE source = ? AND finished_at IS NULL ORDER BY scan_id DESC LIMIT 1",
+                (source,)
+            ).fetchone()
+            if row is not None:
+                scan_id, since_id, resume_max_id, newest_id, pages, blocks_queued = row
+                resumed = True
+            else:
+                cursor = self._conn.execute(
+                    "INSERT INTO scans (source, since_id, started_at) VALUES (?, ?, ?)",
+                    (source, since_id, datetime.now().isoformat())
+                )
+                self._conn.commit()
+                scan_id, resume_max_id, newest_id, pages, blocks_queued = cursor.lastrowid, None, None, 0, 0
+                resumed = False
+        return {
+            'scan_id': scan_id,
+            'since_id': since_id,
+            'resume_max_id': resume_max_id,
+            'newest_id': newest_id,
+            'pages': pages,
+            'blocks_queued': blocks_queued,
+            'resumed': resumed
+        }
+
+    def record_verdicts(self, scan_id: int, verdicts: Dict[str, Tuple[bool, float, str]]) -> None:
+        """Remember verdicts computed by a scan"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scan_verdicts (scan_id, user_id, is_bot, score, reason) VALUES (?, ?, ?, ?, ?)",
+                [(scan_id, user_id, int(is_bot), score, reason) for user_id, (is_bot, score, reason) in verdicts.items()]
+            )
+            self._conn.commit()
+
+    def get_verdicts(self, scan_id: int) -> Dict[str, Tuple[bool, float, str]]:
+        """Get the verdicts a scan has computed so far"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, is_bot, score, reason FROM scan_verdicts WHERE scan_id = ?",
+                (scan_id,)
+            ).fetchall()
+        return {user_id: (bool(is_bot), score, reason) for user_id, is_bot, score, reason in rows}
+
+    def page_done(self, scan_id: int, oldest_id: int, newest_id: int, blocks_queued: int = 0) -> None:
+        """Checkpoint a fully screened page; a resumed scan continues below oldest_id"""
+        with self._lock:
+            self._conn.execute(
+                """UPDATE scans SET
+                    resume_max_id = MIN(COALESCE(resume_max_id, ?), ?),
+                    newest_id = MAX(COALESCE(newest_id, ?), ?),
+                    pages = pages + 1,
+                    blocks_queued = blocks_queued + ?
+                WHERE scan_id = ?""",
+                (oldest_id - 1, oldest_id - 1, newest_id, newest_id, blocks_queued, scan_id)
+            )
+            self._conn.commit()
+
+    def finish(self, scan_id: int) -> None:
+        """Mark a scan complete and drop its verdicts"""
+        with self._lock:
+            self._conn.execute("UPDATE scans SET finished_at = ? WHERE scan_id = ?", (datetime.now().isoformat(), scan_id))
+            self._conn.execute("DELETE FROM scan_verdicts WHERE scan_id = ?", (scan_id,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,68 @@
+import os
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+class ScanState:
+    """Persistent scan cursors (e.g. newest processed mention ID) stored next to metrics.json"""
+
+    def __init__(self, state_file: Optional[str] = None):
+        if state_file is None:
+            # Get the project root directory (two levels up from this file)
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            state_file = os.path.join(project_root, 'data', 'scan_state.json')
+        self.state_file = state_file
+        self.logger = logging.getLogger(__name__)
+        self.state: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.load_state()
+
+    def load_state(self) -> None:
+        """Load scan state from file"""
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r') as f:
+                    self.state = json.load(f)
+        except Exception as e:
+            self.logger.error(f"Error loading scan state: {str(e)}")
+            self.state = {}
+
+    def save_state(self) -> None:
+        """Save scan state to file, replacing it atomically"""
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.state, f, indent=2)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            self.logger.error(f"Error saving scan state: {str(e)}")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a stored cursor value"""
+        with self._lock:
+            return self.state.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        """Set a cursor value and persist it"""
+        with self._lock:
+            self.state[key] = value
+            self.save_state()
+
+    def update(self, values: Dict[str, Any]) -> None:
+        """Set several cursor values in one write"""
+        with self._lock:
+            self.state.update(values)
+            self.save_state()
+
+    def advance(self, key: str, value: Optional[int]) -> None:
+        """Move a numeric ID cursor forward; older or missing IDs are ignored"""
+        if value is None:
+            return
+        with self._lock:
+            current = self.state.get(key)
+            if current is not None and int(current) >= int(value):
+                return
+            self.state[key] = int(value)
+            self.save_state()
@@ -0,0 +1,174 @@
+import time
+import logging
+import threading
+from concurrent.futures import Executor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+class ScheduledJob:
+    """A job and its next deadline. At most one run of a job is in flight at a time."""
+
+    def __init__(self, name: str, fn: Callable, interval: Optional[float] = None,
+                 at: Optional[str] = None, weekday: Optional[int] = None):
+        if (interval is None) == (at is None):
+            raise ValueError("A job needs either an interval or a time of day")
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.at = datetime.strptime(at, "%H:%M").time() if at is not None else None
+        self.weekday = weekday
+        self.running = False
+        self.triggered = False
+        self.runs = 0
+        self.last_run: Optional[float] = None
+        self.next_run = self.following_run(time.time())
+
+    def following_run(self, after: float) -> float:
+        """First deadline after a point in time"""
+        if self.interval is not None:
+            return after + self.interval
+        moment = datetime.fromtimestamp(after)
+        candidate = datetime.combine(moment.date(), self.at)
+        while candidate <= moment or (self.weekday is not None and candidate.weekday() != self.weekday):
+            candidate += timedelta(days=1)
+        return candidate.timestamp()
+
+class Scheduler:
+    """
+    Sleeps until the earliest job deadline (or until woken by trigger()) and
+    starts each due job on its own thread (or on `executor`, e.g. a thread
+    pool bounding the jobs of several schedulers), so a long scan never delays
+    the report jobs. A job that is still running when it comes due again is
+    run once more as soon as it finishes instead of overlapping.
+    """
+
+    def __init__(self, on_error: Optional[Callable[[str, Exception], None]] = None, executor: Optional[Executor] = None):
+        self.on_error = on_error
+        self.executor = executor
+        self.logger = logging.getLogger(__name__)
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def every(self, name: str, seconds: float, fn: Callable) -> ScheduledJob:
+        """Run fn every `seconds` seconds"""
+        return self._add(ScheduledJob(name, fn, interval=seconds))
+
+    def daily_at(self, name: str, at: str, fn: Callable, weekday: Optional[int] = None) -> ScheduledJob:
+        """Run fn every day (or on one weekday, 0 = Monday) at HH:MM local time"""
+        return self._add(ScheduledJob(name, fn, at=at, weekday=weekday))
+
+    def _add(self, job: ScheduledJob) -> ScheduledJob:
+        with self._cond:
+            self.jobs[job.name] = job
+            self._cond.notify_all()
+        return job
+
+    def trigger(self, name: str) -> None:
+        """Run a job now (or right after its current run) and wake the scheduler"""
+        with self._cond:
+            job = self.jobs[name]
+            job.triggered = True
+            self._cond.notify_all()
+
+    def reschedule(self, name: str, seconds: float) -> None:
+        """Change an interval job's interval, counted from its last run"""
+        with self._cond:
+            job = self.jobs[name]
+            job.interval = seconds
+            job.next_run = job.following_run(job.last_run if job.last_run is not None else time.time())
+            self._cond.notify_all()
+
+    def next_deadline(self) -> Optional[float]:
+        """Earliest deadline among jobs that are not running"""
+        with self._cond:
+            return self._next_deadline()
+
+    def _next_deadline(self) -> Optional[float]:
+        deadlines = [
+            time.time() if job.triggered else job.next_run
+            for job in self.jobs.values() if not job.running
+        ]
+        return min(deadlines) if deadlines else None
+
+    def run_pending(self) -> List[str]:
+        """Start every due job; returns the names of the jobs started"""
+        started = []
+        with self._cond:
+            now = time.time()
+            for job in self.jobs.values():
+                if job.running or not (job.triggered or job.next_run <= now):
+                    continue
+                job.running = True
+                job.triggered = False
+                job.last_run = now
+                job.next_run = job.following_run(now)
+                started.append(job)
+        for job in started:
+            if self.executor is not None:
+                self.executor.submit(self._run_job, job)
+            else:
+                threading.Thread(target=self._run_job, args=(job,), name=f"job-{job.name}", daemon=True).start()
+        return [job.name for job in started]
+
+    def _run_job(self, job: ScheduledJob) -> None:
+        try:
+            job.fn()
+        except Exception as e:
+            self.logger.error(f"Error in scheduled job {job.name}: {str(e)}")
+            if self.on_error:
+                self.on_error(job.name, e)
+        finally:
+            with self._cond:
+                job.running = False
+                job.runs += 1
+                # The job may have come due (or been triggered) while it ran
+                self._cond.notify_all()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    deadline = self._next_deadline()
+                    timeout = None if deadline is None else deadline - time.time()
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+            self.run_pending()
+
+    def start(self) -> None:
+        """Start the scheduler thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._loop, name='scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop scheduling new runs; runs in flight are not interrupted"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def wait(self) -> None:
+        """Block until the scheduler is stopped (signal handlers still run)"""
+        while self._thread is not None and self._thread.is_alive():
+            self._thread.join(1)
+
+    def get_status(self) -> Dict[str, Dict]:
+        """Get each job's state and deadlines"""
+        with self._cond:
+            return {
+                name: {
+                    'running': job.running,
+                    'runs': job.runs,
+                    'last_run': job.last_run,
+                    'next_run': job.next_run
+                }
+                for name, job in self.jobs.items()
+            }
@@ -0,0 +1,119 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from typing import Dict, List, Tuple
+
+# Only the attributes the profile and behavior heuristics read are shipped to workers
+USER_FIELDS = ('id', 'created_at', 'followers_count', 'friends_count', 'statuses_count', 'default_profile_image')
+TWEET_FIELDS = ('id', 'created_at', 'text')
+
+# Set in each worker process by _init_worker
+_detector = None
+_behavior_analyzer = None
+
+def compact(obj, fields: Tuple[str, ...]) -> Dict:
+    """Copy the listed attributes of a tweepy model into a small picklable dict"""
+    return {field: getattr(obj, field) for field in fields if hasattr(obj, field)}
+
+def _init_worker(detector, behavior_analyzer) -> None:
+    global _detector, _behavior_analyzer
+    _detector = detector
+    _behavior_analyzer = behavior_analyzer
+
+def _ready() -> int:
+    return os.getpid()
+
+def _score_profiles(batch: List[Tuple[str, Dict]]) -> List[Tuple[str, Tuple[bool, float, str]]]:
+    return [(user_id, _detector.score_user(SimpleNamespace(**fields))) for user_id, fields in batch]
+
+def _analyze_behavior(batch: List[Tuple[str, Dict, List[Dict]]]) -> List[Tuple[str, object]]:
+    return [
+        (user_id, analyze_safely(_behavior_analyzer, SimpleNamespace(**user_fields), [SimpleNamespace(**tweet) for tweet in tweets]))
+        for user_id, user_fields, tweets in batch
+    ]
+
+def analyze_safely(behavior_analyzer, user, tweets: List) -> object:
+    """behavior_analyzer.analyze_user(user, tweets), or the exception it raised"""
+    try:
+        return behavior_analyzer.analyze_user(user, tweets)
+    except Exception as e:
+        return e
+
+class ScoringPool:
+    """
+    Runs the pure-Python profile and behavior heuristics in worker processes so
+    scoring large batches does not hold the GIL of the process doing the I/O.
+
+    Workers are forked, not spawned: spawning would re-run the main script's
+    module-level setup in every worker. Call start() before any other thread is
+    started so the forked workers inherit no held locks.
+    """
+
+    def __init__(self, bot_detector, behavior_analyzer=None, workers: int = 0,
+                 batch_size: int = 500, min_batch: int = 200):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("The scoring pool needs the 'fork' start method")
+        self.bot_detector = bot_detector
+        self.behavior_analyzer = behavior_analyzer
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = max(1, batch_size)
+        self.min_batch = min_batch
+        self.logger = logging.getLogger(__name__)
+        self._pool = None
+
+    def start(self) -> None:
+        """Fork the worker processes"""
+        if self._pool is not None:
+            return
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_worker,
+            initargs=(self.bot_detector, self.behavior_analyzer)
+        )
+        # The first task forks every worker at once
+        self._pool.submit(_ready).result()
+        self.logger.info(f"Scoring pool started with {self.workers} workers")
+
+    def _tasks(self, items: List) -> List[List]:
+        """Split items into tasks of at most batch_size, spread over every worker"""
+        size = max(1, min(self.batch_size, -(-len(items) // self.workers)))
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def score_profiles(self, users: Dict) -> Dict[str, Tuple[bool, float, str]]:
+        """
+        Profile-score hydrated users, in worker processes for batches of at
+        least min_batch users (smaller batches are not worth the IPC).
+        Returns: {user_id: (is_bot, probability, reason)}
+        """
+        if self._pool is None or len(users) < self.min_batch:
+            return {user_id: self.bot_detector.score_user(user) for user_id, user in users.items()}
+
+        items = [(user_id, compact(user, USER_FIELDS)) for user_id, user in users.items()]
+        return {user_id: verdict for task in self._pool.map(_score_profiles, self._tasks(items)) for user_id, verdict in task}
+
+    def analyze_behavior(self, timelines: Dict[str, Tuple]) -> Dict[str, object]:
+        """
+        Run BehaviorAnalyzer.analyze_user for a batch of {user_id: (user, tweets)},
+        in worker processes for batches of at least min_batch users.
+        Returns: {user_id: (probability, reasons), or the exception analysis raised}
+        """
+        if self._pool is None or len(timelines) < self.min_batch:
+            return {
+                user_id: analyze_safely(self.behavior_analyzer, user, tweets)
+                for user_id, (user, tweets) in timelines.items()
+            }
+
+        items = [
+            (user_id, compact(user, USER_FIELDS), [compact(tweet, TWEET_FIELDS) for tweet in tweets])
+            for user_id, (user, tweets) in timelines.items()
+        ]
+        return {user_id: outcome for task in self._pool.map(_analyze_behavior, self._tasks(items)) for user_id, outcome in task}
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
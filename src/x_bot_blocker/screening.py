@@ -0,0 +1,54 @@
+import logging
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+def screen_user_ids(user_ids: Iterable, bot_detector, block_ledger, block_executor,
+                    known_users: Optional[Dict] = None,
+                    on_verdicts: Optional[Callable[[Dict], None]] = None,
+                    hydrated_users: Optional[Dict] = None,
+                    known_verdicts: Optional[Dict] = None) -> int:
+    """
+    Score accounts and queue blocks for the bots among them.
+    known_verdicts (e.g. from earlier in a resumed scan) are used as they are,
+    hydrated_users (full profiles, e.g. from webhook events) are scored as
+    they are and the other accounts are looked up.
+    on_verdicts, if given, receives the verdicts before any block is queued.
+    Rate limit errors propagate to the caller.
+    Returns: number of blocks queued
+    """
+    # Accounts already blocked or queued for blocking need neither a lookup nor a block;
+    # a reply storm from one account costs one verdict and one block
+    user_ids = [
+        user_id for user_id in dict.fromkeys(user_ids)
+        if user_id not in block_ledger and user_id not in block_executor
+    ]
+    if not user_ids:
+        return 0
+    
+    # Reuse known verdicts, score the full profiles we were given and hydrate the rest in batches of 100
+    known_verdicts = known_verdicts or {}
+    hydrated_users = hydrated_users or {}
+    verdicts = {user_id: known_verdicts[user_id] for user_id in user_ids if user_id in known_verdicts}
+    hydrated_users = {
+        user_id: hydrated_users[user_id] for user_id in user_ids
+        if user_id in hydrated_users and user_id not in verdicts
+    }
+    if hydrated_users:
+        verdicts.update(bot_detector.analyze_users(hydrated_users))
+    unhydrated = [user_id for user_id in user_ids if user_id not in verdicts]
+    if unhydrated:
+        verdicts.update(bot_detector.analyze_user_ids(unhydrated, known_users=known_users))
+    if on_verdicts is not None:
+        on_verdicts(verdicts)
+    
+    # Users missing from verdicts could not be hydrated (suspended or deleted).
+    # Blocks are queued; the block executor issues them at the configured pace.
+    queued = 0
+    for user_id in user_ids:
+        if user_id in verdicts and verdicts[user_id][0]:
+            _, score, reason = verdicts[user_id]
+            if block_executor.enqueue(user_id, score, reason):
+                queued += 1
+                logger.info(f"Queued block for user {user_id}: {reason}")
+    return queued
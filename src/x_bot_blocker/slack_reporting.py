@@ -101,7 +101,7 @@ class SlackReporter:
                 "type": "section",
                 "text": {
                     "type": "mrkdwn",
-                    "text": "*Recent Errors:*\n" + "\n".join(f"• {error}" for error in stats['errors'])
+                    "text": "*Top Errors:*\n" + "\n".join(f"• {error}" for error in stats['errors'])
                 }
             })
             
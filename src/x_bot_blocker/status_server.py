@@ -1,31 +1,49 @@
-from flask import Flask, jsonify, render_template, url_for
+from flask import Flask, jsonify, render_template, request, url_for
 import psutil
+import hmac
 import os
+import signal
 from datetime import datetime
-import json
 from functools import lru_cache
 import time
+from metrics_journal import load_metrics
 
 # Get the directory where this file is located
 current_dir = os.path.dirname(os.path.abspath(__file__))
 template_dir = os.path.join(current_dir, 'templates')
 static_dir = os.path.join(current_dir, 'static')
 
+# Written by the bot (x_bot_blocker.main) once its signal handlers are installed
+pid_file = os.path.join(os.path.dirname(os.path.dirname(current_dir)), 'bot.pid')
+
 app = Flask(__name__, 
            template_folder=template_dir,
            static_folder=static_dir)
 
+def read_bot_process():
+    """Get the bot process recorded in bot.pid if it's running"""
+    try:
+        with open(pid_file) as f:
+            proc = psutil.Process(int(f.read().strip()))
+        # A stale PID may have been reused by another process
+        if 'x_bot_blocker.py' in ' '.join(proc.cmdline()):
+            return proc
+    except (OSError, ValueError, psutil.NoSuchProcess, psutil.AccessDenied):
+        pass
+    return None
+
 # Cache metrics for 5 seconds
 @lru_cache(maxsize=1)
 def get_bot_process():
     """Get the bot process if it's running"""
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            if 'x_bot_blocker.py' in ' '.join(proc.info['cmdline']):
-                return proc
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
-    return None
+    return read_bot_process()
+
+def scan_authorized():
+    """/scan needs STATUS_SERVER_TOKEN as a bearer token, or a local request if no token is set"""
+    token = os.getenv('STATUS_SERVER_TOKEN')
+    if token:
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}")
+    return request.remote_addr in ('127.0.0.1', '::1')
 
 # Cache logs for 10 seconds
 @lru_cache(maxsize=1)
@@ -42,22 +60,18 @@ def read_recent_logs():
 # Cache metrics for 5 seconds
 @lru_cache(maxsize=1)
 def get_bot_metrics():
-    """Get current bot metrics"""
-    # Get the project root directory (two levels up from this file)
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    metrics_file = os.path.join(project_root, 'data', 'metrics.json')
-    
+    """Get current bot metrics (last snapshot plus the journaled counter deltas)"""
     try:
-        with open(metrics_file, 'r') as f:
-            return json.load(f)
+        metrics = load_metrics()
     except Exception:
-        return {
-            'total_blocks': 0,
-            'false_positives': 0,
-            'api_calls': 0,
-            'last_scan_time': None,
-            'errors': []
-        }
+        metrics = {}
+    return metrics or {
+        'total_blocks': 0,
+        'false_positives': 0,
+        'api_calls': 0,
+        'last_scan_time': None,
+        'errors': []
+    }
 
 # Cache process info for 5 seconds
 @lru_cache(maxsize=1)
@@ -108,10 +122,11 @@ def get_status():
     
     return jsonify({
         'status': 'running' if bot_process else 'stopped',
-        'pid': bot_process.info['pid'] if bot_process else None,
+        'pid': bot_process.pid if bot_process else None,
         'uptime': process_info['uptime'],
         'recent_logs': recent_logs,
         'metrics': metrics,
+        'top_errors': metrics.get('error_summary', {}).get('top', []),
         'timestamp': datetime.now().isoformat()
     })
 
@@ -131,7 +146,7 @@ def get_health():
     return jsonify({
         'status': 'healthy',
         'process': {
-            'pid': bot_process.info['pid'],
+            'pid': bot_process.pid,
             'cpu_percent': process_info['cpu_percent'],
             'memory_percent': process_info['memory_percent'],
             'uptime': process_info['uptime']
@@ -139,6 +154,36 @@ def get_health():
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/scan', methods=['POST'])
+def trigger_scan():
+    """Ask the bot to scan now instead of waiting for its next scheduled scan"""
+    if not scan_authorized():
+        return jsonify({
+            'status': 'error',
+            'reason': 'Not authorized',
+            'timestamp': datetime.now().isoformat()
+        }), 403
+
+    # Only the PID the bot recorded after installing its SIGUSR1 handler is signalled
+    bot_process = read_bot_process()
+    try:
+        if not bot_process:
+            raise psutil.NoSuchProcess(None)
+        bot_process.send_signal(signal.SIGUSR1)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        get_bot_process.cache_clear()
+        return jsonify({
+            'status': 'error',
+            'reason': 'Bot process not running',
+            'timestamp': datetime.now().isoformat()
+        }), 503
+    
+    return jsonify({
+        'status': 'scan requested',
+        'pid': bot_process.pid,
+        'timestamp': datetime.now().isoformat()
+    }), 202
+
 if __name__ == '__main__':
     # Get port from environment or use default
     port = int(os.getenv('STATUS_SERVER_PORT', 8080))
@@ -0,0 +1,43 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+class MultiTenantRunner:
+    """
+    Runs several protected accounts in one process. Each tenant is a full bot
+    (XBotBlocker) with its own scheduler, so every tenant's scans keep their
+    own deadlines and a backlogged or rate limited tenant never delays
+    another's. All tenants' schedulers run their jobs on `pool`, a bounded
+    thread pool: at most max_workers jobs run at once, and due jobs wait for
+    a free worker in the order they came due.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max(1, int(max_workers))
+        self.logger = logging.getLogger(__name__)
+        self.tenants: Dict[str, object] = {}
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='tenant-job')
+
+    def add(self, name: str, tenant) -> None:
+        """Add a tenant whose scheduler was built with executor=self.pool"""
+        if name in self.tenants:
+            raise ValueError(f"Tenant names must be unique (and so data directories): {name}")
+        self.tenants[name] = tenant
+
+    def start(self) -> None:
+        """Start every tenant; monitoring is per process, not per tenant"""
+        for name, tenant in self.tenants.items():
+            self.logger.info(f"Starting tenant {name}")
+            tenant.start(monitoring=False)
+
+    def stop(self) -> None:
+        """Stop scheduling, let the jobs in flight finish, then stop every tenant"""
+        for tenant in self.tenants.values():
+            tenant.scheduler.stop()
+        self.pool.shutdown(wait=True)
+        for tenant in self.tenants.values():
+            tenant.stop()
+
+    def get_status(self) -> Dict[str, Dict]:
+        """Get the status of every tenant"""
+        return {name: tenant.get_status() for name, tenant in self.tenants.items()}
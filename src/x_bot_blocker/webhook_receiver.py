@@ -0,0 +1,232 @@
+import hmac
+import json
+import queue
+import base64
+import hashlib
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Account activity event types screened, and the counter each one feeds
+EVENT_TYPES = {
+    'tweet_create_events': 'mentions',
+    'follow_events': 'follows',
+    'favorite_events': 'likes'
+}
+
+# User JSON fields profile scoring reads; events carrying all of them need no users/lookup
+PROFILE_FIELDS = ('id', 'created_at', 'followers_count', 'friends_count', 'statuses_count', 'default_profile_image')
+
+def sign(secret: str, message: bytes) -> str:
+    """sha256=<base64 HMAC-SHA256>, as used by CRC responses and signature headers"""
+    digest = hmac.new(secret.encode('utf-8'), message, hashlib.sha256).digest()
+    return 'sha256=' + base64.b64encode(digest).decode('ascii')
+
+def crc_response(crc_token: str, consumer_secret: str) -> Dict[str, str]:
+    """Answer to an X CRC challenge (GET with crc_token)"""
+    return {'response_token': sign(consumer_secret, crc_token.encode('utf-8'))}
+
+def verify_signature(body: bytes, signature: Optional[str], consumer_secret: str) -> bool:
+    """Check an x-twitter-webhooks-signature header against the request body"""
+    return bool(signature) and hmac.compare_digest(sign(consumer_secret, body), signature)
+
+def is_full_profile(user: Dict) -> bool:
+    """Whether event user JSON has every field profile scoring reads"""
+    return all(field in user for field in PROFILE_FIELDS)
+
+def extract_users(payload: Dict) -> List[Tuple[str, str, Dict]]:
+    """
+    Accounts to screen from one account activity payload: authors of tweets
+    mentioning us, new followers and accounts liking our tweets. Our own
+    activity is ignored.
+    Returns: [(event type, user_id, user JSON)]
+    """
+    for_user_id = str(payload.get('for_user_id', ''))
+    users = []
+
+    for tweet in payload.get('tweet_create_events', []):
+        author = tweet.get('user') or {}
+        mentioned = {str(m.get('id_str', m.get('id'))) for m in (tweet.get('entities') or {}).get('user_mentions', [])}
+        if str(author.get('id_str', author.get('id'))) != for_user_id and for_user_id in mentioned:
+            users.append(('mentions', author))
+
+    for follow in payload.get('follow_events', []):
+        target = follow.get('target') or {}
+        if follow.get('type') == 'follow' and str(target.get('id_str', target.get('id'))) == for_user_id:
+            users.append(('follows', follow.get('source') or {}))
+
+    for favorite in payload.get('favorite_events', []):
+        liked = (favorite.get('favorited_status') or {}).get('user') or {}
+        if str(liked.get('id_str', liked.get('id'))) == for_user_id:
+            users.append(('likes', favorite.get('user') or {}))
+
+    return [
+        (event_type, str(user.get('id_str', user.get('id'))), user)
+        for event_type, user in users if user.get('id_str') or user.get('id')
+    ]
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self, status: int, body: Dict):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        receiver = self.server.receiver
+        parsed = urlparse(self.path)
+        crc_token = parse_qs(parsed.query).get('crc_token', [None])[-1]
+        if parsed.path != receiver.path or not crc_token:
+            return self._respond(404, {'error': 'not found'})
+        self._respond(200, crc_response(crc_token, receiver.consumer_secret))
+
+    def do_POST(self):
+        receiver = self.server.receiver
+        body = self.rfile.read(int(self.headers.get('content-length', 0)))
+        if urlparse(self.path).path != receiver.path:
+            return self._respond(404, {'error': 'not found'})
+        if not verify_signature(body, self.headers.get('x-twitter-webhooks-signature'), receiver.consumer_secret):
+            receiver.count('rejected')
+            return self._respond(401, {'error': 'bad signature'})
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            receiver.count('rejected')
+            return self._respond(400, {'error': 'invalid JSON'})
+        # Acknowledge at once; screening happens on the receiver's worker thread
+        receiver.submit(payload)
+        self._respond(200, {})
+
+    def log_message(self, format, *args):
+        pass
+
+class WebhookReceiver:
+    """
+    Local HTTP receiver for account activity webhook events. Answers CRC
+    challenges, verifies payload signatures and puts the accounts behind
+    mentions, follows and likes on a queue. A worker thread screens them as
+    they arrive, draining whatever has queued up into one batch.
+
+    on_users(user_ids, users) receives the account IDs of a batch and their
+    user JSON from the events. When the queue is full, events are dropped
+    and left to the polling scans.
+    """
+
+    def __init__(self, consumer_secret: str, on_users: Callable[[List[str], Dict[str, Dict]], None],
+                 host: str = '127.0.0.1', port: int = 8081, path: str = '/webhooks/twitter',
+                 queue_size: int = 10000, batch_size: int = 100, stop_timeout: float = 10):
+        if not consumer_secret:
+            raise ValueError("The webhook receiver needs the consumer secret for CRC and signatures")
+        self.consumer_secret = consumer_secret
+        self.on_users = on_users
+        self.host = host
+        self.port = port
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.stop_timeout = stop_timeout
+        self.logger = logging.getLogger(__name__)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._server = None
+        self._threads = []
+        self.stats = {'payloads': 0, 'rejected': 0, 'dropped': 0, 'screened': 0, 'errors': 0,
+                      **{name: 0 for name in EVENT_TYPES.values()}}
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += n
+
+    def submit(self, payload: Dict) -> int:
+        """Queue the accounts of one payload; returns how many were queued"""
+        self.count('payloads')
+        queued = 0
+        for event_type, user_id, user in extract_users(payload):
+            try:
+                self._queue.put_nowait((user_id, user))
+            except queue.Full:
+                self.count('dropped')
+                continue
+            self.count(event_type)
+            queued += 1
+        return queued
+
+    def _next_batch(self) -> Optional[Dict[str, Dict]]:
+        item = self._queue.get()
+        if item is None:
+            return None
+        batch = {item[0]: item[1]}
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Screen what we have, then stop
+                self._queue.put(None)
+                break
+            batch[item[0]] = item[1]
+        return batch
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self.on_users(list(batch), batch)
+                self.count('screened', len(batch))
+            except Exception as e:
+                self.count('errors')
+                self.logger.error(f"Error screening webhook events: {str(e)}")
+
+    def start(self) -> None:
+        """Start the HTTP server and the screening worker"""
+        if self._server is not None:
+            return
+        self._stopping.clear()
+        self._server = ThreadingHTTPServer((self.host, self.port), WebhookHandler)
+        self._server.daemon_threads = True
+        self._server.receiver = self
+        self.port = self._server.server_address[1]
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name='webhook-server', daemon=True),
+            threading.Thread(target=self._work, name='webhook-worker', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self.logger.info(f"Webhook receiver listening on http://{self.host}:{self.port}{self.path}")
+
+    def stop(self) -> None:
+        """
+        Stop accepting events and screen the ones already queued, waiting at
+        most stop_timeout seconds per thread (this runs in the signal handler;
+        a worker stuck behind a rate limit must not block shutdown). Events
+        left unscreened are picked up by the polling scans.
+        """
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            # No room for the sentinel: stop after the batch in progress
+            self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout=self.stop_timeout)
+            if thread.is_alive():
+                self.logger.warning(f"Webhook thread {thread.name} did not stop within {self.stop_timeout}s")
+        self._server = None
+        self._threads = []
+
+    def get_stats(self) -> Dict:
+        """Get event counters and the queue depth"""
+        with self._lock:
+            return {**self.stats, 'queued': self._queue.qsize()}
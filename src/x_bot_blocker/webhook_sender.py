@@ -0,0 +1,92 @@
+import os
+import sys
+import json
+import random
+import secrets
+import argparse
+from datetime import datetime, timedelta, timezone
+import requests
+from dotenv import load_dotenv
+from webhook_receiver import sign
+
+# Local stand-in for X's account activity webhooks: runs the CRC challenge
+# against the receiver, then posts signed mention/follow/like events from
+# generated accounts (bot-like ones with --bots).
+#
+#   python src/x_bot_blocker/webhook_sender.py --for-user-id 12345 --type mention --count 20 --bots 5
+
+def make_user(user_id: int, bot: bool) -> dict:
+    """v1.1 user JSON; bots are new, followerless and keep the default avatar"""
+    age_days = random.randint(1, 10) if bot else random.randint(400, 4000)
+    created_at = datetime.now(timezone.utc) - timedelta(days=age_days)
+    return {
+        'id': user_id,
+        'id_str': str(user_id),
+        'screen_name': f"user{user_id}",
+        'created_at': created_at.strftime('%a %b %d %H:%M:%S +0000 %Y'),
+        'followers_count': 0 if bot else random.randint(50, 5000),
+        'friends_count': random.randint(500, 2000) if bot else random.randint(50, 500),
+        'statuses_count': random.randint(0, 5) if bot else random.randint(100, 20000),
+        'default_profile_image': bot
+    }
+
+def make_payload(event_type: str, for_user_id: str, user: dict) -> dict:
+    """Account activity payload for one event from `user` at our account"""
+    me = {'id': int(for_user_id), 'id_str': for_user_id, 'screen_name': 'me'}
+    tweet_id = random.randint(10 ** 17, 10 ** 18)
+    if event_type == 'mention':
+        return {'for_user_id': for_user_id, 'tweet_create_events': [{
+            'id': tweet_id,
+            'id_str': str(tweet_id),
+            'text': f"@me hello from {user['screen_name']}",
+            'user': user,
+            'entities': {'user_mentions': [me]}
+        }]}
+    if event_type == 'follow':
+        return {'for_user_id': for_user_id, 'follow_events': [{'type': 'follow', 'source': user, 'target': me}]}
+    return {'for_user_id': for_user_id, 'favorite_events': [{
+        'user': user,
+        'favorited_status': {'id': tweet_id, 'id_str': str(tweet_id), 'user': me}
+    }]}
+
+def check_crc(url: str, secret: str) -> bool:
+    """Send a CRC challenge the way X does and check the response token"""
+    token = secrets.token_urlsafe(24)
+    response = requests.get(url, params={'crc_token': token}, timeout=10)
+    return response.ok and response.json().get('response_token') == sign(secret, token.encode('utf-8'))
+
+def send(url: str, secret: str, payload: dict) -> int:
+    """Post one signed payload; returns the HTTP status"""
+    body = json.dumps(payload).encode('utf-8')
+    response = requests.post(url, data=body, timeout=10, headers={
+        'content-type': 'application/json',
+        'x-twitter-webhooks-signature': sign(secret, body)
+    })
+    return response.status_code
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Send account activity webhook events to the local receiver")
+    parser.add_argument('--url', default='http://127.0.0.1:8081/webhooks/twitter')
+    parser.add_argument('--secret', default=os.getenv('TWITTER_API_SECRET'), help="consumer secret (default: TWITTER_API_SECRET)")
+    parser.add_argument('--for-user-id', required=True, help="ID of the protected account")
+    parser.add_argument('--type', choices=['mention', 'follow', 'like'], default='mention')
+    parser.add_argument('--count', type=int, default=10, help="events to send")
+    parser.add_argument('--bots', type=int, default=0, help="how many of the senders look like bots")
+    args = parser.parse_args()
+
+    if not args.secret:
+        sys.exit("No consumer secret: pass --secret or set TWITTER_API_SECRET")
+    if not check_crc(args.url, args.secret):
+        sys.exit(f"CRC check against {args.url} failed")
+    print("CRC check passed")
+
+    statuses = {}
+    for i in range(args.count):
+        user = make_user(random.randint(10 ** 9, 10 ** 10), bot=i < args.bots)
+        status = send(args.url, args.secret, make_payload(args.type, args.for_user_id, user))
+        statuses[status] = statuses.get(status, 0) + 1
+    print(f"Sent {args.count} {args.type} events: {statuses}")
+
+if __name__ == '__main__':
+    main()
@@ -1,286 +1,826 @@
 import tweepy
-import time
 import logging
 import os
 import signal
-import json
+from concurrent.futures import Executor
 from datetime import datetime
+from typing import Dict, Optional
 from dotenv import load_dotenv
 from tweepy import TweepyException
-import schedule
+from tweepy.models import User
 from config_manager import ConfigManager
 from slack_reporting import SlackReporter
 from bot_detection import BotDetector
+from scan_state import ScanState
+from scan_journal import ScanJournal
+from block_ledger import BlockLedger
+from block_executor import BlockExecutor
+from ingestion import SeenWindow, iter_engager_id_pages, iter_follower_id_pages, iter_mention_pages
+from detection_cascade import DetectionCascade
+from rate_limiter import RateLimiter, RateLimitedAPI, is_rate_limit_error
+from api_traffic import setup_api_traffic
+from screening import screen_user_ids
+from scheduler import Scheduler
+from metrics_registry import MetricsRegistry
+from metrics_journal import MetricsJournal
+from error_tracker import ErrorTracker
 
-# Load API Keys from .env file
-load_dotenv()
-
-# Initialize configuration
-config = ConfigManager()
-
-# Set up logging based on config
-log_level = os.getenv('LOG_LEVEL', 'INFO')
-log_file = os.getenv('LOG_FILE', 'bot_blocker.log')
-
-# Ensure log directory exists
-log_dir = os.path.dirname(log_file)
-if log_dir and not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-
-# Configure logging with both file and console handlers
-logger = logging.getLogger()
-logger.setLevel(getattr(logging, log_level))
-
-# Clear any existing handlers
-logger.handlers = []
-
-# Create formatters
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-
-# File handler
-file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
-
-# Console handler
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
-
-# Test logging
-logging.info("Logging system initialized")
-
-# Initialize API credentials
-API_KEY = os.getenv("TWITTER_API_KEY")
-API_SECRET = os.getenv("TWITTER_API_SECRET")
-ACCESS_TOKEN = os.getenv("TWITTER_ACCESS_TOKEN")
-ACCESS_SECRET = os.getenv("TWITTER_ACCESS_TOKEN_SECRET")
-SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
-
-# Validate required credentials
-if not all([API_KEY, API_SECRET, ACCESS_TOKEN, ACCESS_SECRET]):
-    error_msg = "Missing required Twitter API credentials in .env file"
-    logging.error(error_msg)
-    raise ValueError(error_msg)
-
-# Authenticate with X API
-auth = tweepy.OAuthHandler(API_KEY, API_SECRET)
-auth.set_access_token(ACCESS_TOKEN, ACCESS_SECRET)
-api = tweepy.API(auth, wait_on_rate_limit=True)
-
-# Initialize bot detector with config
-bot_detector = BotDetector(api, config_path="config.yaml")
-
-# Initialize Slack reporter
-slack_reporter = SlackReporter(SLACK_WEBHOOK_URL)
-
-# Initialize KPI tracking
-kpi_stats = {
-    'total_blocks': 0,
-    'false_positives': 0,
-    'api_calls': 0,
-    'errors': [],
-    'last_scan_time': None,
-    'api_status': {
-        'rate_limits_hit': 0,
-        'last_rate_limit': None,
-        'connection_errors': 0,
-        'last_error': None
-    }
-}
-
-def save_metrics():
-    """Save current metrics to JSON file"""
-    try:
-        # Get the project root directory (two levels up from this file)
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        data_dir = os.path.join(project_root, 'data')
-        
-        # Ensure data directory exists
-        os.makedirs(data_dir, exist_ok=True)
-        
-        # Save metrics to file
-        metrics_file = os.path.join(data_dir, 'metrics.json')
-        with open(metrics_file, 'w') as f:
-            json.dump(kpi_stats, f, indent=2)
-        logging.info(f"Metrics saved to {metrics_file}")
-    except Exception as e:
-        logging.error(f"Error saving metrics: {str(e)}")
-
-def handle_rate_limit(e: TweepyException):
-    """Handle rate limit errors"""
-    kpi_stats['api_status']['rate_limits_hit'] += 1
-    kpi_stats['api_status']['last_rate_limit'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S EST")
-    
-    if hasattr(e, 'reset_time'):
-        reset_time = datetime.fromtimestamp(e.reset_time).strftime("%Y-%m-%d %H:%M:%S EST")
-        slack_reporter.send_rate_limit_notification(str(e), reset_time)
-        logging.warning(f"Rate limit hit. Resets at {reset_time}")
-        wait_time = e.reset_time - time.time()
-        if wait_time > 0:
-            time.sleep(wait_time)
-    else:
-        logging.warning("Rate limit hit. Waiting 15 minutes...")
-        time.sleep(900)  # Wait 15 minutes
-    
-    # After waiting, try to continue operation
-    logging.info("Resuming operation after rate limit wait")
-
-def handle_shutdown(signum, frame):
-    """Handle shutdown signals"""
-    logging.info("Shutdown signal received")
-    slack_reporter.send_shutdown_notification("Received shutdown signal")
-    exit(0)
-
-def send_daily_report():
-    """Send daily KPI report"""
-    try:
-        # Calculate accuracy
-        accuracy = 100.0 if kpi_stats['total_blocks'] > 0 else 0.0
-        
-        # Prepare API status message
-        api_status = "✅ Normal"
-        if kpi_stats['api_status']['rate_limits_hit'] > 0:
-            api_status = f"⚠️ Rate limits hit: {kpi_stats['api_status']['rate_limits_hit']} times"
-        if kpi_stats['api_status']['connection_errors'] > 0:
-            api_status = f"❌ Connection errors: {kpi_stats['api_status']['connection_errors']} times"
-        
-        # Send daily report
-        slack_reporter.send_daily_report({
-            'total_blocks': kpi_stats['total_blocks'],
-            'false_positives': kpi_stats['false_positives'],
-            'accuracy': accuracy,
-            'api_calls': kpi_stats['api_calls'],
-            'api_status': api_status,
-            'last_scan': kpi_stats['last_scan_time'],
-            'errors': kpi_stats['errors'][-3:]
+# Importing this module only defines the bot. create_app() builds it from
+# config.yaml and the environment, and main() runs it. Optional subsystems
+# (timeline and image analysis, the async scan engine, the scoring pool, the
+# adaptive interval, webhooks and monitoring) are imported where they are
+# enabled, so tools, tests and workers do not pay for what is switched off.
+
+CREDENTIAL_KEYS = ('TWITTER_API_KEY', 'TWITTER_API_SECRET', 'TWITTER_ACCESS_TOKEN', 'TWITTER_ACCESS_TOKEN_SECRET')
+
+# Get the project root directory (two levels up from this file)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def project_path(path: str) -> str:
+    """Resolve a path relative to the project root"""
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+def configure_logging(log_level: str = 'INFO', log_file: str = 'bot_blocker.log'):
+    """Send log records to log_file and the console"""
+    # Ensure log directory exists
+    log_dir = os.path.dirname(log_file)
+    if log_dir and not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    # Configure logging with both file and console handlers
+    logger = logging.getLogger()
+    logger.setLevel(getattr(logging, log_level))
+
+    # Clear any existing handlers
+    logger.handlers = []
+
+    # Create formatters
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+
+    # File handler
+    file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+    # Console handler
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    logger.addHandler(console_handler)
+
+    logging.info("Logging system initialized")
+
+class XBotBlocker:
+    """
+    The bot: X API client, detection, scan state, block queue, metrics and
+    the job schedule. Building one opens its state files under data_dir
+    (data/ by default) but makes no API calls and starts no threads; start()
+    does that. Scheduled jobs run on their own threads, or on job_pool when
+    several bots share a process (multi_tenant.py).
+    """
+
+    def __init__(self, config: ConfigManager, credentials: Dict[str, str], slack_webhook_url: Optional[str] = None,
+                 api_traffic_mode: Optional[str] = None, api_traffic_archive: Optional[str] = None,
+                 data_dir: Optional[str] = None, job_pool: Optional[Executor] = None):
+        self.config = config
+
+        # Scan cursors, the scan journal, block ledger, block queue and metrics live in data_dir.
+        # Replayed traffic must never move the live cursors or mark replayed accounts as blocked.
+        api_traffic_mode = api_traffic_mode or config.get('api.traffic.mode', 'off')
+        if data_dir is None and api_traffic_mode == 'replay':
+            data_dir = config.get('api.traffic.replay_data_dir', 'data/replay')
+        self.data_dir = project_path(data_dir or 'data')
+        if api_traffic_mode == 'replay' and os.path.realpath(self.data_dir) == os.path.realpath(project_path('data')):
+            raise ValueError("Replaying API traffic needs its own data directory (api.traffic.replay_data_dir)")
+        os.makedirs(self.data_dir, exist_ok=True)
+
+        # Authenticate with X API
+        auth = tweepy.OAuthHandler(credentials['TWITTER_API_KEY'], credentials['TWITTER_API_SECRET'])
+        auth.set_access_token(credentials['TWITTER_ACCESS_TOKEN'], credentials['TWITTER_ACCESS_TOKEN_SECRET'])
+        # Rate limits are paced per endpoint from the x-rate-limit-* headers instead of
+        # tweepy's wait_on_rate_limit, which would stall the whole process
+        self.rate_limiter = RateLimiter(
+            max_wait=config.get('api.rate_limit.max_wait', 30),
+            burst=config.get('api.rate_limit.burst', 10),
+            limits=config.get('api.rate_limit.endpoints', {})
+        )
+        self.raw_api = tweepy.API(auth, wait_on_rate_limit=False)
+
+        # Optionally record all X API traffic to an archive, or replay one offline
+        api_traffic_archive = project_path(
+            api_traffic_archive or config.get('api.traffic.archive', 'data/api_traffic.jsonl.gz')
+        )
+        self.api_recorder, self.api_replayer = setup_api_traffic(
+            self.raw_api.session, api_traffic_mode, api_traffic_archive
+        )
+        if self.api_recorder is not None:
+            logging.info(f"Recording X API traffic to {api_traffic_archive}")
+        if self.api_replayer is not None:
+            logging.info(f"Replaying X API traffic from {api_traffic_archive} with state in {self.data_dir}")
+
+        # Counters, gauges and histograms read by the Slack reports, data/metrics.json
+        # and the monitoring exporter
+        self.metrics = MetricsRegistry()
+        self.api_calls = self.metrics.counter('api_calls', "X API calls")
+        self.failed_requests = self.metrics.counter('api_status.failed_requests', "X API calls that failed")
+        self.response_times = self.metrics.histogram('api_status.response_seconds', "X API response time")
+
+        self.api = RateLimitedAPI(self.raw_api, self.rate_limiter, on_call=self.record_api_call)
+
+        # Initialize bot detector with config
+        self.bot_detector = BotDetector(self.api, detection_config=config.get('bot_detection', {}) or {})
+        if config.get('bot_detection.cascade.enabled', False):
+            self.bot_detector.cascade = self.build_detection_cascade()
+        if self.bot_detector.shadow is not None:
+            logging.info(f"Shadow policies: {', '.join(policy.name for policy in self.bot_detector.shadow.policies)}")
+
+        # Score large batches in worker processes if enabled; started in start() before any thread
+        self.scoring_pool = None
+        if config.get('bot_detection.process_pool.enabled', False):
+            from scoring_pool import ScoringPool
+            cascade = self.bot_detector.cascade
+            self.scoring_pool = ScoringPool(
+                self.bot_detector,
+                behavior_analyzer=cascade.behavior_analyzer if cascade is not None else None,
+                workers=config.get('bot_detection.process_pool.workers', 0),
+                batch_size=config.get('bot_detection.process_pool.batch_size', 500),
+                min_batch=config.get('bot_detection.process_pool.min_batch', 200)
+            )
+            self.bot_detector.scoring_pool = self.scoring_pool
+            if cascade is not None and cascade.behavior_analyzer is not None:
+                cascade.scoring_pool = self.scoring_pool
+
+        # Issue the lookup and cascade timeline calls of each batch concurrently if enabled
+        self.scan_engine = None
+        if config.get('scanning.async_engine.enabled', False):
+            from async_scan import AsyncScanEngine
+            self.scan_engine = AsyncScanEngine(
+                self.api,
+                max_concurrency=config.get('scanning.async_engine.max_concurrency', 8)
+            )
+            self.bot_detector.scan_engine = self.scan_engine
+            if self.bot_detector.cascade is not None:
+                self.bot_detector.cascade.scan_engine = self.scan_engine
+            logging.info(f"Async scan engine enabled (max concurrency {self.scan_engine.max_concurrency})")
+
+        # Adapt the mention scan interval to mention volume, bot share and rate limit budget if enabled
+        self.adaptive_interval = None
+        if config.get('scanning.adaptive_interval.enabled', False):
+            from adaptive_interval import AdaptiveInterval
+            self.adaptive_interval = AdaptiveInterval(
+                config.get('scanning.scan_interval', 60) * 60,
+                min_interval=config.get('scanning.adaptive_interval.min_interval', 2) * 60,
+                max_interval=config.get('scanning.adaptive_interval.max_interval', 60) * 60,
+                rate_limiter=self.rate_limiter,
+                target_mentions=config.get('scanning.adaptive_interval.target_mentions', 200),
+                raid_bot_ratio=config.get('scanning.adaptive_interval.raid_bot_ratio', 0.2),
+                backoff=config.get('scanning.adaptive_interval.backoff', 1.5)
+            )
+
+        # Initialize persistent scan cursors (scan_state.json)
+        self.scan_state = ScanState(os.path.join(self.data_dir, 'scan_state.json'))
+
+        # Initialize the journal of the scan in progress (scan_journal.db)
+        self.scan_journal = ScanJournal(os.path.join(self.data_dir, 'scan_journal.db'))
+
+        # Initialize the ledger of accounts we have already blocked (blocked_accounts.db)
+        self.block_ledger = BlockLedger(os.path.join(self.data_dir, 'blocked_accounts.db'))
+
+        # Initialize the paced block queue (block_queue.db); started in start()
+        self.block_executor = BlockExecutor(
+            self.api,
+            db_path=os.path.join(self.data_dir, 'block_queue.db'),
+            max_blocks_per_day=config.get('api.rate_limit.max_blocks_per_day', 1000),
+            pace=config.get('api.rate_limit.cooldown_period', 60),
+            retry_delay=config.get('api.rate_limit.retry_delay', 5),
+            max_retries=config.get('scanning.max_retries', 3),
+            on_blocked=lambda user_id, score, reason: self.record_block(user_id, score, reason),
+            on_error=lambda user_id, e: self.handle_block_error(user_id, e),
+            is_rate_limit_error=is_rate_limit_error
+        )
+
+        # Initialize Slack reporter
+        self.slack_reporter = SlackReporter(slack_webhook_url)
+
+        # Initialize KPI tracking
+        self.total_blocks = self.metrics.counter('total_blocks', "Accounts blocked")
+        self.false_positives = self.metrics.counter('false_positives', "Blocks found to be humans")
+        self.scans = self.metrics.counter('scans', "Mention scans run")
+        self.error_count = self.metrics.counter('error_count', "Errors recorded")
+        self.rate_limits_hit = self.metrics.counter('api_status.rate_limits_hit', "Rate limits hit")
+        self.connection_errors = self.metrics.counter('api_status.connection_errors', "Failed scans and blocks")
+        self.last_scan_time = self.metrics.gauge('last_scan_time')
+        self.last_rate_limit = self.metrics.gauge('api_status.last_rate_limit')
+        self.last_error = self.metrics.gauge('api_status.last_error')
+        self.follower_scan_status = self.metrics.gauge('follower_scan')
+
+        # Component state is read when a snapshot is taken (attributes are looked up at call time)
+        self.metrics.gauge('api_status.rate_limits').set_function(lambda: self.rate_limiter.get_status())
+        self.metrics.gauge('verdict_cache').set_function(lambda: self.bot_detector.get_cache_stats())
+        self.metrics.gauge('block_queue').set_function(lambda: self.block_executor.get_status())
+        if self.bot_detector.cascade is not None:
+            self.metrics.gauge('cascade').set_function(lambda: self.bot_detector.cascade.get_stats())
+        if self.bot_detector.shadow is not None:
+            self.metrics.gauge('shadow_policies').set_function(lambda: self.bot_detector.shadow.get_stats())
+        if self.adaptive_interval is not None:
+            self.metrics.gauge('scan_interval').set_function(lambda: self.adaptive_interval.get_stats())
+
+        # Recent error messages and counts per error type and endpoint for the reports,
+        # /status and data/metrics.json
+        self.error_tracker = ErrorTracker(
+            capacity=config.get('monitoring.errors.recent', 100),
+            max_keys=config.get('monitoring.errors.max_kinds', 200)
+        )
+        self.metrics.gauge('error_summary').set_function(lambda: self.error_tracker.get_stats())
+
+        # Counter values at the last daily report; the report shows the change since
+        self.daily_baseline = {}
+
+        # Persist the registry as counter deltas appended to metrics.journal, compacted
+        # into metrics.json snapshots; restored in start()
+        self.metrics_journal = MetricsJournal(
+            self.metrics,
+            directory=self.data_dir,
+            fsync_interval=config.get('monitoring.metrics.persistence.fsync_interval', 5),
+            snapshot_interval=config.get('monitoring.metrics.persistence.snapshot_interval', 300),
+            max_journal_bytes=config.get('monitoring.metrics.persistence.max_journal_bytes', 1048576),
+            extra=lambda: {'errors': self.error_tracker.recent()}
+        )
+
+        # Engaging accounts screened recently (engagement scan deduplication)
+        self.engagement_seen = SeenWindow(window=config.get('scanning.engagement_scan.dedup_window', 86400))
+
+        # Endpoint -> reset time of the last rate limit notification sent to Slack
+        self.notified_rate_limits = {}
+
+        # Receive account activity webhook events if enabled; started in start().
+        # The polling scans keep running as a fallback for events that never arrive.
+        self.webhook_receiver = None
+        if config.get('scanning.webhook.enabled', False):
+            from webhook_receiver import WebhookReceiver
+            self.webhook_receiver = WebhookReceiver(
+                credentials['TWITTER_API_SECRET'],
+                self.screen_webhook_users,
+                host=config.get('scanning.webhook.host', '127.0.0.1'),
+                port=config.get('scanning.webhook.port', 8081),
+                path=config.get('scanning.webhook.path', '/webhooks/twitter'),
+                queue_size=config.get('scanning.webhook.queue_size', 10000),
+                batch_size=config.get('scanning.webhook.batch_size', 100),
+                stop_timeout=config.get('scanning.webhook.stop_timeout', 10)
+            )
+            self.metrics.gauge('webhook').set_function(lambda: self.webhook_receiver.get_stats())
+
+        # Alerts and the metrics exporter; created in start() after the scoring pool forks
+        self.monitoring = None
+
+        # Get scan interval from config
+        self.scan_interval = config.get('scanning.scan_interval', 60)
+
+        # Each job runs on its own thread, so a long scan never delays the reports;
+        # the adaptive interval, if enabled, reschedules the scan after every run
+        self.scheduler = Scheduler(on_error=self.handle_job_error, executor=job_pool)
+        self.scheduler.every('scan', self.scan_interval * 60, self.scan_and_block)
+
+        # Schedule the incremental follower scan
+        if config.get('scanning.follower_scan.enabled', False):
+            self.scheduler.every(
+                'follower_scan', config.get('scanning.follower_scan.interval', 60) * 60, self.scan_followers
+            )
+
+        # Schedule the engagement scan
+        if config.get('scanning.engagement_scan.enabled', False):
+            self.scheduler.every(
+                'engagement_scan', config.get('scanning.engagement_scan.interval', 30) * 60, self.scan_engagement
+            )
+
+        # Schedule daily report at 00:00
+        self.scheduler.daily_at('daily_report', "00:00", self.send_daily_report)
+
+        # Schedule weekly report
+        self.scheduler.daily_at('weekly_summary', "00:00", self.send_weekly_summary, weekday=0)
+
+    def build_detection_cascade(self) -> DetectionCascade:
+        """Set up the cost-ordered detection stages that run after the profile check"""
+        behavior_analyzer = None
+        if self.config.get('bot_detection.cascade.behavior_enabled', True):
+            from behavior_analysis import BehaviorAnalyzer
+            behavior_analyzer = BehaviorAnalyzer(self.config)
+
+        image_analyzer = None
+        if self.config.get('bot_detection.image_analysis.enabled', False):
+            try:
+                from image_analysis import ImageAnalyzer
+                image_analyzer = ImageAnalyzer(self.config)
+            except ImportError as e:
+                logging.warning(f"Image analysis disabled, missing dependency: {str(e)}")
+
+        return DetectionCascade(
+            self.api,
+            behavior_analyzer=behavior_analyzer,
+            image_analyzer=image_analyzer,
+            confidence_margin=self.config.get('bot_detection.cascade.confidence_margin', 0.15),
+            timeline_count=self.config.get('bot_detection.cascade.timeline_count', 50),
+            weights=self.config.get('bot_detection.cascade.weights', {}),
+            is_rate_limit_error=is_rate_limit_error
+        )
+
+    def record_api_call(self, endpoint: str, seconds: float, success: bool):
+        """Count every X API call and its response time"""
+        self.api_calls.inc()
+        if not success:
+            self.failed_requests.inc()
+        self.response_times.observe(seconds)
+
+    def save_metrics(self):
+        """Journal the counter changes since the last save (snapshots are written periodically)"""
+        try:
+            self.metrics_journal.record()
+        except Exception as e:
+            logging.error(f"Error saving metrics: {str(e)}")
+
+    def handle_rate_limit(self, e: TweepyException):
+        """
+        Record a rate limit. Nothing sleeps here: the rate limiter parks further
+        calls to the throttled endpoint until its reset while other work continues.
+        """
+        self.rate_limits_hit.inc()
+        self.last_rate_limit.set(datetime.now().strftime("%Y-%m-%d %H:%M:%S EST"))
+
+        endpoint = getattr(e, 'endpoint', 'unknown endpoint')
+        reset_timestamp = getattr(e, 'reset_time', None)
+        if reset_timestamp:
+            reset_time = datetime.fromtimestamp(reset_timestamp).strftime("%Y-%m-%d %H:%M:%S EST")
+            logging.warning(f"Rate limit hit for {endpoint}. Resets at {reset_time}")
+
+            # Notify once per endpoint per rate limit window
+            if self.notified_rate_limits.get(endpoint) != reset_timestamp:
+                self.notified_rate_limits[endpoint] = reset_timestamp
+                self.slack_reporter.send_rate_limit_notification(str(e), reset_time)
+        else:
+            logging.warning(f"Rate limit hit for {endpoint}")
+
+    def start(self, monitoring: bool = True):
+        """Restore metrics and start the scoring pool, monitoring, block queue, webhooks and scheduler"""
+        # Carry the counters over from the last run; daily reports count from here
+        try:
+            self.metrics_journal.restore()
+        except Exception as e:
+            logging.error(f"Error restoring metrics: {str(e)}")
+        self.daily_baseline.update({
+            counter.name: counter.value() for counter in (self.rate_limits_hit, self.connection_errors)
         })
-        
-        # Reset daily counters
-        kpi_stats['api_status']['rate_limits_hit'] = 0
-        kpi_stats['api_status']['connection_errors'] = 0
-        
-    except Exception as e:
-        logging.error(f"Error sending daily report: {str(e)}")
 
-def scan_and_block():
-    """Main scanning and blocking function"""
-    try:
-        kpi_stats['api_calls'] += 1
-        kpi_stats['last_scan_time'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S EST")
-        
-        logging.info("Getting recent mentions...")
+        if self.scoring_pool is not None:
+            self.scoring_pool.start()
+        # Alerts and the metrics exporter read the bot's registry; its threads start after the fork above
+        if monitoring:
+            from monitoring import MonitoringSystem
+            self.monitoring = MonitoringSystem(self.config, registry=self.metrics)
+        self.seed_block_ledger()
+        self.block_executor.start()
+        if self.webhook_receiver is not None:
+            self.webhook_receiver.start()
+
+        logging.info("Running initial scan...")
+        self.scheduler.trigger('scan')  # Run initial scan immediately
+        self.scheduler.start()
+        logging.info(f"Scheduled to run every {self.scan_interval} minutes. Waiting for next scan...")
+
+    def stop(self):
+        """Stop the scheduler and background workers and write a final metrics snapshot"""
+        self.scheduler.stop()
+        if self.webhook_receiver is not None:
+            self.webhook_receiver.stop()
+        self.block_executor.stop()
+        if self.scoring_pool is not None:
+            self.scoring_pool.shutdown()
+        if self.api_recorder is not None:
+            self.api_recorder.close()
+        self.metrics_journal.close()
+
+    def get_status(self) -> Dict:
+        """Get every metric and the job schedule"""
+        return {**self.metrics.snapshot(), 'jobs': self.scheduler.get_status()}
+
+    def handle_shutdown(self, signum, frame):
+        """Handle shutdown signals"""
+        logging.info("Shutdown signal received")
+        self.stop()
+        self.slack_reporter.send_shutdown_notification("Received shutdown signal")
+        exit(0)
+
+    def send_daily_report(self):
+        """Send daily KPI report"""
+        try:
+            # Calculate accuracy
+            blocks = self.total_blocks.value()
+            accuracy = 100.0 if blocks > 0 else 0.0
+
+            # Rate limits and connection errors since the last daily report
+            daily_counts = {counter.name: counter.value() for counter in (self.rate_limits_hit, self.connection_errors)}
+            daily_rate_limits, daily_connection_errors = (
+                daily_counts[name] - self.daily_baseline.get(name, 0)
+                for name in (self.rate_limits_hit.name, self.connection_errors.name)
+            )
+
+            # Prepare API status message
+            api_status = "✅ Normal"
+            if daily_rate_limits > 0:
+                api_status = f"⚠️ Rate limits hit: {daily_rate_limits} times"
+            if daily_connection_errors > 0:
+                api_status = f"❌ Connection errors: {daily_connection_errors} times"
+
+            # Send daily report
+            self.slack_reporter.send_daily_report({
+                'total_blocks': blocks,
+                'false_positives': self.false_positives.value(),
+                'accuracy': accuracy,
+                'api_calls': self.api_calls.value(),
+                'api_status': api_status,
+                'last_scan': self.last_scan_time.value(),
+                'errors': self.error_tracker.summary(3)
+            })
+
+            # Start the next day's counts from here
+            self.daily_baseline.update(daily_counts)
+
+        except Exception as e:
+            logging.error(f"Error sending daily report: {str(e)}")
+
+    def seed_block_ledger(self):
+        """
+        Import the account's existing blocks into the ledger on first run. The
+        blocks/ids cursor is checkpointed after every page, so a seed stopped by
+        a rate limit resumes where it stopped instead of re-fetching the pages.
+        """
+        if self.block_ledger.is_seeded():
+            return
         try:
-            mentions = api.mentions_timeline(count=200)
+            cursor = self.scan_state.get('blocked_ids_cursor', -1)
+            logging.info("Seeding block ledger from existing blocks..." if cursor == -1 else
+                         "Resuming block ledger seeding...")
+            added = 0
+            while cursor:
+                ids, (_, cursor) = self.api.get_blocked_ids(cursor=cursor)
+                added += self.block_ledger.seed(ids)
+                self.scan_state.set('blocked_ids_cursor', cursor)
+            self.block_ledger.mark_seeded()
+            logging.info(f"Block ledger seeded with {added} existing blocks")
         except TweepyException as e:
-            if "Rate limit" in str(e):
-                handle_rate_limit(e)
-                return  # Skip this scan, will retry on next scheduled run
-            raise  # Re-raise if it's not a rate limit error
-        
-        for mention in mentions:
-            user_id = str(mention.user.id)
-            
-            try:
-                should_block, reason = bot_detector.should_block(user_id)
-            except TweepyException as e:
-                if "Rate limit" in str(e):
-                    handle_rate_limit(e)
-                    continue  # Skip this user, continue with next
-                raise  # Re-raise if it's not a rate limit error
-            
-            if should_block:
-                try:
-                    api.create_block(user_id=user_id)
-                    kpi_stats['total_blocks'] += 1
-                    logging.info(f"Blocked user {user_id}: {reason}")
-                except TweepyException as e:
-                    if "Rate limit" in str(e):
-                        handle_rate_limit(e)
-                        continue  # Skip this block, continue with next user
-                    error_msg = f"Error blocking user {user_id}: {str(e)}"
-                    logging.error(error_msg)
-                    kpi_stats['errors'].append(error_msg)
-                    kpi_stats['api_status']['connection_errors'] += 1
-                    kpi_stats['api_status']['last_error'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S EST")
-        
-        # Save metrics after scan
-        save_metrics()
-        
-    except TweepyException as e:
-        if "Rate limit" in str(e):
-            handle_rate_limit(e)
+            # Whatever was imported is kept; seeding resumes from the saved cursor on the next start
+            if is_rate_limit_error(e):
+                self.handle_rate_limit(e)
+            else:
+                logging.error(f"Error seeding block ledger: {str(e)}")
+
+    def record_block(self, user_id: str, score: float, reason: str):
+        """Record a successful block"""
+        self.block_ledger.record_block(user_id, score, reason)
+        self.total_blocks.inc()
+        logging.info(f"Blocked user {user_id}: {reason}")
+
+    def handle_block_error(self, user_id: str, e: Exception):
+        """Record a failed block attempt from the block executor"""
+        if is_rate_limit_error(e):
+            self.handle_rate_limit(e)
         else:
-            error_msg = f"Error in scan_and_block: {str(e)}"
-            logging.error(error_msg)
-            kpi_stats['errors'].append(error_msg)
-            kpi_stats['api_status']['connection_errors'] += 1
-            kpi_stats['api_status']['last_error'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S EST")
-            slack_reporter.send_restart_failure_notification(error_msg)
-    except Exception as e:
-        error_msg = f"Error in scan_and_block: {str(e)}"
+            self.record_block_error(user_id, e)
+
+    def record_block_error(self, user_id: str, e: Exception):
+        """Record a failed block"""
+        self.record_error(f"Error blocking user {user_id}: {str(e)}", e, 'blocks/create')
+
+    def record_error(self, error_msg: str, error: Optional[Exception] = None, source: Optional[str] = None,
+                     connection_error: bool = True):
+        """
+        Log an error and count it for the reports, by the exception's type and
+        the API endpoint that failed (or source when the error names none)
+        """
         logging.error(error_msg)
-        kpi_stats['errors'].append(error_msg)
-        kpi_stats['api_status']['connection_errors'] += 1
-        kpi_stats['api_status']['last_error'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S EST")
-        slack_reporter.send_restart_failure_notification(error_msg)
+        self.error_tracker.record(
+            error_msg,
+            type(error).__name__ if error is not None else 'Error',
+            getattr(error, 'endpoint', None) or source
+        )
+        self.error_count.inc()
+        if connection_error:
+            self.connection_errors.inc()
+            self.last_error.set(datetime.now().strftime("%Y-%m-%d %H:%M:%S EST"))
 
-def send_weekly_summary():
-    """Send weekly summary report"""
-    try:
-        # Calculate weekly stats
-        weekly_stats = {
-            'total_blocks': kpi_stats['total_blocks'],
-            'false_positives': kpi_stats['false_positives'],
-            'avg_accuracy': 100.0 if kpi_stats['total_blocks'] > 0 else 0.0,
-            'total_api_calls': kpi_stats['api_calls'],
-            'top_issues': kpi_stats['errors'][-3:]  # Last 3 errors
-        }
-        
-        slack_reporter.send_weekly_report(weekly_stats)
-        
-    except Exception as e:
-        logging.error(f"Error sending weekly summary: {str(e)}")
+    def screen_users(self, user_ids, known_users=None, on_verdicts=None, hydrated_users=None,
+                     known_verdicts=None) -> int:
+        """
+        Score accounts and queue blocks for the bots among them.
+        Rate limit errors propagate to the caller.
+        Returns: number of blocks queued
+        """
+        return screen_user_ids(
+            user_ids, self.bot_detector, self.block_ledger, self.block_executor,
+            known_users=known_users, on_verdicts=on_verdicts, hydrated_users=hydrated_users,
+            known_verdicts=known_verdicts
+        )
 
-# Get scan interval from config
-scan_interval = config.get('scanning.scan_interval', 60)
+    def adapt_scan_interval(self, mentions: int = 0, flagged: int = 0, calls: int = 1, authors: Optional[int] = None,
+                            rate_limited: bool = False):
+        """Reschedule the next mention scan if the adaptive interval is enabled"""
+        if self.adaptive_interval is None:
+            return
+        if rate_limited:
+            interval = self.adaptive_interval.record_rate_limit()
+        else:
+            interval = self.adaptive_interval.record_scan(mentions, flagged, calls, authors=authors)
+        self.scheduler.reschedule('scan', interval)
 
-# Schedule the bot to run based on config
-schedule.every(scan_interval).minutes.do(scan_and_block)
+    def scan_and_block(self):
+        """Main scanning and blocking function"""
+        try:
+            self.scans.inc()
+            self.last_scan_time.set(datetime.now().strftime("%Y-%m-%d %H:%M:%S EST"))
 
-# Schedule daily report at 00:00
-schedule.every().day.at("00:00").do(send_daily_report)
+            # A scan interrupted by a crash or rate limit is resumed below its last
+            # finished page, reusing its verdicts so no profile is fetched twice. They
+            # are only used for the rest of this scan, never put in the verdict cache
+            # (they carry no profile fingerprint and their age is unknown).
+            scan = self.scan_journal.begin('mentions', self.scan_state.get('mentions_since_id'))
+            scan_id = scan['scan_id']
+            since_id = scan['since_id']
+            restored_verdicts = {}
+            if scan['resumed']:
+                restored_verdicts = self.scan_journal.get_verdicts(scan_id)
+                logging.info(f"Resuming interrupted scan {scan_id} after {scan['pages']} pages")
+            else:
+                logging.info(f"Getting mentions newer than {since_id}..." if since_id else "Getting recent mentions...")
 
-# Schedule weekly report
-schedule.every().monday.at("00:00").do(send_weekly_summary)
+            # Mentions are screened page by page as they arrive and each page is
+            # checkpointed; the cursor only advances once the scan is complete
+            newest_id = scan['newest_id']
+            mention_count = 0
+            queued = 0
+            pages = 0
+
+            # Distinct authors screened and the bots among them, for the adaptive interval.
+            # Authors already blocked or queued are skipped by screening but count as bots.
+            authors = set()
+            flagged = set()
+
+            def on_verdicts(verdicts):
+                self.scan_journal.record_verdicts(scan_id, verdicts)
+                flagged.update(user_id for user_id, (is_bot, _, _) in verdicts.items() if is_bot)
+
+            for page in iter_mention_pages(
+                self.api,
+                since_id=since_id,
+                page_size=self.config.get('scanning.mentions_count', 200),
+                max_pages=self.config.get('scanning.max_mention_pages', 0),
+                max_id=scan['resume_max_id']
+            ):
+                page_ids = [mention.id for mention in page]
+                newest_id = max(newest_id or 0, max(page_ids))
+                mention_count += len(page)
+                pages += 1
+                page_authors = [str(mention.user.id) for mention in page]
+                authors.update(page_authors)
+                flagged.update(
+                    user_id for user_id in page_authors
+                    if user_id in self.block_ledger or user_id in self.block_executor
+                )
+                page_queued = self.screen_users(
+                    page_authors,
+                    known_users={str(mention.user.id): mention.user for mention in page},
+                    on_verdicts=on_verdicts,
+                    known_verdicts=restored_verdicts
+                )
+                self.scan_journal.page_done(scan_id, min(page_ids), max(page_ids), page_queued)
+                queued += page_queued
+
+            logging.info(
+                f"Screened {mention_count} mentions, queued {queued} blocks ({len(self.block_executor)} pending)"
+            )
+
+            # Only advance the cursor once every page back to since_id was handled
+            self.scan_state.advance('mentions_since_id', newest_id)
+            self.scan_journal.finish(scan_id)
+            self.adapt_scan_interval(mention_count, len(flagged), pages, authors=len(authors))
+
+            # Save metrics after scan
+            self.save_metrics()
+
+        except TweepyException as e:
+            if is_rate_limit_error(e):
+                self.handle_rate_limit(e)
+                self.adapt_scan_interval(rate_limited=True)
+            else:
+                error_msg = f"Error in scan_and_block: {str(e)}"
+                self.record_error(error_msg, e, 'scan_and_block')
+                self.slack_reporter.send_restart_failure_notification(error_msg)
+        except Exception as e:
+            error_msg = f"Error in scan_and_block: {str(e)}"
+            self.record_error(error_msg, e, 'scan_and_block')
+            self.slack_reporter.send_restart_failure_notification(error_msg)
+
+    def scan_followers(self):
+        """
+        Screen our followers a bounded number of ID pages per run. The cursor and
+        the position inside the current page are checkpointed after every chunk,
+        so a rate limit or restart resumes where the scan stopped.
+        """
+        try:
+            cursor = self.scan_state.get('followers_cursor', -1)
+            offset = self.scan_state.get('followers_offset', 0)
+            if cursor == 0:
+                # The previous pass reached the end of the list; start a new one
+                cursor, offset = -1, 0
+
+            chunk_size = self.config.get('scanning.followers_count', 200)
+            if self.scoring_pool is not None:
+                # Chunks below min_batch would never reach the pool
+                chunk_size = max(chunk_size, self.scoring_pool.min_batch)
+            screened = 0
+            queued = 0
+            for ids, next_cursor in iter_follower_id_pages(
+                self.api,
+                cursor=cursor,
+                page_size=self.config.get('scanning.follower_scan.page_size', 5000),
+                max_pages=self.config.get('scanning.follower_scan.max_pages', 1)
+            ):
+                for start in range(offset, len(ids), chunk_size):
+                    queued += self.screen_users(ids[start:start + chunk_size])
+                    screened += len(ids[start:start + chunk_size])
+                    self.scan_state.set('followers_offset', start + chunk_size)
+
+                # Page finished: move the checkpoint to the next page
+                offset = 0
+                self.scan_state.update({'followers_cursor': next_cursor, 'followers_offset': 0})
+                if next_cursor == 0:
+                    self.scan_state.set('followers_last_full_scan', datetime.now().strftime("%Y-%m-%d %H:%M:%S EST"))
+                    logging.info("Completed a full pass over followers")
+
+            logging.info(f"Screened {screened} followers, queued {queued} blocks ({len(self.block_executor)} pending)")
+            self.follower_scan_status.set({
+                'cursor': self.scan_state.get('followers_cursor', -1),
+                'offset': self.scan_state.get('followers_offset', 0),
+                'last_full_scan': self.scan_state.get('followers_last_full_scan')
+            })
+            self.save_metrics()
+
+        except TweepyException as e:
+            if is_rate_limit_error(e):
+                self.handle_rate_limit(e)
+            else:
+                error_msg = f"Error in scan_followers: {str(e)}"
+                self.record_error(error_msg, e, 'scan_followers')
+        except Exception as e:
+            error_msg = f"Error in scan_followers: {str(e)}"
+            self.record_error(error_msg, e, 'scan_followers')
+
+    def scan_engagement(self):
+        """Screen accounts that retweeted our recent tweets"""
+        try:
+            limit = self.config.get('scanning.likes_count', 200)
+            screened = 0
+            queued = 0
+            for ids in iter_engager_id_pages(
+                self.api,
+                tweet_count=self.config.get('scanning.engagement_scan.recent_tweets', 20),
+                per_tweet=self.config.get('scanning.engagement_scan.per_tweet', 100)
+            ):
+                # Accounts engaging with several tweets are screened once per window;
+                # they are only marked seen after screening so a rate limit retries them
+                ids = self.engagement_seen.unseen(ids)[:limit - screened]
+                queued += self.screen_users(ids)
+                self.engagement_seen.add(ids)
+                screened += len(ids)
+                if screened >= limit:
+                    break
+
+            logging.info(
+                f"Screened {screened} engaging accounts, queued {queued} blocks ({len(self.block_executor)} pending)"
+            )
+            self.save_metrics()
+
+        except TweepyException as e:
+            if is_rate_limit_error(e):
+                self.handle_rate_limit(e)
+            else:
+                error_msg = f"Error in scan_engagement: {str(e)}"
+                self.record_error(error_msg, e, 'scan_engagement')
+        except Exception as e:
+            error_msg = f"Error in scan_engagement: {str(e)}"
+            self.record_error(error_msg, e, 'scan_engagement')
+
+    def screen_webhook_users(self, user_ids, users):
+        """
+        Screen the accounts behind webhook events as they arrive. Full profiles in
+        the events are scored without a users/lookup call; accounts whose event
+        carries only part of the profile are looked up.
+        """
+        from webhook_receiver import is_full_profile
+        try:
+            queued = self.screen_users(
+                user_ids,
+                hydrated_users={
+                    user_id: User.parse(self.api, user) for user_id, user in users.items() if is_full_profile(user)
+                }
+            )
+            if queued:
+                logging.info(f"Queued {queued} blocks from {len(user_ids)} webhook accounts")
+
+        except TweepyException as e:
+            if is_rate_limit_error(e):
+                self.handle_rate_limit(e)
+            else:
+                error_msg = f"Error in screen_webhook_users: {str(e)}"
+                self.record_error(error_msg, e, 'screen_webhook_users')
+        except Exception as e:
+            error_msg = f"Error in screen_webhook_users: {str(e)}"
+            self.record_error(error_msg, e, 'screen_webhook_users')
+
+    def send_weekly_summary(self):
+        """Send weekly summary report"""
+        try:
+            # Calculate weekly stats
+            weekly_stats = {
+                'total_blocks': self.total_blocks.value(),
+                'false_positives': self.false_positives.value(),
+                'avg_accuracy': 100.0 if self.total_blocks.value() > 0 else 0.0,
+                'total_api_calls': self.api_calls.value(),
+                'top_issues': self.error_tracker.summary(3)
+            }
+
+            self.slack_reporter.send_weekly_report(weekly_stats)
+
+        except Exception as e:
+            logging.error(f"Error sending weekly summary: {str(e)}")
+
+    def handle_scan_request(self, signum, frame):
+        """Run a scan now (SIGUSR1, sent by the status server's /scan endpoint)"""
+        logging.info("Scan requested")
+        self.scheduler.trigger('scan')
+
+    def handle_job_error(self, name: str, e: Exception):
+        """Record an error raised out of a scheduled job"""
+        error_msg = f"Error in {name} job: {str(e)}"
+        self.record_error(error_msg, e, name, connection_error=False)
+        self.slack_reporter.send_restart_failure_notification(error_msg)
+
+def create_app(config: Optional[ConfigManager] = None, env: Optional[Dict[str, str]] = None,
+               data_dir: Optional[str] = None, job_pool: Optional[Executor] = None) -> XBotBlocker:
+    """
+    Build the bot from config.yaml and the environment (os.environ by default),
+    keeping its state in data_dir (BOT_DATA_DIR, else data/, or
+    api.traffic.replay_data_dir when replaying) and running its jobs on
+    job_pool if given.
+    Raises ValueError if the X API credentials are missing.
+    """
+    config = config or ConfigManager()
+    env = os.environ if env is None else env
+
+    # Validate required credentials
+    credentials = {key: env.get(key) for key in CREDENTIAL_KEYS}
+    if not all(credentials.values()):
+        error_msg = "Missing required Twitter API credentials in .env file"
+        logging.error(error_msg)
+        raise ValueError(error_msg)
+
+    # API_TRAFFIC_MODE / API_TRAFFIC_ARCHIVE override config.yaml
+    return XBotBlocker(
+        config,
+        credentials,
+        slack_webhook_url=env.get('SLACK_WEBHOOK_URL'),
+        api_traffic_mode=env.get('API_TRAFFIC_MODE'),
+        api_traffic_archive=env.get('API_TRAFFIC_ARCHIVE'),
+        data_dir=data_dir or env.get('BOT_DATA_DIR'),
+        job_pool=job_pool
+    )
+
+def main():
+    # Load API Keys from .env file
+    load_dotenv()
+    configure_logging(os.getenv('LOG_LEVEL', 'INFO'), os.getenv('LOG_FILE', 'bot_blocker.log'))
+    app = create_app()
 
-if __name__ == "__main__":
     # Set up signal handlers
-    signal.signal(signal.SIGINT, handle_shutdown)
-    signal.signal(signal.SIGTERM, handle_shutdown)
-    
+    signal.signal(signal.SIGINT, app.handle_shutdown)
+    signal.signal(signal.SIGTERM, app.handle_shutdown)
+    signal.signal(signal.SIGUSR1, app.handle_scan_request)
+
+    # The status server's /scan endpoint signals this PID; it is only written once
+    # the SIGUSR1 handler is installed (SIGUSR1's default action would kill the bot)
+    with open(project_path('bot.pid'), 'w') as f:
+        f.write(str(os.getpid()))
+
     logging.info("X Bot Blocker started successfully!")
-    
+
     # Send startup notification
-    slack_reporter.send_startup_notification()
-    
+    app.slack_reporter.send_startup_notification()
+
     try:
-        logging.info("Running initial scan...")
-        scan_and_block()  # Run initial scan immediately
-        logging.info(f"Scheduled to run every {scan_interval} minutes. Waiting for next scan...")
-        
-        while True:
-            try:
-                schedule.run_pending()
-                time.sleep(60)
-            except Exception as e:
-                error_msg = f"Error in main loop: {str(e)}"
-                logging.error(error_msg)
-                kpi_stats['errors'].append(error_msg)
-                slack_reporter.send_restart_failure_notification(error_msg)
-                time.sleep(60)  # Wait a minute before retrying
+        app.start()
+        app.scheduler.wait()
     except Exception as e:
         error_msg = f"Fatal error: {str(e)}"
         logging.error(error_msg)
-        slack_reporter.send_shutdown_notification(error_msg)
+        app.slack_reporter.send_shutdown_notification(error_msg)
         raise
+
+if __name__ == "__main__":
+    main()
@@ -23,8 +23,7 @@ fi
 # Start the bot
 echo "🤖 Starting X Bot Blocker..."
 nohup python3 src/x_bot_blocker/x_bot_blocker.py > bot_blocker.log 2>&1 &
-BOT_PID=$!
-echo $BOT_PID > bot.pid
+BOT_PID=$!  # the bot writes bot.pid itself once it can take scan requests
 
 # Wait a moment for the bot to initialize
 sleep 5
@@ -63,7 +62,6 @@ while true; do
         echo "🤖 Restarting X Bot Blocker..."
         nohup python3 src/x_bot_blocker/x_bot_blocker.py > bot_blocker.log 2>&1 &
         BOT_PID=$!
-        echo $BOT_PID > bot.pid
         
         # Wait a moment for the bot to initialize
         sleep 5
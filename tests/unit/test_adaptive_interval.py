@@ -0,0 +1,68 @@
+import pytest
+from x_bot_blocker.adaptive_interval import AdaptiveInterval
+from x_bot_blocker.rate_limiter import RateLimiter
+
+def make_interval(**kwargs):
+    settings = dict(base_interval=900, min_interval=120, max_interval=3600, target_mentions=200)
+    settings.update(kwargs)
+    return AdaptiveInterval(**settings)
+
+def test_first_scan_keeps_base_interval():
+    """Test that the interval is unchanged until an arrival rate is known"""
+    interval = make_interval()
+    assert interval.record_scan(50, 0, now=0) == 900
+
+def test_volume_spike_shortens_interval():
+    """Test that a burst of mentions brings the next scan forward at once"""
+    interval = make_interval()
+    interval.record_scan(10, 0, now=0)
+    # 600 mentions in 15 minutes: one page of 200 arrives every 5 minutes
+    assert interval.record_scan(600, 0, now=900) == pytest.approx(300)
+
+def test_bot_raid_drops_to_floor():
+    """Test that a high share of flagged mentions scans at the minimum interval"""
+    interval = make_interval()
+    interval.record_scan(10, 0, now=0)
+    assert interval.record_scan(40, 20, now=900) == 120
+
+def test_bot_ratio_counts_distinct_authors():
+    """Test that the bot share is taken over distinct authors, not mentions"""
+    interval = make_interval()
+    interval.record_scan(10, 0, now=0)
+    # 400 mentions from 40 authors, 10 of them bots: a raid even though 10/400 is not
+    assert interval.record_scan(400, 10, now=900, authors=40) == 120
+    assert interval.bot_ratio == 0.25
+
+def test_small_samples_do_not_count_as_raid():
+    """Test that a couple of flagged accounts in a tiny scan are not a raid"""
+    interval = make_interval()
+    interval.record_scan(10, 0, now=0)
+    assert interval.record_scan(2, 2, now=900) > 120
+
+def test_idle_backs_off_gradually_to_ceiling():
+    """Test that quiet scans grow the interval by the backoff factor up to the maximum"""
+    interval = make_interval()
+    interval.record_scan(0, 0, now=0)
+    assert interval.record_scan(0, 0, now=900) == pytest.approx(1350)
+    assert interval.record_scan(0, 0, now=2250) == pytest.approx(2025)
+    for step in range(5):
+        last = interval.record_scan(0, 0, now=5000 + step * 4000)
+    assert last == 3600
+
+def test_rate_limit_budget_sets_the_floor():
+    """Test that the interval never spends calls faster than the remaining budget allows"""
+    limiter = RateLimiter()
+    limiter.update_from_headers('statuses/mentions_timeline', {
+        'x-rate-limit-remaining': '2', 'x-rate-limit-reset': '1500', 'x-rate-limit-limit': '75'
+    })
+    interval = make_interval(rate_limiter=limiter)
+    interval.record_scan(10, 0, calls=1, now=0)
+    # Raid wants 2 minutes, but 2 calls are left for the next 10 minutes
+    assert interval.record_scan(40, 20, calls=1, now=900) == pytest.approx(300, rel=0.05)
+
+def test_exhausted_budget_waits_for_reset():
+    """Test that a rate-limited scan is not retried before the window resets"""
+    limiter = RateLimiter()
+    limiter.mark_exhausted('statuses/mentions_timeline', reset_time=2000)
+    interval = make_interval(rate_limiter=limiter)
+    assert interval.record_rate_limit(now=1000) == pytest.approx(1000)
@@ -0,0 +1,117 @@
+import json
+import pytest
+import tweepy
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from x_bot_blocker.api_traffic import ApiReplayer, ReplayMiss, request_key, setup_api_traffic
+
+class FakeXAdapter(BaseAdapter):
+    """Stands in for the network while recording: answers every request with one mention"""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+
+    def send(self, request, **kwargs):
+        self.requests += 1
+        response = Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict({
+            'content-type': 'application/json',
+            'x-rate-limit-remaining': str(75 - self.requests),
+            'x-rate-limit-reset': '1700000000'
+        })
+        response._content = json.dumps([{
+            'id': self.requests, 'id_str': str(self.requests), 'text': 'hi',
+            'user': {'id': 42, 'id_str': '42', 'screen_name': 'someone'}
+        }]).encode('utf-8')
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+def make_api():
+    auth = tweepy.OAuth1UserHandler('key', 'secret', 'token', 'token_secret')
+    return tweepy.API(auth)
+
+@pytest.fixture
+def archive(tmp_path):
+    return str(tmp_path / 'traffic.jsonl.gz')
+
+def record(archive, calls):
+    api = make_api()
+    api.session.mount('https://', FakeXAdapter())
+    recorder, _ = setup_api_traffic(api.session, 'record', archive)
+    results = [api.mentions_timeline(**kwargs) for kwargs in calls]
+    recorder.close()
+    return results
+
+def test_request_key_ignores_parameter_order():
+    """Test that keys depend on parameters, not their order"""
+    assert request_key('get', 'https://api.x.com/1.1/a.json?b=2&a=1') == request_key('GET', 'https://api.x.com/1.1/a.json?a=1&b=2')
+    assert request_key('POST', 'https://api.x.com/1.1/blocks/create.json', b'user_id=1') == 'POST /1.1/blocks/create.json?user_id=1'
+
+def test_replay_serves_recorded_responses(archive):
+    """Test that replayed calls return what was recorded, including rate limit headers"""
+    recorded = record(archive, [{'count': 200}, {'count': 200}])
+
+    api = make_api()
+    _, replayer = setup_api_traffic(api.session, 'replay', archive)
+    headers = []
+    api.session.hooks['response'].append(lambda r, *a, **k: headers.append(r.headers['x-rate-limit-remaining']))
+
+    replayed = [api.mentions_timeline(count=200), api.mentions_timeline(count=200)]
+
+    assert [[s.id for s in page] for page in replayed] == [[s.id for s in page] for page in recorded]
+    assert headers == ['74', '73']
+    assert replayer.get_stats() == {'served': 2, 'misses': 0}
+
+def test_replay_repeats_last_response(archive):
+    """Test that a request made more often than recorded gets the last response again"""
+    record(archive, [{'since_id': 5}])
+
+    api = make_api()
+    setup_api_traffic(api.session, 'replay', archive)
+
+    assert api.mentions_timeline(since_id=5)[0].id == 1
+    assert api.mentions_timeline(since_id=5)[0].id == 1
+
+def test_archive_of_killed_recording_replays(archive, tmp_path):
+    """Test that an archive never closed by its recorder replays up to its last entry"""
+    api = make_api()
+    api.session.mount('https://', FakeXAdapter())
+    recorder, _ = setup_api_traffic(api.session, 'record', archive)
+    api.mentions_timeline(count=200)
+    api.mentions_timeline(since_id=1)
+    # What a killed process leaves on disk: no gzip end-of-stream marker
+    killed = tmp_path / 'killed.jsonl.gz'
+    with open(archive, 'rb') as f:
+        killed.write_bytes(f.read())
+    recorder.close()
+
+    api = make_api()
+    _, replayer = setup_api_traffic(api.session, 'replay', str(killed))
+
+    assert api.mentions_timeline(count=200)[0].id == 1
+    assert api.mentions_timeline(since_id=1)[0].id == 2
+    assert replayer.get_stats() == {'served': 2, 'misses': 0}
+
+def test_unrecorded_request_fails(archive):
+    """Test that a request missing from the archive fails instead of reaching the network"""
+    record(archive, [{'count': 200}])
+
+    session = make_api().session
+    replayer = ApiReplayer(archive)
+    replayer.attach(session)
+
+    with pytest.raises(ReplayMiss):
+        session.get('https://api.twitter.com/1.1/statuses/user_timeline.json')
+    assert replayer.get_stats()['misses'] == 1
+
+def test_unknown_mode_is_rejected(archive):
+    """Test that a typo in the mode is reported"""
+    with pytest.raises(ValueError):
+        setup_api_traffic(make_api().session, 'recrod', archive)
@@ -0,0 +1,69 @@
+import pytest
+import time
+from unittest.mock import MagicMock
+from x_bot_blocker.async_scan import AsyncScanEngine
+from x_bot_blocker.bot_detection import BotDetector
+from x_bot_blocker.detection_cascade import DetectionCascade
+from x_bot_blocker.rate_limiter import RateLimitExceeded, is_rate_limit_error
+from tests.unit.test_bot_detection import make_user
+
+@pytest.fixture
+def api():
+    api = MagicMock()
+
+    def slow_lookup(user_id):
+        time.sleep(0.2)
+        return [make_user(uid, age_days=1 if int(uid) % 2 else 365) for uid in user_id]
+    api.lookup_users.side_effect = slow_lookup
+    return api
+
+@pytest.fixture
+def detector(api, config):
+    return BotDetector(api, config_path=config.config_path)
+
+def test_lookups_run_concurrently(api, detector):
+    """Test that lookup batches overlap instead of running back to back"""
+    detector.scan_engine = AsyncScanEngine(api, max_concurrency=3)
+    user_ids = [str(i) for i in range(1, 301)]
+
+    start = time.monotonic()
+    verdicts = detector.analyze_user_ids(user_ids)
+    elapsed = time.monotonic() - start
+
+    assert api.lookup_users.call_count == 3
+    assert elapsed < 0.5
+    assert len(verdicts) == 300
+
+def test_verdicts_match_sequential_path(api, config):
+    """Test that the async engine keeps BotDetector scoring semantics"""
+    user_ids = [str(i) for i in range(1, 21)]
+    sequential = BotDetector(api, config_path=config.config_path).analyze_user_ids(user_ids)
+
+    detector = BotDetector(api, config_path=config.config_path)
+    detector.scan_engine = AsyncScanEngine(api)
+    concurrent = detector.analyze_user_ids(user_ids)
+
+    assert concurrent == sequential
+
+def test_cascade_timelines_run_concurrently(api):
+    """Test that the cascade fetches the timelines of a batch's borderline users together"""
+    def slow_timeline(user_id, count):
+        time.sleep(0.2)
+        if user_id == '4':
+            raise RateLimitExceeded('statuses/user_timeline', 0)
+        return []
+    api.user_timeline.side_effect = slow_timeline
+    behavior = MagicMock()
+    behavior.analyze_user.return_value = (0.7, [])
+    cascade = DetectionCascade(api, behavior, is_rate_limit_error=is_rate_limit_error)
+    cascade.scan_engine = AsyncScanEngine(api, max_concurrency=4)
+    users = {str(i): make_user(i) for i in range(1, 5)}
+
+    start = time.monotonic()
+    results = cascade.refine_batch(users, {user_id: (False, 0.65, "Low follower count") for user_id in users}, 0.7)
+    elapsed = time.monotonic() - start
+
+    assert api.user_timeline.call_count == 4
+    assert elapsed < 0.5
+    assert {user_id: complete for user_id, (_, complete) in results.items()} == {'1': True, '2': True, '3': True, '4': False}
+    assert behavior.analyze_user.call_count == 3
@@ -0,0 +1,76 @@
+import pytest
+import time
+from unittest.mock import MagicMock
+from x_bot_blocker.block_executor import BlockExecutor
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'block_queue.db')
+
+def drain(executor, max_steps=20):
+    """Process the queue synchronously until nothing is due"""
+    for _ in range(max_steps):
+        if executor.process_next() > 0.5 or not len(executor):
+            break
+
+def test_pending_blocks_survive_restart(db_path):
+    """Test that queued blocks are persisted and issued after a restart"""
+    api = MagicMock()
+    executor = BlockExecutor(api, db_path=db_path, pace=0)
+    assert executor.enqueue('1', 0.9, "bot")
+    assert not executor.enqueue('1', 0.9, "bot")
+
+    blocked = []
+    restarted = BlockExecutor(api, db_path=db_path, pace=0, on_blocked=lambda *args: blocked.append(args))
+    assert '1' in restarted
+    drain(restarted)
+
+    api.create_block.assert_called_once_with(user_id='1')
+    assert blocked == [('1', 0.9, "bot")]
+    assert len(restarted) == 0
+
+def test_daily_cap_uses_sliding_window(db_path):
+    """Test that no more than max_blocks_per_day blocks are issued in 24 hours"""
+    api = MagicMock()
+    executor = BlockExecutor(api, db_path=db_path, pace=0, max_blocks_per_day=2)
+    for user_id in ['1', '2', '3']:
+        executor.enqueue(user_id)
+
+    drain(executor)
+
+    assert api.create_block.call_count == 2
+    assert len(executor) == 1
+    assert executor.blocks_in_window() == 2
+    # The third block waits until the oldest block leaves the window
+    assert executor.process_next() > 86000
+    assert executor.get_status()['pending'] == 1
+
+def test_failed_blocks_retry_with_backoff(db_path):
+    """Test exponential backoff and giving up after max_retries"""
+    api = MagicMock()
+    api.create_block.side_effect = RuntimeError("boom")
+    errors = []
+    executor = BlockExecutor(api, db_path=db_path, pace=0, retry_delay=0.05, max_retries=3,
+                             on_error=lambda user_id, e: errors.append(user_id))
+    executor.enqueue('1')
+
+    start = time.monotonic()
+    while len(executor) and time.monotonic() - start < 2:
+        time.sleep(executor.process_next())
+
+    assert api.create_block.call_count == 3
+    assert errors == ['1', '1', '1']
+    assert len(executor) == 0
+    # Backoff: 0.05 + 0.1 seconds between the three attempts
+    assert time.monotonic() - start >= 0.15
+
+def test_pace_between_blocks(db_path):
+    """Test that consecutive blocks are spaced by the configured pace"""
+    api = MagicMock()
+    executor = BlockExecutor(api, db_path=db_path, pace=60)
+    executor.enqueue('1')
+    executor.enqueue('2')
+
+    assert executor.process_next() == 60
+    assert 59 < executor.process_next() <= 60
+    assert api.create_block.call_count == 1
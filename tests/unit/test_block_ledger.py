@@ -0,0 +1,43 @@
+import pytest
+import sqlite3
+from x_bot_blocker.block_ledger import BlockLedger
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'data' / 'blocked_accounts.db')
+
+def test_blocks_persist_across_restarts(db_path):
+    """Test that recorded blocks are remembered after reopening the ledger"""
+    ledger = BlockLedger(db_path)
+    assert not ledger.is_blocked('42')
+
+    ledger.record_block('42', 0.9, "New account | Low follower count")
+    ledger.close()
+
+    reopened = BlockLedger(db_path)
+    assert '42' in reopened
+    entry = reopened.get_entry('42')
+    assert entry['score'] == 0.9
+    assert entry['reason'] == "New account | Low follower count"
+    assert entry['blocked_at']
+
+def test_seed_from_existing_blocks(db_path):
+    """Test seeding from the account's existing block IDs"""
+    ledger = BlockLedger(db_path)
+    ledger.record_block('1', 0.8, "Scored")
+    assert not ledger.is_seeded()
+
+    added = ledger.seed([1, 2, 3])
+    ledger.mark_seeded()
+
+    assert added == 2
+    assert len(ledger) == 3
+    assert ledger.is_seeded()
+    # Seeding does not overwrite our own block records
+    assert ledger.get_entry('1')['reason'] == "Scored"
+
+def test_ledger_uses_wal_mode(db_path):
+    """Test that the database is opened in WAL mode"""
+    BlockLedger(db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
@@ -0,0 +1,210 @@
+import pytest
+import threading
+import time
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+from x_bot_blocker.bot_detection import BotDetector, DetectionPolicy, ShadowEvaluator, VerdictCache, profile_fingerprint
+
+def make_user(user_id, age_days=365, followers=100, friends=50, statuses=100, default_image=False):
+    """Create a minimal stand-in for a hydrated tweepy user"""
+    return SimpleNamespace(
+        id=int(user_id),
+        created_at=datetime.now() - timedelta(days=age_days),
+        followers_count=followers,
+        friends_count=friends,
+        statuses_count=statuses,
+        default_profile_image=default_image
+    )
+
+@pytest.fixture
+def api():
+    return MagicMock()
+
+@pytest.fixture
+def detector(api, config):
+    return BotDetector(api, config_path=config.config_path)
+
+def test_lookup_users_batches_by_100(detector, api):
+    """Test that user hydration issues one lookup call per 100 unique IDs"""
+    user_ids = [str(i) for i in range(1, 251)]
+    api.lookup_users.side_effect = lambda user_id: [make_user(uid) for uid in user_id]
+
+    users = detector.lookup_users(user_ids + user_ids[:10])
+
+    assert api.lookup_users.call_count == 3
+    assert [len(call.kwargs['user_id']) for call in api.lookup_users.call_args_list] == [100, 100, 50]
+    assert len(users) == 250
+    api.get_user.assert_not_called()
+
+def test_analyze_users_matches_analyze_user(detector, api):
+    """Test that batch scoring gives the same verdicts as per-user analysis"""
+    bot = make_user('1', age_days=1, followers=0, statuses=0, default_image=True)
+    human = make_user('2')
+
+    results = detector.analyze_users({'1': bot, '2': human})
+
+    detector.verdict_cache = None
+    api.lookup_users.return_value = [bot]
+    assert results['1'] == detector.analyze_user('1')
+    api.lookup_users.return_value = [human]
+    assert results['2'] == detector.analyze_user('2')
+    assert results['1'][0] is True
+    assert results['2'][0] is False
+
+def test_detection_config_overrides_config_file(api, config):
+    """Test that a loaded bot_detection section is used instead of reading config_path"""
+    section = {**config.config['bot_detection'], 'whitelist': ['1'], 'verdict_cache': {'enabled': False}}
+    detector = BotDetector(api, config_path='missing.yaml', detection_config=section)
+
+    assert detector.verdict_cache is None
+    assert detector.analyze_users({'1': make_user('1', age_days=1, followers=0, statuses=0)})['1'] == (
+        False, 0.0, "User in whitelist"
+    )
+
+def test_score_user_accepts_api_timestamps(detector):
+    """Test that timezone-aware created_at values from the API are scored"""
+    user = make_user('1', age_days=1, followers=0, statuses=0, default_image=True)
+    user.created_at = datetime.now(timezone.utc) - timedelta(days=1)
+
+    is_bot, _, reason = detector.score_user(user)
+
+    assert is_bot
+    assert "New account (1 days old)" in reason
+
+def test_analyze_user_ids_skips_lists_and_missing_users(detector, api):
+    """Test that listed users are not fetched and unknown users are omitted"""
+    detector.whitelist = {'10'}
+    detector.blacklist = {'20'}
+    api.lookup_users.return_value = [make_user('30')]
+
+    results = detector.analyze_user_ids(['10', '20', '30', '40'])
+
+    assert api.lookup_users.call_args.kwargs['user_id'] == ['30', '40']
+    assert results['10'] == (False, 0.0, "User in whitelist")
+    assert results['20'] == (True, 1.0, "User in blacklist")
+    assert '30' in results
+    assert '40' not in results
+
+def test_analyze_user_ids_scores_through_analyze_users(detector, api, config):
+    """Test that the lookup path scores with analyze_users and counts one cache miss per user"""
+    bot = make_user('1', age_days=1, followers=0, statuses=0, default_image=True)
+    api.lookup_users.return_value = [bot, make_user('2')]
+    expected = BotDetector(api, config_path=config.config_path).analyze_users({'1': bot, '2': make_user('2')})
+
+    results = detector.analyze_user_ids(['1', '2'])
+
+    assert results == expected
+    assert detector.get_cache_stats()['misses'] == 2
+
+def test_verdict_cache_lru_and_ttls():
+    """Test LRU eviction and separate TTLs for bot and not-bot verdicts"""
+    cache = VerdictCache(max_size=2, bot_ttl=3600, human_ttl=0)
+    cache.put('1', (True, 0.9, "bot"))
+    cache.put('2', (False, 0.1, "human"))
+    cache.put('3', (True, 0.8, "bot"))
+
+    assert cache.get('1') is None  # evicted as least recently used
+    assert cache.get('2') is None  # not-bot TTL already expired
+    assert cache.get('3') == (True, 0.8, "bot")
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['evictions'] == 1
+    assert stats['expirations'] == 1
+
+def test_verdict_cache_fingerprint_invalidation(detector, api):
+    """Test that cached verdicts skip lookups until the profile changes"""
+    user = make_user('5', age_days=1, followers=0, statuses=0)
+    api.lookup_users.return_value = [user]
+    detector.analyze_user_ids(['5'])
+    assert api.lookup_users.call_count == 1
+
+    # Same profile embedded in a mention: served from the cache
+    results = detector.analyze_user_ids(['5'], known_users={'5': user})
+    assert api.lookup_users.call_count == 1
+    assert results['5'][0] is True
+
+    # Profile changed since it was scored: looked up again
+    changed = make_user('5', age_days=1, followers=5000, statuses=0)
+    assert profile_fingerprint(changed) != profile_fingerprint(user)
+    api.lookup_users.return_value = [changed]
+    detector.analyze_user_ids(['5'], known_users={'5': changed})
+    assert api.lookup_users.call_count == 2
+    assert detector.get_cache_stats()['invalidations'] == 1
+
+def test_concurrent_batches_share_lookups(detector, api):
+    """Test that concurrent scans asking for the same users look each one up once"""
+    detector.verdict_cache = None
+    release = threading.Event()
+    looked_up = []
+
+    def slow_lookup(user_id):
+        looked_up.extend(user_id)
+        release.wait(timeout=5)
+        return [make_user(uid) for uid in user_id if uid != '9']
+    api.lookup_users.side_effect = slow_lookup
+
+    batches = [['7', '8'], ['7'], ['8', '9'], ['7', '8', '9']] * 2
+    results = [None] * len(batches)
+
+    def scan(index):
+        results[index] = detector.analyze_user_ids(batches[index])
+    threads = [threading.Thread(target=scan, args=(index,)) for index in range(len(batches))]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(looked_up) == ['7', '8', '9']
+    for batch, result in zip(batches, results):
+        assert set(result) == set(batch) - {'9'}
+    assert detector.analyze_user('9') == (False, 0.0, "User not found")
+
+def test_shadow_policies_score_the_same_fetched_users(detector, api):
+    """Test that shadow policies reuse the primary pass's profiles and never change its verdicts"""
+    detector.shadow = ShadowEvaluator.from_config({
+        'min_account_age_days': 7, 'min_followers': 5, 'max_following_ratio': 5, 'min_tweets': 3,
+        'bot_probability_threshold': 0.6,
+        'shadow_policies': [
+            {'name': 'strict', 'bot_probability_threshold': 0.2},
+            {'name': 'lenient', 'bot_probability_threshold': 0.75, 'heuristic_weights': {'default_image': 0.0}}
+        ]
+    })
+    bot = make_user('1', age_days=1, followers=0, statuses=0, default_image=True)
+    quiet = make_user('2', followers=0)
+    api.lookup_users.return_value = [bot, quiet]
+
+    results = detector.analyze_user_ids(['1', '2'])
+    # Cached verdicts are not scored again
+    detector.analyze_user_ids(['1', '2'])
+
+    assert api.lookup_users.call_count == 1
+    api.get_user.assert_not_called()
+    assert results['1'][0] is True
+    assert results['2'][0] is False
+    stats = detector.shadow.get_stats()
+    assert stats['policies']['strict'] == {
+        'threshold': 0.2, 'scored': 2, 'disagreements': 1, 'would_block': 1, 'would_spare': 0,
+        'agreement_rate': 50.0, 'mean_score_delta': 0.0
+    }
+    assert stats['policies']['lenient']['would_spare'] == 1
+    assert stats['policies']['lenient']['mean_score_delta'] == pytest.approx(-0.05)
+    assert [(sample['policy'], sample['user_id']) for sample in stats['recent_disagreements']] == [
+        ('lenient', '1'), ('strict', '2')
+    ]
+
+def test_policy_weights_are_configurable():
+    """Test that heuristic weights change the score and unknown weights are rejected"""
+    user = make_user('1', followers=0, default_image=True)
+    assert DetectionPolicy().score(user)[1] == pytest.approx(0.3)
+    assert DetectionPolicy(weights={'default_image': 0.5}).score(user)[1] == pytest.approx(0.7)
+    with pytest.raises(ValueError):
+        DetectionPolicy(weights={'avatar': 0.5})
+
+def test_no_shadow_policies_by_default():
+    """Test that shadow evaluation is off unless policies are configured"""
+    assert ShadowEvaluator.from_config({'shadow_policies': []}) is None
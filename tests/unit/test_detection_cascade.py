@@ -0,0 +1,90 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from x_bot_blocker.detection_cascade import DetectionCascade
+from x_bot_blocker.rate_limiter import RateLimitExceeded, is_rate_limit_error
+
+@pytest.fixture
+def user():
+    return SimpleNamespace(id=1, screen_name='someone', profile_image_url_https='https://example.com/a.jpg',
+                           default_profile_image=False)
+
+@pytest.fixture
+def analyzers():
+    behavior = MagicMock()
+    behavior.analyze_user.return_value = (0.9, ["Bursty posting"])
+    image = MagicMock()
+    image.analyze_profile_image.return_value = {
+        'metrics': {'size': {'is_suspicious': True}, 'faces': {'is_suspicious': False}},
+        'reasons': ["No faces"]
+    }
+    return behavior, image
+
+def test_confident_profile_verdict_exits_early(user, analyzers):
+    """Test that a clear profile verdict skips the timeline and image stages"""
+    behavior, image = analyzers
+    api = MagicMock()
+    cascade = DetectionCascade(api, behavior, image)
+
+    verdict, complete = cascade.refine('1', user, (True, 0.95, "Default profile image"), 0.7)
+
+    assert verdict == (True, 0.95, "Default profile image")
+    assert complete
+    api.user_timeline.assert_not_called()
+    image.analyze_profile_image.assert_not_called()
+    assert cascade.get_stats()['early_exits'] == 1
+
+def test_borderline_runs_behavior_and_stops_when_confident(user, analyzers):
+    """Test that a borderline account is settled by the behavior stage without image analysis"""
+    behavior, image = analyzers
+    api = MagicMock()
+    api.user_timeline.return_value = []
+    behavior.analyze_user.return_value = (1.0, ["Bursty posting"])
+    cascade = DetectionCascade(api, behavior, image, weights={'behavior': 2.0})
+
+    (is_bot, score, reason), complete = cascade.refine('1', user, (False, 0.65, "Low follower ratio"), 0.7)
+
+    assert complete
+    assert is_bot
+    assert score == pytest.approx(0.8833, abs=1e-3)
+    assert reason == "Low follower ratio | Bursty posting"
+    api.user_timeline.assert_called_once_with(user_id='1', count=50)
+    image.analyze_profile_image.assert_not_called()
+
+def test_image_stage_runs_while_still_borderline(user, analyzers):
+    """Test that the image stage runs when behavior leaves the score near the threshold"""
+    behavior, image = analyzers
+    behavior.analyze_user.return_value = (0.7, [])
+    cascade = DetectionCascade(MagicMock(), behavior, image)
+
+    (_, score, _), complete = cascade.refine('1', user, (False, 0.65, "Low follower ratio"), 0.7)
+
+    assert complete
+    image.analyze_profile_image.assert_called_once()
+    assert cascade.get_stats()['image'] == 1
+
+def test_rate_limited_stage_marks_verdict_incomplete(user, analyzers):
+    """Test that a rate limited stage keeps the profile verdict and reports it as incomplete"""
+    behavior, image = analyzers
+    api = MagicMock()
+    api.user_timeline.side_effect = RateLimitExceeded('statuses/user_timeline', 0)
+    cascade = DetectionCascade(api, behavior, image, is_rate_limit_error=is_rate_limit_error)
+
+    verdict, complete = cascade.refine('1', user, (False, 0.65, "Low follower ratio"), 0.7)
+
+    assert not complete
+    assert verdict == (False, 0.65, "Low follower ratio")
+    image.analyze_profile_image.assert_not_called()
+
+def test_failing_stage_is_skipped(user, analyzers):
+    """Test that a stage raising an ordinary error is skipped and the next stage runs"""
+    behavior, image = analyzers
+    api = MagicMock()
+    api.user_timeline.side_effect = ValueError("boom")
+    cascade = DetectionCascade(api, behavior, image)
+
+    _, complete = cascade.refine('1', user, (False, 0.65, "Low follower ratio"), 0.7)
+
+    assert complete
+    image.analyze_profile_image.assert_called_once()
+    assert cascade.get_stats()['stage_errors'] == 1
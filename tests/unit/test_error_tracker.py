@@ -0,0 +1,66 @@
+import threading
+from x_bot_blocker.error_tracker import ErrorTracker
+
+def test_recent_errors_are_bounded():
+    """Test that only the latest raw messages are kept"""
+    tracker = ErrorTracker(capacity=3)
+    for i in range(10):
+        tracker.record(f"error {i}", 'TweepyException', 'blocks/create')
+
+    assert tracker.recent() == ["error 7", "error 8", "error 9"]
+    assert tracker.recent(1) == ["error 9"]
+    assert tracker.total == 10
+
+def test_errors_are_counted_by_type_and_endpoint():
+    """Test top-N error kinds, most frequent first"""
+    tracker = ErrorTracker()
+    for _ in range(5):
+        tracker.record("Error in scan: 503", 'TwitterServerError', 'statuses/mentions_timeline')
+    for _ in range(2):
+        tracker.record("Error blocking user 1: 403", 'Forbidden', 'blocks/create')
+    tracker.record("Error in scan_followers job: boom", 'ValueError', 'scan_followers')
+
+    top = tracker.top(2)
+    assert [(item['type'], item['endpoint'], item['count']) for item in top] == [
+        ('TwitterServerError', 'statuses/mentions_timeline', 5),
+        ('Forbidden', 'blocks/create', 2)
+    ]
+    assert top[1]['last_message'] == "Error blocking user 1: 403"
+    assert tracker.summary(1) == [
+        "5× TwitterServerError on statuses/mentions_timeline (last: Error in scan: 503)"
+    ]
+    assert tracker.get_stats()['kinds'] == 3
+
+def test_distinct_kinds_are_bounded():
+    """Test that kinds past max_keys are counted together"""
+    tracker = ErrorTracker(max_keys=2)
+    for i in range(5):
+        tracker.record(f"error {i}", f"Error{i}", 'x')
+
+    stats = tracker.get_stats()
+    assert stats['kinds'] == 3
+    assert stats['top'][0]['type'] == 'other'
+    assert stats['top'][0]['count'] == 3
+
+def test_missing_endpoint_is_unknown():
+    """Test errors recorded without an endpoint"""
+    tracker = ErrorTracker()
+    tracker.record("boom")
+    assert tracker.top(1)[0]['type'] == 'Error'
+    assert tracker.top(1)[0]['endpoint'] == 'unknown'
+
+def test_concurrent_records_are_all_counted():
+    """Test that errors from several threads are never lost"""
+    tracker = ErrorTracker(capacity=10)
+
+    def work():
+        for _ in range(1000):
+            tracker.record("boom", 'ValueError', 'scan')
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert tracker.top(1)[0]['count'] == 4000
+    assert len(tracker.recent()) == 10
@@ -0,0 +1,141 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from x_bot_blocker.ingestion import (
+    SeenWindow, iter_engager_id_pages, iter_follower_id_pages, iter_mention_pages, iter_mentions
+)
+
+def make_timeline(ids):
+    """Fake mentions_timeline over a fixed set of tweet IDs"""
+    def mentions_timeline(count=200, since_id=None, max_id=None):
+        matching = sorted(
+            (i for i in ids if (since_id is None or i > since_id) and (max_id is None or i <= max_id)),
+            reverse=True
+        )
+        return [SimpleNamespace(id=i) for i in matching[:count]]
+    api = MagicMock()
+    api.mentions_timeline.side_effect = mentions_timeline
+    return api
+
+def test_pages_back_to_since_id():
+    """Test that a raid larger than one page is fetched completely"""
+    api = make_timeline(range(1, 501))
+
+    pages = list(iter_mention_pages(api, since_id=50, page_size=200))
+
+    assert [len(page) for page in pages] == [200, 200, 50]
+    seen = [mention.id for page in pages for mention in page]
+    assert seen == list(range(500, 50, -1))
+    assert api.mentions_timeline.call_args_list[1].kwargs['max_id'] == 300
+    # The short last page ends the scan without asking for an empty one
+    assert api.mentions_timeline.call_count == 3
+
+def test_paging_stops_when_max_id_does_not_move():
+    """Test that a page that does not move max_id back ends paging"""
+    api = MagicMock()
+    api.mentions_timeline.return_value = [SimpleNamespace(id=300), SimpleNamespace(id=301)]
+
+    pages = list(iter_mention_pages(api, page_size=2, max_id=250))
+
+    assert len(pages) == 1
+    assert api.mentions_timeline.call_count == 1
+
+def test_pages_are_fetched_lazily():
+    """Test that later pages are only requested when the consumer asks for them"""
+    api = make_timeline(range(1, 1001))
+
+    mentions = iter_mentions(api, page_size=100)
+    first = next(mentions)
+
+    assert first.id == 1000
+    assert api.mentions_timeline.call_count == 1
+
+def test_pages_start_below_max_id():
+    """Test that a resumed scan continues below the last finished page"""
+    api = make_timeline(range(1, 501))
+
+    pages = list(iter_mention_pages(api, since_id=50, page_size=200, max_id=300))
+
+    assert [len(page) for page in pages] == [200, 50]
+    assert pages[0][0].id == 300
+
+def test_max_pages_limits_paging():
+    """Test the optional page limit"""
+    api = make_timeline(range(1, 1001))
+    assert len(list(iter_mention_pages(api, page_size=100, max_pages=2))) == 2
+
+def make_followers(count, page_size):
+    """Fake get_follower_ids whose cursor is the offset of the next page"""
+    def get_follower_ids(cursor=-1, count=page_size, stringify_ids=False):
+        start = 0 if cursor == -1 else cursor
+        end = min(start + count, total)
+        return [str(i) for i in range(start, end)], (start, end if end < total else 0)
+    total = count
+    api = MagicMock()
+    api.get_follower_ids.side_effect = get_follower_ids
+    return api
+
+def test_follower_pages_until_cursor_is_zero():
+    """Test that follower IDs are paged until the API returns cursor 0"""
+    api = make_followers(12000, 5000)
+
+    pages = list(iter_follower_id_pages(api))
+
+    assert [len(ids) for ids, _ in pages] == [5000, 5000, 2000]
+    assert [cursor for _, cursor in pages] == [5000, 10000, 0]
+
+def test_follower_pages_resume_from_cursor():
+    """Test that a saved cursor resumes the scan instead of starting over"""
+    api = make_followers(12000, 5000)
+
+    pages = list(iter_follower_id_pages(api, cursor=10000, max_pages=3))
+
+    assert len(pages) == 1
+    assert pages[0][0][0] == '10000'
+    assert api.get_follower_ids.call_args.kwargs['cursor'] == 10000
+
+def test_follower_pages_respect_max_pages():
+    """Test that one run only fetches a bounded number of pages"""
+    api = make_followers(12000, 5000)
+
+    pages = list(iter_follower_id_pages(api, max_pages=1))
+
+    assert len(pages) == 1
+    assert pages[0][1] == 5000
+
+def test_exhausted_cursor_yields_nothing():
+    """Test that cursor 0 (a finished pass) makes no API calls"""
+    api = make_followers(10, 5000)
+    assert list(iter_follower_id_pages(api, cursor=0)) == []
+    api.get_follower_ids.assert_not_called()
+
+def test_engagers_skip_tweets_without_retweets():
+    """Test that retweeter IDs are only requested for tweets that were retweeted"""
+    api = MagicMock()
+    api.user_timeline.return_value = [
+        SimpleNamespace(id=1, retweet_count=3),
+        SimpleNamespace(id=2, retweet_count=0),
+        SimpleNamespace(id=3, retweet_count=1)
+    ]
+    api.get_retweeter_ids.side_effect = lambda id, count, stringify_ids: [f"{id}a", f"{id}b"]
+
+    pages = list(iter_engager_id_pages(api, tweet_count=3))
+
+    assert pages == [['1a', '1b'], ['3a', '3b']]
+    assert [c.kwargs['id'] for c in api.get_retweeter_ids.call_args_list] == [1, 3]
+
+def test_seen_window_deduplicates_within_window():
+    """Test that accounts are skipped until the window expires"""
+    seen = SeenWindow(window=60)
+    seen.add(['1', '2'], now=0)
+
+    assert seen.unseen(['2', '3', '3'], now=30) == ['3']
+    assert seen.unseen(['1', '2'], now=61) == ['1', '2']
+    assert len(seen) == 0
+
+def test_seen_window_is_bounded():
+    """Test that the oldest entries are dropped past max_size"""
+    seen = SeenWindow(window=60, max_size=2)
+    seen.add(['1', '2', '3'], now=0)
+
+    assert len(seen) == 2
+    assert seen.unseen(['1', '2', '3'], now=1) == ['1']
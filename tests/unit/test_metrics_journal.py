@@ -0,0 +1,111 @@
+import os
+import json
+from x_bot_blocker.metrics_registry import MetricsRegistry
+from x_bot_blocker.metrics_journal import MetricsJournal, load_metrics
+
+def make_journal(tmp_path, registry=None, **kwargs):
+    registry = registry or MetricsRegistry()
+    kwargs.setdefault('snapshot_interval', 3600)
+    return registry, MetricsJournal(registry, directory=str(tmp_path), **kwargs)
+
+def journal_lines(tmp_path):
+    with open(os.path.join(tmp_path, 'metrics.journal')) as f:
+        return [json.loads(line) for line in f]
+
+def test_record_appends_only_changed_counters(tmp_path):
+    """Test that each record is one line holding the counter deltas"""
+    registry, journal = make_journal(tmp_path)
+    blocks = registry.counter('total_blocks')
+    registry.counter('api_calls').inc(3)
+    registry.gauge('last_scan_time').set('now')
+    journal.record()
+    blocks.inc(2)
+    journal.record()
+    journal.record()
+
+    assert journal_lines(tmp_path) == [
+        {'seq': 1, 'deltas': {'api_calls': 3}},
+        {'seq': 2, 'deltas': {'total_blocks': 2}}
+    ]
+    assert not os.path.exists(os.path.join(tmp_path, 'metrics.json'))
+
+def test_restore_replays_snapshot_and_journal(tmp_path):
+    """Test that counters survive a restart"""
+    registry, journal = make_journal(tmp_path)
+    registry.counter('api_status.rate_limits_hit').inc()
+    journal.snapshot()
+    registry.counter('api_status.rate_limits_hit').inc(2)
+    registry.counter('total_blocks').inc(5)
+    journal.record()
+
+    registry, journal = make_journal(tmp_path)
+    assert journal.restore() == {'api_status.rate_limits_hit': 3, 'total_blocks': 5}
+    assert registry.value('api_status.rate_limits_hit') == 3
+    assert registry.value('total_blocks') == 5
+    # Replayed deltas are folded into a fresh snapshot
+    assert os.path.getsize(os.path.join(tmp_path, 'metrics.journal')) == 0
+
+    registry.counter('total_blocks').inc()
+    journal.record()
+    _, journal = make_journal(tmp_path)
+    assert journal.restore()['total_blocks'] == 6
+
+def test_restore_skips_deltas_already_in_snapshot(tmp_path):
+    """Test a crash between the snapshot rename and the journal truncation"""
+    registry, journal = make_journal(tmp_path)
+    registry.counter('total_blocks').inc(4)
+    journal.record()
+    with open(os.path.join(tmp_path, 'metrics.journal')) as f:
+        stale = f.read()
+    journal.snapshot()
+    with open(os.path.join(tmp_path, 'metrics.journal'), 'w') as f:
+        f.write(stale)
+
+    registry, journal = make_journal(tmp_path)
+    journal.restore()
+    assert registry.value('total_blocks') == 4
+
+def test_torn_last_line_is_ignored(tmp_path):
+    """Test that a partially written journal line does not break reads"""
+    registry, journal = make_journal(tmp_path)
+    registry.counter('total_blocks').inc()
+    journal.record()
+    with open(os.path.join(tmp_path, 'metrics.journal'), 'a') as f:
+        f.write('{"seq": 2, "deltas": {"total_bl')
+
+    assert load_metrics(str(tmp_path))['total_blocks'] == 1
+    registry, journal = make_journal(tmp_path)
+    journal.restore()
+    assert registry.value('total_blocks') == 1
+
+def test_load_metrics_applies_journal_to_snapshot(tmp_path):
+    """Test that readers see the snapshot plus the deltas journaled since"""
+    registry, journal = make_journal(tmp_path, extra=lambda: {'errors': ['boom']})
+    registry.counter('api_status.connection_errors').inc()
+    registry.gauge('last_scan_time').set('2025-03-17 10:00:00 EST')
+    journal.snapshot()
+    registry.counter('api_status.connection_errors').inc(2)
+    registry.counter('total_blocks').inc(7)
+    journal.record()
+
+    metrics = load_metrics(str(tmp_path))
+    assert metrics['api_status']['connection_errors'] == 3
+    assert metrics['total_blocks'] == 7
+    assert metrics['last_scan_time'] == '2025-03-17 10:00:00 EST'
+    assert metrics['errors'] == ['boom']
+
+def test_large_journal_is_compacted(tmp_path):
+    """Test that the journal is folded into a snapshot once it grows too large"""
+    registry, journal = make_journal(tmp_path, max_journal_bytes=200)
+    blocks = registry.counter('total_blocks')
+    for _ in range(20):
+        blocks.inc()
+        journal.record()
+
+    assert os.path.getsize(os.path.join(tmp_path, 'metrics.journal')) < 200
+    assert load_metrics(str(tmp_path))['total_blocks'] == 20
+    assert not os.path.exists(os.path.join(tmp_path, 'metrics.json.tmp'))
+
+def test_load_metrics_without_files(tmp_path):
+    """Test that a fresh install reads as empty metrics"""
+    assert load_metrics(str(tmp_path)) == {}
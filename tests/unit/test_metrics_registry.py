@@ -0,0 +1,86 @@
+import threading
+import pytest
+from x_bot_blocker.metrics_registry import MetricsRegistry
+from x_bot_blocker.monitoring import MonitoringSystem
+
+def test_counter_is_exact_under_concurrent_increments():
+    """Test that increments from many threads are never lost"""
+    registry = MetricsRegistry()
+    counter = registry.counter('api_calls')
+
+    def work():
+        for _ in range(5000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value() == 40000
+
+def test_counter_only_increases():
+    """Test that a counter refuses negative increments"""
+    with pytest.raises(ValueError):
+        MetricsRegistry().counter('blocks').inc(-1)
+
+def test_gauge_values_and_functions():
+    """Test plain and computed gauges"""
+    registry = MetricsRegistry()
+    gauge = registry.gauge('queue.pending')
+    gauge.inc(3)
+    gauge.dec()
+    assert gauge.value() == 2
+
+    state = {'pending': 5}
+    registry.gauge('block_queue').set_function(lambda: dict(state))
+    state['pending'] = 6
+    assert registry.value('block_queue') == {'pending': 6}
+
+def test_histogram_summary():
+    """Test histogram count, mean and bucket quantiles"""
+    histogram = MetricsRegistry().histogram('response_seconds', buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        histogram.observe(value)
+    summary = histogram.value()
+    assert summary['count'] == 4
+    assert summary['mean'] == pytest.approx(0.65)
+    assert summary['p50'] == 0.1
+    assert summary['p99'] is None
+    assert summary['buckets'] == {'0.1': 2, '1.0': 1, '+Inf': 1}
+
+def test_same_name_returns_same_metric_and_types_must_match():
+    """Test that metrics are shared by name and a name has one type"""
+    registry = MetricsRegistry()
+    assert registry.counter('api_calls') is registry.counter('api_calls')
+    with pytest.raises(ValueError):
+        registry.gauge('api_calls')
+    with pytest.raises(ValueError):
+        registry.counter('api_calls.failed')
+
+def test_snapshot_nests_dotted_names():
+    """Test that dotted names become nested sections"""
+    registry = MetricsRegistry()
+    registry.counter('total_blocks').inc(2)
+    registry.counter('api_status.rate_limits_hit').inc()
+    registry.gauge('api_status.last_error').set('2024-01-01 00:00:00 EST')
+    assert registry.snapshot() == {
+        'api_status': {'last_error': '2024-01-01 00:00:00 EST', 'rate_limits_hit': 1},
+        'total_blocks': 2
+    }
+
+def test_monitoring_reads_the_shared_registry(config, clean_data_dirs):
+    """Test that the monitoring view and the bot's counters are the same metrics"""
+    registry = MetricsRegistry()
+    registry.counter('api_calls').inc(4)
+    registry.counter('api_status.failed_requests').inc()
+    registry.counter('total_blocks').inc(2)
+
+    monitoring = MonitoringSystem(config, registry=registry)
+    monitoring.record_api_call(success=True, response_time=0.5)
+    metrics = monitoring.metrics
+    assert metrics['api_calls'] == 5
+    assert metrics['blocks_count'] == 2
+    assert metrics['error_rate'] == pytest.approx(20.0)
+    assert metrics['avg_response_time'] == pytest.approx(0.5)
+    assert registry.value('api_calls') == 5
@@ -0,0 +1,89 @@
+import pytest
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from tweepy import TweepyException
+from x_bot_blocker.rate_limiter import RateLimiter, RateLimitedAPI, RateLimitExceeded, is_rate_limit_error
+
+def test_exhausted_endpoint_is_parked_without_sleeping():
+    """Test that an empty budget raises instead of blocking the caller"""
+    limiter = RateLimiter(max_wait=1)
+    limiter.update_from_headers('statuses/mentions_timeline', {
+        'x-rate-limit-remaining': '0',
+        'x-rate-limit-reset': str(int(time.time()) + 600)
+    })
+
+    start = time.monotonic()
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        limiter.acquire('statuses/mentions_timeline')
+    assert time.monotonic() - start < 0.5
+    assert excinfo.value.endpoint == 'statuses/mentions_timeline'
+    assert is_rate_limit_error(excinfo.value)
+
+    # Other endpoints keep their own budget
+    limiter.acquire('users/lookup')
+
+def test_calls_are_paced_from_headers():
+    """Test that the refill rate follows the remaining budget reported by the API"""
+    limiter = RateLimiter(max_wait=5, burst=1)
+    limiter.update_from_headers('users/lookup', {
+        'x-rate-limit-remaining': '10',
+        'x-rate-limit-reset': str(time.time() + 2),
+        'x-rate-limit-limit': '900'
+    })
+
+    start = time.monotonic()
+    limiter.acquire('users/lookup')
+    limiter.acquire('users/lookup')
+    elapsed = time.monotonic() - start
+
+    # 10 calls over ~2 seconds -> about 0.2 seconds between calls
+    assert 0.1 < elapsed < 1.0
+    status = limiter.get_status()['users/lookup']
+    assert status['remaining'] == 8
+    assert status['limit'] == 900
+
+def test_rate_limited_api_reads_response_headers():
+    """Test that the wrapper acquires tokens and learns budgets from responses"""
+    raw_api = MagicMock()
+    raw_api.session.hooks = {'response': []}
+    limiter = RateLimiter()
+    api = RateLimitedAPI(raw_api, limiter)
+
+    api.mentions_timeline(count=200)
+    raw_api.mentions_timeline.assert_called_once_with(count=200)
+
+    response = SimpleNamespace(
+        url='https://api.twitter.com/1.1/statuses/mentions_timeline.json?count=200',
+        headers={'x-rate-limit-remaining': '0', 'x-rate-limit-reset': str(int(time.time()) + 600)}
+    )
+    raw_api.session.hooks['response'][0](response)
+
+    with pytest.raises(RateLimitExceeded):
+        api.mentions_timeline(count=200)
+    assert raw_api.mentions_timeline.call_count == 1
+
+def test_rate_limited_api_reports_every_call():
+    """Test that on_call sees each API call with its outcome"""
+    raw_api = MagicMock()
+    raw_api.session.hooks = {'response': []}
+    raw_api.create_block.side_effect = ValueError("boom")
+    calls = []
+    api = RateLimitedAPI(raw_api, RateLimiter(), on_call=lambda endpoint, seconds, success: calls.append((endpoint, success)))
+
+    api.mentions_timeline(count=200)
+    api.lookup_users(user_id=['1'])
+    with pytest.raises(ValueError):
+        api.create_block(user_id='1')
+    assert calls == [('statuses/mentions_timeline', True), ('users/lookup', True), ('blocks/create', False)]
+
+def test_rate_limited_api_tags_errors_with_endpoint():
+    """Test that API errors say which endpoint failed"""
+    raw_api = MagicMock()
+    raw_api.session.hooks = {'response': []}
+    raw_api.get_blocked_ids.side_effect = TweepyException("boom")
+    api = RateLimitedAPI(raw_api, RateLimiter())
+
+    with pytest.raises(TweepyException) as excinfo:
+        api.get_blocked_ids()
+    assert excinfo.value.endpoint == 'blocks/ids'
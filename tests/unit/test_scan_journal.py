@@ -0,0 +1,57 @@
+import pytest
+from x_bot_blocker.scan_journal import ScanJournal
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'scan_journal.db')
+
+def test_unfinished_scan_is_resumed_after_restart(db_path):
+    """Test that a scan interrupted after some pages resumes below its last finished page"""
+    journal = ScanJournal(db_path)
+    scan = journal.begin('mentions', 100)
+    assert not scan['resumed']
+    journal.record_verdicts(scan['scan_id'], {'1': (True, 0.9, "bot"), '2': (False, 0.1, "No suspicious indicators")})
+    journal.page_done(scan['scan_id'], oldest_id=801, newest_id=1000, blocks_queued=1)
+    journal.page_done(scan['scan_id'], oldest_id=601, newest_id=800)
+    journal.close()
+
+    restarted = ScanJournal(db_path)
+    resumed = restarted.begin('mentions', 999)
+
+    assert resumed['resumed']
+    assert resumed['scan_id'] == scan['scan_id']
+    assert resumed['since_id'] == 100
+    assert resumed['resume_max_id'] == 600
+    assert resumed['newest_id'] == 1000
+    assert resumed['pages'] == 2
+    assert resumed['blocks_queued'] == 1
+    assert restarted.get_verdicts(scan['scan_id']) == {
+        '1': (True, 0.9, "bot"),
+        '2': (False, 0.1, "No suspicious indicators")
+    }
+
+def test_finished_scan_starts_fresh(db_path):
+    """Test that finishing a scan drops its verdicts and the next scan starts from the cursor"""
+    journal = ScanJournal(db_path)
+    scan = journal.begin('mentions', None)
+    journal.record_verdicts(scan['scan_id'], {'1': (True, 0.9, "bot")})
+    journal.page_done(scan['scan_id'], oldest_id=1, newest_id=50)
+    journal.finish(scan['scan_id'])
+
+    next_scan = journal.begin('mentions', 50)
+
+    assert not next_scan['resumed']
+    assert next_scan['since_id'] == 50
+    assert next_scan['resume_max_id'] is None
+    assert journal.get_verdicts(scan['scan_id']) == {}
+
+def test_sources_are_journaled_separately(db_path):
+    """Test that an unfinished scan of one source does not affect another"""
+    journal = ScanJournal(db_path)
+    mentions = journal.begin('mentions', None)
+
+    other = journal.begin('replies', None)
+
+    assert not other['resumed']
+    assert other['scan_id'] != mentions['scan_id']
+    assert journal.begin('mentions', None)['scan_id'] == mentions['scan_id']
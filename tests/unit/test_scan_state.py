@@ -0,0 +1,46 @@
+import pytest
+import os
+import json
+from x_bot_blocker.scan_state import ScanState
+
+@pytest.fixture
+def state_file(tmp_path):
+    return str(tmp_path / 'data' / 'scan_state.json')
+
+def test_cursor_persists_across_instances(state_file):
+    """Test that a saved cursor survives a restart"""
+    state = ScanState(state_file)
+    assert state.get('mentions_since_id') is None
+
+    state.advance('mentions_since_id', 1500)
+
+    reloaded = ScanState(state_file)
+    assert reloaded.get('mentions_since_id') == 1500
+    with open(state_file, 'r') as f:
+        assert json.load(f) == {'mentions_since_id': 1500}
+
+def test_advance_never_moves_backwards(state_file):
+    """Test that older IDs do not rewind the cursor"""
+    state = ScanState(state_file)
+    state.advance('mentions_since_id', 200)
+    state.advance('mentions_since_id', 100)
+    state.advance('mentions_since_id', None)
+    assert state.get('mentions_since_id') == 200
+
+def test_update_sets_several_cursors(state_file):
+    """Test that update persists several cursors together"""
+    state = ScanState(state_file)
+    state.update({'followers_cursor': 5000, 'followers_offset': 0})
+
+    reloaded = ScanState(state_file)
+    assert reloaded.get('followers_cursor') == 5000
+    assert reloaded.get('followers_offset') == 0
+
+def test_corrupt_state_file_starts_fresh(state_file):
+    """Test that an unreadable state file does not prevent startup"""
+    os.makedirs(os.path.dirname(state_file))
+    with open(state_file, 'w') as f:
+        f.write('{not json')
+
+    state = ScanState(state_file)
+    assert state.get('mentions_since_id') is None
@@ -0,0 +1,127 @@
+import time
+import threading
+from datetime import datetime
+from x_bot_blocker.scheduler import ScheduledJob, Scheduler
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+def test_job_runs_at_its_deadline():
+    """Test that an interval job runs when due and not before"""
+    runs = []
+    scheduler = Scheduler()
+    scheduler.every('scan', 0.2, lambda: runs.append(time.time()))
+    started = time.time()
+    scheduler.start()
+    try:
+        assert wait_for(lambda: len(runs) >= 2)
+        assert runs[0] - started >= 0.15
+        assert runs[1] - runs[0] >= 0.15
+    finally:
+        scheduler.stop()
+
+def test_trigger_wakes_scheduler_immediately():
+    """Test that triggering a job runs it without waiting for its deadline"""
+    ran = threading.Event()
+    scheduler = Scheduler()
+    scheduler.every('scan', 3600, ran.set)
+    scheduler.start()
+    try:
+        started = time.time()
+        scheduler.trigger('scan')
+        assert ran.wait(1)
+        assert time.time() - started < 0.5
+        assert scheduler.get_status()['scan']['next_run'] > time.time() + 3000
+    finally:
+        scheduler.stop()
+
+def test_long_job_does_not_starve_others():
+    """Test that a job still running does not delay another job's run"""
+    release = threading.Event()
+    report = threading.Event()
+    scheduler = Scheduler()
+    scheduler.every('scan', 3600, lambda: release.wait(2))
+    scheduler.every('report', 3600, report.set)
+    scheduler.start()
+    try:
+        scheduler.trigger('scan')
+        assert wait_for(lambda: scheduler.get_status()['scan']['running'])
+        scheduler.trigger('report')
+        assert report.wait(1)
+        assert scheduler.get_status()['scan']['running']
+    finally:
+        release.set()
+        scheduler.stop()
+
+def test_job_never_overlaps_itself():
+    """Test that a job triggered while running runs once more after it finishes"""
+    release = threading.Event()
+    active = []
+    overlaps = []
+
+    def scan():
+        if active:
+            overlaps.append(True)
+        active.append(True)
+        release.wait(2)
+        active.pop()
+
+    scheduler = Scheduler()
+    scheduler.every('scan', 3600, scan)
+    scheduler.start()
+    try:
+        scheduler.trigger('scan')
+        assert wait_for(lambda: scheduler.get_status()['scan']['running'])
+        scheduler.trigger('scan')
+        scheduler.trigger('scan')
+        time.sleep(0.05)
+        release.set()
+        assert wait_for(lambda: scheduler.get_status()['scan']['runs'] == 2)
+        time.sleep(0.05)
+        assert scheduler.get_status()['scan']['runs'] == 2
+        assert not overlaps
+    finally:
+        scheduler.stop()
+
+def test_job_errors_are_reported_and_job_keeps_its_schedule():
+    """Test that an exception in a job goes to on_error and does not stop the scheduler"""
+    errors = []
+    scheduler = Scheduler(on_error=lambda name, e: errors.append((name, str(e))))
+
+    def fail():
+        raise RuntimeError("boom")
+
+    scheduler.every('scan', 3600, fail)
+    scheduler.start()
+    try:
+        scheduler.trigger('scan')
+        assert wait_for(lambda: errors)
+        assert errors == [('scan', 'boom')]
+        assert wait_for(lambda: not scheduler.get_status()['scan']['running'])
+    finally:
+        scheduler.stop()
+
+def test_time_of_day_deadlines():
+    """Test daily and weekly deadlines"""
+    job = ScheduledJob('daily', lambda: None, at='00:00')
+    tuesday_noon = datetime(2024, 1, 2, 12, 0).timestamp()
+    assert datetime.fromtimestamp(job.following_run(tuesday_noon)) == datetime(2024, 1, 3, 0, 0)
+
+    weekly = ScheduledJob('weekly', lambda: None, at='00:00', weekday=0)
+    assert datetime.fromtimestamp(weekly.following_run(tuesday_noon)) == datetime(2024, 1, 8, 0, 0)
+    monday_midnight = datetime(2024, 1, 8, 0, 0).timestamp()
+    assert datetime.fromtimestamp(weekly.following_run(monday_midnight)) == datetime(2024, 1, 15, 0, 0)
+
+def test_reschedule_counts_from_last_run():
+    """Test that changing a job's interval moves its next deadline"""
+    scheduler = Scheduler()
+    job = scheduler.every('scan', 3600, lambda: None)
+    job.last_run = 1000.0
+    scheduler.reschedule('scan', 120)
+    assert job.interval == 120
+    assert job.next_run == 1120.0
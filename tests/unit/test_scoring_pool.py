@@ -0,0 +1,83 @@
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from x_bot_blocker.bot_detection import BotDetector
+from x_bot_blocker.scoring_pool import ScoringPool
+from .test_bot_detection import make_user
+
+class PidBehaviorAnalyzer:
+    """Behavior analyzer stand-in reporting which process ran it"""
+
+    def analyze_user(self, user, tweets):
+        return 0.5, [f"pid {os.getpid()}", f"{len(tweets)} tweets", tweets[0].text]
+
+@pytest.fixture
+def detector(config):
+    return BotDetector(MagicMock(), config_path=config.config_path)
+
+@pytest.fixture
+def pool(detector):
+    pool = ScoringPool(detector, PidBehaviorAnalyzer(), workers=2, batch_size=3, min_batch=4)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+def make_users(count):
+    return {
+        str(i): make_user(i, age_days=1 if i % 2 else 400, followers=0 if i % 2 else 100,
+                          statuses=0 if i % 2 else 100, default_image=bool(i % 2))
+        for i in range(1, count + 1)
+    }
+
+def test_pool_verdicts_match_in_process_scoring(pool, detector):
+    """Test that worker processes return the same verdicts as BotDetector.score_user"""
+    users = make_users(10)
+
+    verdicts = pool.score_profiles(users)
+
+    assert verdicts == {user_id: detector.score_user(user) for user_id, user in users.items()}
+    assert verdicts['1'][0] is True and verdicts['2'][0] is False
+
+def test_small_batches_stay_in_process(pool, detector):
+    """Test that batches below min_batch are scored without a round trip to the workers"""
+    detector.score_user = MagicMock(return_value=(False, 0.0, "No suspicious indicators"))
+
+    pool.score_profiles(make_users(3))
+
+    assert detector.score_user.call_count == 3
+
+def test_behavior_analysis_runs_in_workers(pool):
+    """Test that a batch of timelines is shipped to worker processes with compact tweet data"""
+    timelines = {
+        user_id: (user, [SimpleNamespace(id=1, text=f"text {user_id}", created_at=None, _api=object())])
+        for user_id, user in make_users(4).items()
+    }
+
+    results = pool.analyze_behavior(timelines)
+
+    assert sorted(results) == ['1', '2', '3', '4']
+    probability, reasons = results['3']
+    assert probability == 0.5
+    assert reasons[0] != f"pid {os.getpid()}"
+    assert reasons[1:] == ["1 tweets", "text 3"]
+
+def test_behavior_errors_are_returned_per_user(pool):
+    """Test that one failing analysis does not lose the rest of the batch"""
+    timelines = {user_id: (user, []) for user_id, user in make_users(4).items()}
+    timelines['2'] = (timelines['2'][0], [SimpleNamespace(id=1, text="ok", created_at=None)])
+
+    results = pool.analyze_behavior(timelines)
+
+    assert isinstance(results['1'], IndexError)
+    assert results['2'][1][1:] == ["1 tweets", "ok"]
+
+def test_analyze_users_uses_pool_and_caches(pool, detector):
+    """Test that BotDetector routes batches through the pool and still caches verdicts"""
+    detector.scoring_pool = pool
+    users = make_users(6)
+
+    results = detector.analyze_users(users)
+
+    assert results['1'][0] is True
+    assert detector.verdict_cache.get('1') == results['1']
@@ -0,0 +1,101 @@
+import os
+import sys
+import gzip
+import json
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src', 'x_bot_blocker')
+
+CREDENTIAL_KEYS = ('TWITTER_API_KEY', 'TWITTER_API_SECRET', 'TWITTER_ACCESS_TOKEN', 'TWITTER_ACCESS_TOKEN_SECRET')
+
+HEAVY_MODULES = ['pandas', 'numpy', 'cv2', 'PIL', 'psutil', 'asyncio', 'http.server']
+
+def run_fresh(code: str) -> dict:
+    """Run code in a fresh interpreter without X credentials; it prints JSON"""
+    env = {key: value for key, value in os.environ.items() if not key.startswith('TWITTER_')}
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_importing_the_bot_has_no_side_effects():
+    """Test that importing the bot needs no credentials, logs nothing and skips optional dependencies"""
+    loaded = run_fresh(
+        "import sys, json, logging, x_bot_blocker\n"
+        f"print(json.dumps({{'handlers': len(logging.getLogger().handlers), "
+        f"'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))"
+    )
+    assert loaded == {'handlers': 0, 'heavy': []}
+
+def test_create_app_requires_credentials():
+    """Test that missing credentials are reported by the factory, not at import"""
+    result = run_fresh(
+        "import json, x_bot_blocker\n"
+        "try:\n"
+        "    x_bot_blocker.create_app(env={})\n"
+        "    print(json.dumps('built'))\n"
+        "except ValueError as e:\n"
+        "    print(json.dumps(str(e)))"
+    )
+    assert 'Missing required Twitter API credentials' in result
+
+def test_replay_keeps_state_out_of_data(tmp_path):
+    """Test that replayed traffic gets its own state directory and never data/"""
+    archive = tmp_path / 'traffic.jsonl.gz'
+    with gzip.open(archive, 'wt') as f:
+        f.write('')
+    env = {key: 'test' for key in CREDENTIAL_KEYS}
+    env.update({'API_TRAFFIC_MODE': 'replay', 'API_TRAFFIC_ARCHIVE': str(archive)})
+    state_dir = tmp_path / 'replay'
+    result = run_fresh(
+        "import json, x_bot_blocker\n"
+        "try:\n"
+        f"    x_bot_blocker.create_app(env={env!r}, data_dir='data')\n"
+        "    live = 'built'\n"
+        "except ValueError as e:\n"
+        "    live = str(e)\n"
+        f"app = x_bot_blocker.create_app(env={env!r}, data_dir={str(state_dir)!r})\n"
+        "print(json.dumps({'live': live, 'paths': [app.scan_state.state_file, app.scan_journal.db_path, "
+        "app.block_ledger.db_path, app.block_executor.db_path, app.metrics_journal.journal_path]}))"
+    )
+    assert 'own data directory' in result['live']
+    assert all(path.startswith(str(state_dir)) for path in result['paths'])
+
+def test_tenants_are_full_bots_with_their_own_state(tmp_path):
+    """Test that importing multi_tenant has no side effects and each tenant is built by create_app"""
+    archive = tmp_path / 'traffic.jsonl.gz'
+    with gzip.open(archive, 'wt') as f:
+        f.write('')
+    env = {f"{prefix}_{key}": prefix for prefix in ('A', 'B') for key in CREDENTIAL_KEYS}
+    env.update({f"{prefix}_API_TRAFFIC_MODE": 'replay' for prefix in ('A', 'B')})
+    env.update({f"{prefix}_API_TRAFFIC_ARCHIVE": str(archive) for prefix in ('A', 'B')})
+    result = run_fresh(
+        "import json, logging, multi_tenant\n"
+        "handlers = len(logging.getLogger().handlers)\n"
+        "config = multi_tenant.ConfigManager()\n"
+        f"config.config['api']['traffic']['replay_data_dir'] = {str(tmp_path)!r}\n"
+        "config.config['tenants']['accounts'] = [{'name': 'a'}, {'name': 'b'}]\n"
+        f"runner = multi_tenant.build_runner(config, env={env!r})\n"
+        "a, b = runner.tenants['a'], runner.tenants['b']\n"
+        "print(json.dumps({'handlers': handlers, 'dirs': [a.data_dir, b.data_dir], "
+        "'shared_cache': a.bot_detector.verdict_cache is b.bot_detector.verdict_cache, "
+        "'shared_flight': a.bot_detector._single_flight is b.bot_detector._single_flight, "
+        "'pool': a.scheduler.executor is runner.pool and b.scheduler.executor is runner.pool}))"
+    )
+    assert result == {
+        'handlers': 0,
+        'dirs': [str(tmp_path / 'tenants' / 'a'), str(tmp_path / 'tenants' / 'b')],
+        'shared_cache': True,
+        'shared_flight': True,
+        'pool': True
+    }
+
+def test_reporting_and_image_analysis_import_lazily():
+    """Test that pandas and OpenCV are only imported when used"""
+    loaded = run_fresh(
+        "import sys, json, reporting, image_analysis\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    assert loaded == []
@@ -0,0 +1,180 @@
+import time
+import pytest
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from x_bot_blocker.bot_detection import BotDetector, VerdictCache
+from x_bot_blocker.block_executor import BlockExecutor
+from x_bot_blocker.block_ledger import BlockLedger
+from x_bot_blocker.scheduler import Scheduler
+from x_bot_blocker.screening import screen_user_ids
+from x_bot_blocker.tenants import MultiTenantRunner
+from .test_bot_detection import make_user
+from .test_scheduler import wait_for
+
+@pytest.fixture
+def make_tenant(tmp_path, config):
+    shared_cache = VerdictCache()
+
+    def make(name):
+        api = MagicMock()
+        api.lookup_users.side_effect = lambda user_id: [make_user(uid, age_days=1, followers=0, statuses=0, default_image=True) for uid in user_id]
+        detector = BotDetector(api, config_path=config.config_path)
+        detector.verdict_cache = shared_cache
+        detector.cascade = None
+        tenant_dir = tmp_path / name
+        block_ledger = BlockLedger(str(tenant_dir / 'blocked_accounts.db'))
+        block_executor = BlockExecutor(
+            api, db_path=str(tenant_dir / 'block_queue.db'), pace=0,
+            on_blocked=lambda user_id, score, reason: block_ledger.record_block(user_id, score, reason)
+        )
+        return SimpleNamespace(api=api, bot_detector=detector, block_ledger=block_ledger, block_executor=block_executor)
+    return make
+
+class FakeTenant:
+    """A tenant whose scheduler runs one scan job on the runner's pool"""
+
+    def __init__(self, runner, interval, scan):
+        self.scheduler = Scheduler(executor=runner.pool)
+        self.scheduler.every('scan', interval, scan)
+        self.started = False
+        self.stopped = False
+
+    def start(self, monitoring=True):
+        self.started = not monitoring
+        self.scheduler.trigger('scan')
+        self.scheduler.start()
+
+    def stop(self):
+        self.stopped = True
+
+    def get_status(self):
+        return {'jobs': self.scheduler.get_status()}
+
+def screen(tenant, user_ids):
+    return screen_user_ids(user_ids, tenant.bot_detector, tenant.block_ledger, tenant.block_executor)
+
+def test_verdicts_are_shared_but_blocks_are_not(make_tenant):
+    """Test that a bot scored for one tenant is not fetched again for another, yet both block it"""
+    first, second = make_tenant('first'), make_tenant('second')
+
+    assert screen(first, ['1', '2']) == 2
+    assert screen(second, ['1', '2']) == 2
+
+    first.api.lookup_users.assert_called_once()
+    second.api.lookup_users.assert_not_called()
+    assert '1' in first.block_executor and '1' in second.block_executor
+
+def test_concurrent_tenants_share_one_lookup(make_tenant):
+    """Test that a bot two tenants screen at the same moment is looked up once"""
+    first, second = make_tenant('first'), make_tenant('second')
+    second.bot_detector._single_flight = first.bot_detector._single_flight
+    looking_up = threading.Event()
+    release = threading.Event()
+    lookup = first.api.lookup_users.side_effect
+
+    def slow_lookup(user_id):
+        looking_up.set()
+        release.wait(5)
+        return lookup(user_id=user_id)
+
+    first.api.lookup_users.side_effect = slow_lookup
+    results = {}
+    thread = threading.Thread(target=lambda: results.update(first=screen(first, ['1'])))
+    thread.start()
+    assert looking_up.wait(5)
+    waiter = threading.Thread(target=lambda: results.update(second=screen(second, ['1'])))
+    waiter.start()
+    assert wait_for(lambda: first.bot_detector._single_flight.stats['shared'] == 1)
+    release.set()
+    thread.join(5)
+    waiter.join(5)
+
+    assert results == {'first': 1, 'second': 1}
+    first.api.lookup_users.assert_called_once()
+    second.api.lookup_users.assert_not_called()
+
+def test_resumed_scan_verdicts_stay_out_of_the_cache(make_tenant):
+    """Test that journaled verdicts skip the lookup for their scan but are never cached"""
+    tenant = make_tenant('resumed')
+    restored = {'1': (True, 0.9, "restored")}
+
+    assert screen_user_ids(['1', '2'], tenant.bot_detector, tenant.block_ledger, tenant.block_executor,
+                           known_verdicts=restored) == 2
+
+    tenant.api.lookup_users.assert_called_once_with(user_id=['2'])
+    assert tenant.bot_detector.verdict_cache.get('1') is None
+    assert tenant.bot_detector.verdict_cache.get('2') is not None
+
+def test_blocks_are_recorded_in_the_tenants_own_ledger(make_tenant):
+    """Test that each tenant's block queue uses its own API and ledger"""
+    first, second = make_tenant('first'), make_tenant('second')
+    first.block_executor.enqueue('1', 0.9, "bot")
+
+    first.block_executor.process_next()
+
+    first.api.create_block.assert_called_once_with(user_id='1')
+    second.api.create_block.assert_not_called()
+    assert '1' in first.block_ledger
+    assert '1' not in second.block_ledger
+
+def test_backlogged_tenant_does_not_delay_others():
+    """Test that each tenant keeps its own scan deadlines while another tenant's scan runs long"""
+    runner = MultiTenantRunner(max_workers=2)
+    release = threading.Event()
+    scans = {'slow': 0, 'fast': 0}
+
+    def slow_scan():
+        scans['slow'] += 1
+        release.wait(5)
+
+    def fast_scan():
+        scans['fast'] += 1
+
+    runner.add('slow', FakeTenant(runner, 3600, slow_scan))
+    runner.add('fast', FakeTenant(runner, 0.05, fast_scan))
+    runner.start()
+    try:
+        assert wait_for(lambda: scans['fast'] >= 4)
+        assert scans['slow'] == 1
+        assert runner.get_status()['slow']['jobs']['scan']['running'] is True
+    finally:
+        release.set()
+        runner.stop()
+
+    assert all(tenant.started and tenant.stopped for tenant in runner.tenants.values())
+
+def test_pool_bounds_concurrent_jobs():
+    """Test that tenants' jobs never run on more than max_workers threads at once"""
+    runner = MultiTenantRunner(max_workers=2)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+    runs = [0]
+
+    def scan():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+            runs[0] += 1
+
+    for name in ('a', 'b', 'c', 'd'):
+        runner.add(name, FakeTenant(runner, 3600, scan))
+    runner.start()
+    try:
+        assert wait_for(lambda: runs[0] == 4)
+    finally:
+        runner.stop()
+
+    assert peak[0] == 2
+
+def test_tenant_names_must_be_unique():
+    """Test that two tenants cannot share a name (and so a data directory)"""
+    runner = MultiTenantRunner()
+    runner.add('a', SimpleNamespace())
+    with pytest.raises(ValueError):
+        runner.add('a', SimpleNamespace())
+    runner.pool.shutdown()
@@ -0,0 +1,143 @@
+import json
+import time
+import threading
+import pytest
+import requests
+from unittest.mock import MagicMock
+from x_bot_blocker.bot_detection import BotDetector
+from x_bot_blocker.block_executor import BlockExecutor
+from x_bot_blocker.block_ledger import BlockLedger
+from x_bot_blocker.screening import screen_user_ids
+from x_bot_blocker.webhook_receiver import WebhookReceiver, crc_response, extract_users, is_full_profile, sign
+from .test_bot_detection import make_user
+
+SECRET = 'consumer-secret'
+ME = {'id': 1, 'id_str': '1', 'screen_name': 'me'}
+
+def user(user_id):
+    return {'id': user_id, 'id_str': str(user_id), 'screen_name': f"user{user_id}"}
+
+def mention(author, mentioned=ME):
+    return {'id': 10, 'user': author, 'entities': {'user_mentions': [mentioned]}}
+
+@pytest.fixture
+def receiver():
+    screened = []
+    done = threading.Event()
+
+    def on_users(user_ids, users):
+        screened.append((user_ids, users))
+        done.set()
+
+    receiver = WebhookReceiver(SECRET, on_users, port=0)
+    receiver.screened = screened
+    receiver.done = done
+    receiver.start()
+    yield receiver
+    receiver.stop()
+
+def url(receiver):
+    return f"http://127.0.0.1:{receiver.port}{receiver.path}"
+
+def post(receiver, payload, secret=SECRET):
+    body = json.dumps(payload).encode('utf-8')
+    return requests.post(url(receiver), data=body, headers={'x-twitter-webhooks-signature': sign(secret, body)}, timeout=5)
+
+def test_crc_response_matches_x_algorithm():
+    """Test the CRC response token against a known HMAC-SHA256 value"""
+    assert crc_response('test', 'secret') == {
+        'response_token': 'sha256=Aymga2LNFrM+tnkr6MYLFY2Jou46h2/Omogeu0iMCRQ='
+    }
+
+def test_extract_users_from_mentions_follows_and_likes():
+    """Test that only activity aimed at our account is screened"""
+    payload = {
+        'for_user_id': '1',
+        'tweet_create_events': [mention(user(2)), mention(user(3), mentioned=user(9)), mention(ME)],
+        'follow_events': [
+            {'type': 'follow', 'source': user(4), 'target': ME},
+            {'type': 'unfollow', 'source': user(5), 'target': ME},
+            {'type': 'follow', 'source': ME, 'target': user(6)}
+        ],
+        'favorite_events': [
+            {'user': user(7), 'favorited_status': {'user': ME}},
+            {'user': user(8), 'favorited_status': {'user': user(9)}}
+        ]
+    }
+    assert [(event_type, user_id) for event_type, user_id, _ in extract_users(payload)] == [
+        ('mentions', '2'), ('follows', '4'), ('likes', '7')
+    ]
+
+def test_full_event_profiles_are_scored_without_lookup(tmp_path, config):
+    """Test that accounts with full profiles in their events cost no users/lookup call"""
+    api = MagicMock()
+    api.lookup_users.side_effect = lambda user_id: [make_user(uid) for uid in user_id]
+    detector = BotDetector(api, config_path=config.config_path)
+    detector.cascade = None
+    block_executor = BlockExecutor(api, db_path=str(tmp_path / 'block_queue.db'), pace=0)
+    full = {'id': 2, 'created_at': 'Mon Mar 17 10:00:00 +0000 2025', 'followers_count': 0,
+            'friends_count': 0, 'statuses_count': 0, 'default_profile_image': True}
+    assert is_full_profile(full) and not is_full_profile(user(3))
+
+    queued = screen_user_ids(
+        ['2', '3'], detector, BlockLedger(str(tmp_path / 'blocked_accounts.db')), block_executor,
+        hydrated_users={'2': make_user(2, age_days=1, followers=0, statuses=0, default_image=True)}
+    )
+
+    assert queued == 1 and '2' in block_executor
+    api.lookup_users.assert_called_once_with(user_id=['3'])
+    assert detector.verdict_cache.get('2') is not None
+
+def test_stuck_worker_does_not_block_stop():
+    """Test that shutdown gives up on a worker stuck screening (e.g. behind a rate limit)"""
+    release = threading.Event()
+    busy = threading.Event()
+
+    def on_users(user_ids, users):
+        busy.set()
+        release.wait(5)
+
+    receiver = WebhookReceiver(SECRET, on_users, port=0, queue_size=1, stop_timeout=0.1)
+    receiver.start()
+    try:
+        receiver.submit({'for_user_id': '1', 'tweet_create_events': [mention(user(2))]})
+        assert busy.wait(2)
+        receiver.submit({'for_user_id': '1', 'tweet_create_events': [mention(user(3))]})
+        started = time.time()
+        receiver.stop()
+        assert time.time() - started < 1
+    finally:
+        release.set()
+
+def test_crc_challenge_over_http(receiver):
+    """Test that a GET with crc_token is answered with the signed token"""
+    response = requests.get(url(receiver), params={'crc_token': 'abc'}, timeout=5)
+    assert response.status_code == 200
+    assert response.json() == crc_response('abc', SECRET)
+
+def test_signed_event_is_screened_immediately(receiver):
+    """Test that a signed event reaches the screening callback with its profile"""
+    response = post(receiver, {'for_user_id': '1', 'tweet_create_events': [mention(user(2))]})
+    assert response.status_code == 200
+    assert receiver.done.wait(2)
+    assert receiver.screened == [(['2'], {'2': user(2)})]
+    stats = receiver.get_stats()
+    assert stats['mentions'] == 1
+    assert stats['screened'] == 1
+
+def test_bad_signature_is_rejected(receiver):
+    """Test that events not signed with our consumer secret are refused"""
+    response = post(receiver, {'for_user_id': '1', 'tweet_create_events': [mention(user(2))]}, secret='wrong')
+    assert response.status_code == 401
+    assert receiver.get_stats()['rejected'] == 1
+    assert not receiver.screened
+
+def test_queued_events_are_batched_and_full_queue_drops():
+    """Test that queued accounts are screened in one batch and overflow is dropped"""
+    receiver = WebhookReceiver(SECRET, lambda user_ids, users: None, queue_size=3)
+    assert receiver.submit({'for_user_id': '1', 'follow_events': [
+        {'type': 'follow', 'source': user(i), 'target': ME} for i in range(2, 7)
+    ]}) == 3
+    assert receiver.get_stats()['dropped'] == 2
+
+    assert list(receiver._next_batch()) == ['2', '3', '4']